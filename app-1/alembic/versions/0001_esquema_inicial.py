@@ -0,0 +1,22 @@
+"""Esquema inicial (db.sql original)
+
+Punto de partida: la BD tal como la creaba db.sql antes de usar Alembic.
+No hace nada; las BD existentes se marcan con `alembic stamp 0001`.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18
+"""
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    pass
+
+
+def downgrade() -> None:
+    pass
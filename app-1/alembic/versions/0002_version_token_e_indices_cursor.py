@@ -0,0 +1,41 @@
+"""Usuarios.Version_token e índices de la paginación por cursor
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+# (nombre, columnas) de los índices compuestos de GET /reportes/
+INDICES_CURSOR = [
+    ("idx_reportes_creado", ["Hora_Creado", "ID_Reporte"]),
+    ("idx_reportes_rut_creado", ["RUT", "Hora_Creado", "ID_Reporte"]),
+    ("idx_reportes_area_creado", ["ID_Area", "Hora_Creado", "ID_Reporte"]),
+    ("idx_reportes_severidad_creado", ["ID_Severidad", "Hora_Creado", "ID_Reporte"]),
+    ("idx_reportes_estado_creado", ["ID_Estado_Actual", "Hora_Creado", "ID_Reporte"]),
+]
+
+
+def upgrade() -> None:
+    op.add_column("Usuarios", sa.Column("Version_token", sa.Integer(), nullable=False, server_default="0"))
+
+    # Primero los nuevos: MySQL no deja borrar el índice de una llave foránea
+    # si no hay otro que empiece por la misma columna
+    for nombre, columnas in INDICES_CURSOR:
+        op.create_index(nombre, "Reportes", columnas)
+    op.drop_index("idx_reportes_rut_usuario", table_name="Reportes")
+    op.drop_index("idx_reportes_id_area", table_name="Reportes")
+
+
+def downgrade() -> None:
+    op.create_index("idx_reportes_rut_usuario", "Reportes", ["RUT"])
+    op.create_index("idx_reportes_id_area", "Reportes", ["ID_Area"])
+    for nombre, _ in reversed(INDICES_CURSOR):
+        op.drop_index(nombre, table_name="Reportes")
+    op.drop_column("Usuarios", "Version_token")
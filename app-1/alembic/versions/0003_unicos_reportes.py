@@ -0,0 +1,135 @@
+"""Índices únicos en UUID_Cliente y Peticiones_Idempotencia
+
+sp_insertar_reporte buscaba duplicados con EXISTS sobre columnas sin índice
+(recorrido completo de Reportes en cada inserción) y dos sincronizaciones
+simultáneas del mismo reporte podían pasar ambas el chequeo. Ahora los
+índices únicos son los que impiden el duplicado y el procedimiento, ante un
+error 1062, retorna el ID del reporte que ya existía.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18
+"""
+from alembic import context, op
+import sqlalchemy as sa
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+UNICOS = [
+    ("uq_reportes_uuid_cliente", "UUID_Cliente"),
+    ("uq_reportes_peticion_idempotencia", "Peticiones_Idempotencia"),
+]
+
+SP_INSERTAR_REPORTE = """
+CREATE PROCEDURE sp_insertar_reporte(
+    IN p_titulo VARCHAR(255),
+    IN p_descripcion TEXT,
+    IN p_fecha_reporte DATE,
+    IN p_uuid_cliente CHAR(36),
+    IN p_rut BIGINT,
+    IN p_id_severidad INT,
+    IN p_id_area INT,
+    IN p_id_estado_actual INT,
+    IN p_peticiones_idempotencia VARCHAR(255),
+    OUT p_id_reporte INT,
+    OUT p_duplicado TINYINT
+)
+BEGIN
+    -- 1062 = llave duplicada en uq_reportes_uuid_cliente o uq_reportes_peticion_idempotencia
+    DECLARE CONTINUE HANDLER FOR 1062 SET p_duplicado = 1;
+    SET p_duplicado = 0;
+    SET p_id_reporte = NULL;
+    -- Validar existencia de Area
+    IF NOT EXISTS (SELECT 1 FROM Areas WHERE ID_Area = p_id_area) THEN
+        SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = 'ID_Area no existe.';
+    END IF;
+    -- Validar existencia de Severidad
+    IF NOT EXISTS (SELECT 1 FROM Severidad WHERE ID_Severidad = p_id_severidad) THEN
+        SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = 'ID_Severidad no existe.';
+    END IF;
+    -- Insertar el reporte; los índices únicos detienen los duplicados sin carrera
+    INSERT INTO Reportes (Titulo, Descripcion, Fecha_Reporte, UUID_Cliente, RUT, ID_Severidad, ID_Area, ID_Estado_Actual, Peticiones_Idempotencia)
+    VALUES (p_titulo, p_descripcion, p_fecha_reporte, p_uuid_cliente, p_rut, p_id_severidad, p_id_area, p_id_estado_actual, p_peticiones_idempotencia);
+    IF p_duplicado = 0 THEN
+        SET p_id_reporte = LAST_INSERT_ID();
+    ELSE
+        -- Retornar el reporte que ya existía (búsqueda por índice único)
+        IF p_uuid_cliente IS NOT NULL THEN
+            SELECT ID_Reporte INTO p_id_reporte FROM Reportes WHERE UUID_Cliente = p_uuid_cliente;
+        END IF;
+        IF p_id_reporte IS NULL AND p_peticiones_idempotencia IS NOT NULL THEN
+            SELECT ID_Reporte INTO p_id_reporte FROM Reportes WHERE Peticiones_Idempotencia = p_peticiones_idempotencia;
+        END IF;
+    END IF;
+END
+"""
+
+SP_INSERTAR_REPORTE_ANTERIOR = """
+CREATE PROCEDURE sp_insertar_reporte(
+    IN p_titulo VARCHAR(255),
+    IN p_descripcion TEXT,
+    IN p_fecha_reporte DATE,
+    IN p_uuid_cliente CHAR(36),
+    IN p_rut BIGINT,
+    IN p_id_severidad INT,
+    IN p_id_area INT,
+    IN p_id_estado_actual INT,
+    IN p_peticiones_idempotencia VARCHAR(255),
+    OUT p_id_reporte INT
+)
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM Areas WHERE ID_Area = p_id_area) THEN
+        SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = 'ID_Area no existe.';
+    END IF;
+    IF NOT EXISTS (SELECT 1 FROM Severidad WHERE ID_Severidad = p_id_severidad) THEN
+        SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = 'ID_Severidad no existe.';
+    END IF;
+    IF p_peticiones_idempotencia IS NOT NULL AND EXISTS (SELECT 1 FROM Reportes WHERE Peticiones_Idempotencia = p_peticiones_idempotencia) THEN
+        SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = 'Reporte con la misma Peticiones_Idempotencia ya existe.';
+    END IF;
+    IF p_uuid_cliente IS NOT NULL AND EXISTS (SELECT 1 FROM Reportes WHERE UUID_Cliente = p_uuid_cliente) THEN
+        SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = 'Reporte con el mismo UUID_Cliente ya existe.';
+    END IF;
+    INSERT INTO Reportes (Titulo, Descripcion, Fecha_Reporte, UUID_Cliente, RUT, ID_Severidad, ID_Area, ID_Estado_Actual, Peticiones_Idempotencia)
+    VALUES (p_titulo, p_descripcion, p_fecha_reporte, p_uuid_cliente, p_rut, p_id_severidad, p_id_area, p_id_estado_actual, p_peticiones_idempotencia);
+    SET p_id_reporte = LAST_INSERT_ID();
+END
+"""
+
+
+def _revisar_repetidos() -> None:
+    # Si ya hay duplicados el índice no se puede crear: avisar cuáles son
+    bind = op.get_bind()
+    for _, columna in UNICOS:
+        repetidos = bind.execute(sa.text(
+            f"SELECT {columna}, COUNT(*) FROM Reportes WHERE {columna} IS NOT NULL "
+            f"GROUP BY {columna} HAVING COUNT(*) > 1 LIMIT 20"
+        )).all()
+        if repetidos:
+            raise RuntimeError(
+                f"Reportes tiene valores repetidos en {columna}, resolverlos antes de migrar: "
+                + ", ".join(f"{valor} ({veces})" for valor, veces in repetidos)
+            )
+
+
+def upgrade() -> None:
+    if not context.is_offline_mode():
+        _revisar_repetidos()
+
+    for nombre, columna in UNICOS:
+        op.create_index(nombre, "Reportes", [columna], unique=True)
+
+    if op.get_context().dialect.name == "mysql":
+        op.execute("DROP PROCEDURE IF EXISTS sp_insertar_reporte")
+        op.execute(SP_INSERTAR_REPORTE)
+
+
+def downgrade() -> None:
+    if op.get_context().dialect.name == "mysql":
+        op.execute("DROP PROCEDURE IF EXISTS sp_insertar_reporte")
+        op.execute(SP_INSERTAR_REPORTE_ANTERIOR)
+    for nombre, _ in reversed(UNICOS):
+        op.drop_index(nombre, table_name="Reportes")
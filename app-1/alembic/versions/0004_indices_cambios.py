@@ -0,0 +1,22 @@
+"""Índices de GET /sync/changes sobre (Hora_Actualizado, ID_Reporte)
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18
+"""
+from alembic import op
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index("idx_reportes_actualizado", "Reportes", ["Hora_Actualizado", "ID_Reporte"])
+    op.create_index("idx_reportes_rut_actualizado", "Reportes", ["RUT", "Hora_Actualizado", "ID_Reporte"])
+
+
+def downgrade() -> None:
+    op.drop_index("idx_reportes_rut_actualizado", table_name="Reportes")
+    op.drop_index("idx_reportes_actualizado", table_name="Reportes")
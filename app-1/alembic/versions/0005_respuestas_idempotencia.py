@@ -0,0 +1,33 @@
+"""Tabla Respuestas_idempotencia (Idempotency-Key)
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import mysql
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "Respuestas_idempotencia",
+        sa.Column("RUT", sa.BIGINT(), nullable=False),
+        sa.Column("Clave", sa.String(255), nullable=False),
+        sa.Column("Huella", sa.String(64), nullable=False),
+        sa.Column("Codigo_estado", sa.Integer(), nullable=False),
+        sa.Column("Respuesta", sa.Text().with_variant(mysql.MEDIUMTEXT(), "mysql"), nullable=False),
+        sa.Column("Creado", sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        sa.PrimaryKeyConstraint("RUT", "Clave"),
+    )
+    op.create_index("idx_respuestas_idempotencia_creado", "Respuestas_idempotencia", ["Creado"])
+
+
+def downgrade() -> None:
+    op.drop_index("idx_respuestas_idempotencia_creado", table_name="Respuestas_idempotencia")
+    op.drop_table("Respuestas_idempotencia")
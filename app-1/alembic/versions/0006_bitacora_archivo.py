@@ -0,0 +1,45 @@
+"""Índices de GET /reportes/bitacora y tabla Bitacora_reportes_archivo
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+INDICES = {
+    "fecha": ["Actualizacion_Fecha", "ID_Bitacora"],
+    "rut_fecha": ["RUT", "Actualizacion_Fecha", "ID_Bitacora"],
+    "reporte_fecha": ["ID_Reporte", "Actualizacion_Fecha", "ID_Bitacora"],
+}
+
+
+def upgrade() -> None:
+    for nombre, columnas in INDICES.items():
+        op.create_index(f"idx_bitacora_{nombre}", "Bitacora_reportes", columnas)
+
+    op.create_table(
+        "Bitacora_reportes_archivo",
+        sa.Column("ID_Bitacora", sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column("Nombre_Administrador", sa.String(255), nullable=True),
+        sa.Column("Detalle", sa.Text(), nullable=True),
+        sa.Column("Actualizacion_Fecha", sa.DateTime(), nullable=False),
+        sa.Column("ID_Estado_Actual", sa.Integer(), nullable=True),
+        sa.Column("ID_Reporte", sa.Integer(), nullable=True),
+        sa.Column("RUT", sa.BIGINT(), nullable=True),
+        sa.Column("Archivado", sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        sa.PrimaryKeyConstraint("ID_Bitacora"),
+    )
+    for nombre, columnas in INDICES.items():
+        op.create_index(f"idx_bitacora_archivo_{nombre}", "Bitacora_reportes_archivo", columnas)
+
+
+def downgrade() -> None:
+    op.drop_table("Bitacora_reportes_archivo")
+    for nombre in INDICES:
+        op.drop_index(f"idx_bitacora_{nombre}", table_name="Bitacora_reportes")
@@ -0,0 +1,149 @@
+"""Índice único en Estado_transicion y validación de transición una sola vez
+
+fn_transicion_valida buscaba (Estado_Desde, Estado_Hacia) sin índice y el
+trigger trg_reportes_before_update_estado repetía la misma búsqueda que ya
+había hecho sp_cambiar_estado_reporte. Ahora el procedimiento marca la
+conexión con @sigra_transicion_validada antes del UPDATE y el trigger solo
+valida los UPDATE que no vienen del procedimiento.
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-18
+"""
+from alembic import op
+
+revision = "0007"
+down_revision = "0006"
+branch_labels = None
+depends_on = None
+
+# Deja una fila por par (la de menor ID); la tabla derivada evita el error
+# 1093 de MySQL por leer la misma tabla que se borra
+QUITAR_REPETIDOS = """
+DELETE FROM Estado_transicion
+WHERE ID_Transicion NOT IN (
+    SELECT ID_Transicion FROM (
+        SELECT MIN(ID_Transicion) AS ID_Transicion
+        FROM Estado_transicion
+        GROUP BY Estado_Desde, Estado_Hacia
+    ) AS primeras
+)
+"""
+
+TRG_UPDATE_ESTADO = """
+CREATE TRIGGER trg_reportes_before_update_estado
+BEFORE UPDATE ON Reportes
+FOR EACH ROW
+BEGIN
+    IF NEW.UUID_Cliente <> OLD.UUID_Cliente THEN
+        SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = 'UUID_Cliente no puede ser modificado.';
+    END IF;
+    -- sp_cambiar_estado_reporte ya validó la transición y lo avisa con
+    -- @sigra_transicion_validada; un UPDATE directo sí se valida aquí
+    IF NEW.ID_Estado_Actual <> OLD.ID_Estado_Actual AND @sigra_transicion_validada IS NULL THEN
+        IF fn_transicion_valida(OLD.ID_Estado_Actual, NEW.ID_Estado_Actual) = 0 THEN
+            SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = 'Transición de estado no permitida.';
+        END IF;
+    END IF;
+END
+"""
+
+TRG_UPDATE_ESTADO_ANTERIOR = """
+CREATE TRIGGER trg_reportes_before_update_estado
+BEFORE UPDATE ON Reportes
+FOR EACH ROW
+BEGIN
+    IF NEW.UUID_Cliente <> OLD.UUID_Cliente THEN
+        SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = 'UUID_Cliente no puede ser modificado.';
+    END IF;
+    IF NEW.ID_Estado_Actual <> OLD.ID_Estado_Actual THEN
+        IF fn_transicion_valida(OLD.ID_Estado_Actual, NEW.ID_Estado_Actual) = 0 THEN
+            SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = 'Transición de estado no permitida.';
+        END IF;
+    END IF;
+END
+"""
+
+SP_CAMBIAR_ESTADO = """
+CREATE PROCEDURE sp_cambiar_estado_reporte(
+    IN p_id_reporte INT,
+    IN p_nuevo_estado INT,
+    IN p_nombre_administrador VARCHAR(255),
+    IN p_detalle TEXT,
+    IN p_rut BIGINT
+)
+BEGIN
+    DECLARE v_estado_actual INT;
+    -- Si algo falla no dejar la variable puesta en la conexión (vuelve al pool)
+    DECLARE EXIT HANDLER FOR SQLEXCEPTION
+    BEGIN
+        SET @sigra_transicion_validada = NULL;
+        RESIGNAL;
+    END;
+    -- Obtener estado actual
+    SELECT ID_Estado_Actual INTO v_estado_actual FROM Reportes WHERE ID_Reporte = p_id_reporte;
+    IF v_estado_actual IS NULL THEN
+        SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = 'Reporte no encontrado.';
+    END IF;
+    -- Validar transicion
+    IF fn_transicion_valida(v_estado_actual, p_nuevo_estado) = 0 THEN
+        SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = 'Transición de estado no permitida.';
+    END IF;
+    -- Actualizar estado (el trigger no repite la validación)
+    SET @sigra_transicion_validada = 1;
+    UPDATE Reportes SET ID_Estado_Actual = p_nuevo_estado WHERE ID_Reporte = p_id_reporte;
+    SET @sigra_transicion_validada = NULL;
+    -- Registrar en bitacora
+    INSERT INTO Bitacora_reportes (Nombre_Administrador, Detalle, Actualizacion_Fecha, ID_Reporte, ID_Estado_Actual, RUT)
+    VALUES (p_nombre_administrador, COALESCE(p_detalle, CONCAT('Cambio de estado ',v_estado_actual, ' -> ',p_nuevo_estado)), CURRENT_TIMESTAMP, p_id_reporte, p_nuevo_estado, p_rut);
+    COMMIT;
+END
+"""
+
+SP_CAMBIAR_ESTADO_ANTERIOR = """
+CREATE PROCEDURE sp_cambiar_estado_reporte(
+    IN p_id_reporte INT,
+    IN p_nuevo_estado INT,
+    IN p_nombre_administrador VARCHAR(255),
+    IN p_detalle TEXT,
+    IN p_rut BIGINT
+)
+BEGIN
+    DECLARE v_estado_actual INT;
+    SELECT ID_Estado_Actual INTO v_estado_actual FROM Reportes WHERE ID_Reporte = p_id_reporte;
+    IF v_estado_actual IS NULL THEN
+        SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = 'Reporte no encontrado.';
+    END IF;
+    IF fn_transicion_valida(v_estado_actual, p_nuevo_estado) = 0 THEN
+        SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = 'Transición de estado no permitida.';
+    END IF;
+    UPDATE Reportes SET ID_Estado_Actual = p_nuevo_estado WHERE ID_Reporte = p_id_reporte;
+    INSERT INTO Bitacora_reportes (Nombre_Administrador, Detalle, Actualizacion_Fecha, ID_Reporte, ID_Estado_Actual, RUT)
+    VALUES (p_nombre_administrador, COALESCE(p_detalle, CONCAT('Cambio de estado ',v_estado_actual, ' -> ',p_nuevo_estado)), CURRENT_TIMESTAMP, p_id_reporte, p_nuevo_estado, p_rut);
+    COMMIT;
+END
+"""
+
+
+def _reemplazar_rutinas(trigger: str, procedimiento: str) -> None:
+    op.execute("DROP TRIGGER IF EXISTS trg_reportes_before_update_estado")
+    op.execute(trigger)
+    op.execute("DROP PROCEDURE IF EXISTS sp_cambiar_estado_reporte")
+    op.execute(procedimiento)
+
+
+def upgrade() -> None:
+    op.execute(QUITAR_REPETIDOS)
+    op.create_index("uq_estado_transicion", "Estado_transicion", ["Estado_Desde", "Estado_Hacia"], unique=True)
+
+    if op.get_context().dialect.name == "mysql":
+        _reemplazar_rutinas(TRG_UPDATE_ESTADO, SP_CAMBIAR_ESTADO)
+
+
+def downgrade() -> None:
+    if op.get_context().dialect.name == "mysql":
+        _reemplazar_rutinas(TRG_UPDATE_ESTADO_ANTERIOR, SP_CAMBIAR_ESTADO_ANTERIOR)
+        # MySQL borró el índice implícito de la FK de Estado_Desde al crear el
+        # único (le sirve a la FK): sin otro índice no deja borrarlo
+        op.create_index("idx_estado_transicion_desde", "Estado_transicion", ["Estado_Desde"])
+    op.drop_index("uq_estado_transicion", table_name="Estado_transicion")
@@ -0,0 +1,162 @@
+"""
+Benchmark: nombres de catálogos con JOIN vs. diccionario en memoria.
+
+Arma una BD SQLite con N reportes (por defecto 1.000.000) y los catálogos,
+y compara para una página del listado (LIMIT 50 por el índice de
+Hora_Creado) y para una lectura larga tipo exportación (LIMIT 100.000):
+
+    join:    LEFT JOIN Areas/Severidad/Estado_reportes/Usuarios en SQL
+    lookup:  solo Reportes + Usuarios, nombres desde dicts en Python
+
+Muestra también el plan de cada consulta (EXPLAIN QUERY PLAN). Solo usa la
+biblioteca estándar; la BD queda en --db para no regenerarla cada vez.
+
+Uso:
+    python benchmarks/bench_catalogos_join.py [--filas 1000000] [--db /tmp/bench_reportes.db]
+"""
+import argparse
+import os
+import random
+import sqlite3
+import time
+from datetime import datetime, timedelta
+
+COLUMNAS = """
+    r.ID_Reporte, r.Titulo, r.Descripcion, r.Fecha_Reporte, r.Hora_Creado,
+    r.Hora_Sincronizado, r.RUT, r.ID_Severidad, r.ID_Area, r.ID_Estado_Actual
+"""
+
+SQL_JOIN = f"""
+    SELECT {COLUMNAS},
+        a.Nombre_Area, s.Nombre_Severidad, e.Nombre_Estado,
+        u.Nombre || ' ' || u.Apellido_1 AS Nombre_Usuario
+    FROM Reportes r
+    LEFT JOIN Areas a ON r.ID_Area = a.ID_Area
+    LEFT JOIN Severidad s ON r.ID_Severidad = s.ID_Severidad
+    LEFT JOIN Estado_reportes e ON r.ID_Estado_Actual = e.ID_Estado_Actual
+    LEFT JOIN Usuarios u ON r.RUT = u.RUT
+    ORDER BY r.Hora_Creado DESC, r.ID_Reporte DESC
+    LIMIT ?
+"""
+
+SQL_LOOKUP = f"""
+    SELECT {COLUMNAS},
+        u.Nombre || ' ' || u.Apellido_1 AS Nombre_Usuario
+    FROM Reportes r
+    LEFT JOIN Usuarios u ON r.RUT = u.RUT
+    ORDER BY r.Hora_Creado DESC, r.ID_Reporte DESC
+    LIMIT ?
+"""
+
+
+def crear_bd(ruta, filas):
+    if os.path.exists(ruta):
+        os.remove(ruta)
+    con = sqlite3.connect(ruta)
+    con.executescript("""
+        CREATE TABLE Areas (ID_Area INTEGER PRIMARY KEY, Nombre_Area TEXT NOT NULL);
+        CREATE TABLE Severidad (ID_Severidad INTEGER PRIMARY KEY, Nombre_Severidad TEXT NOT NULL);
+        CREATE TABLE Estado_reportes (ID_Estado_Actual INTEGER PRIMARY KEY, Nombre_Estado TEXT NOT NULL);
+        CREATE TABLE Usuarios (RUT INTEGER PRIMARY KEY, Nombre TEXT, Apellido_1 TEXT);
+        CREATE TABLE Reportes (
+            ID_Reporte INTEGER PRIMARY KEY, Titulo TEXT, Descripcion TEXT, Fecha_Reporte TEXT,
+            Hora_Creado TEXT NOT NULL, Hora_Sincronizado TEXT, RUT INTEGER,
+            ID_Severidad INTEGER, ID_Area INTEGER, ID_Estado_Actual INTEGER
+        );
+    """)
+    con.executemany("INSERT INTO Areas VALUES (?, ?)", [(i, f"Área {i}") for i in range(1, 21)])
+    con.executemany("INSERT INTO Severidad VALUES (?, ?)", [(i, n) for i, n in enumerate(["Baja", "Media", "Alta", "Crítica"], 1)])
+    con.executemany("INSERT INTO Estado_reportes VALUES (?, ?)", [(i, n) for i, n in enumerate(["Pendiente", "Aprobado", "Rechazado"], 1)])
+    ruts = list(range(10_000_000, 10_000_500))
+    con.executemany("INSERT INTO Usuarios VALUES (?, ?, ?)", [(rut, "Nombre", f"Apellido{rut % 97}") for rut in ruts])
+
+    rnd = random.Random(42)
+    base = datetime(2023, 1, 1)
+    lote = []
+    for i in range(1, filas + 1):
+        creado = base + timedelta(seconds=i * 60)
+        lote.append((
+            i, f"Reporte {i}", "Descripción del incidente " * 3, creado.date().isoformat(),
+            creado.isoformat(sep=" "), None, rnd.choice(ruts), rnd.randint(1, 4), rnd.randint(1, 20), rnd.randint(1, 3),
+        ))
+        if len(lote) == 50_000:
+            con.executemany("INSERT INTO Reportes VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", lote)
+            lote.clear()
+    if lote:
+        con.executemany("INSERT INTO Reportes VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", lote)
+    con.execute("CREATE INDEX idx_reportes_creado ON Reportes (Hora_Creado, ID_Reporte)")
+    con.commit()
+    con.execute("ANALYZE")
+    return con
+
+
+def leer_join(con, limite):
+    cur = con.execute(SQL_JOIN, (limite,))
+    columnas = [c[0] for c in cur.description]
+    return [dict(zip(columnas, fila)) for fila in cur]
+
+
+def leer_lookup(con, limite, mapas):
+    cur = con.execute(SQL_LOOKUP, (limite,))
+    columnas = [c[0] for c in cur.description]
+    filas = []
+    for fila in cur:
+        fila = dict(zip(columnas, fila))
+        for id_col, nombre_col, mapa in mapas:
+            fila[nombre_col] = mapa.get(fila[id_col])
+        filas.append(fila)
+    return filas
+
+
+def cargar_mapas(con):
+    # Lo mismo que hace CatalogNames en crud/catalogos.py
+    return [
+        ("ID_Area", "Nombre_Area", dict(con.execute("SELECT ID_Area, Nombre_Area FROM Areas"))),
+        ("ID_Severidad", "Nombre_Severidad", dict(con.execute("SELECT ID_Severidad, Nombre_Severidad FROM Severidad"))),
+        ("ID_Estado_Actual", "Nombre_Estado", dict(con.execute("SELECT ID_Estado_Actual, Nombre_Estado FROM Estado_reportes"))),
+    ]
+
+
+def medir(fn, repeticiones):
+    fn()  # calentar cache de páginas
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        fn()
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+    tiempos.sort()
+    return tiempos[len(tiempos) // 2]
+
+
+def plan(con, sql, limite):
+    return [fila[-1] for fila in con.execute(f"EXPLAIN QUERY PLAN {sql}", (limite,))]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--filas", type=int, default=1_000_000)
+    parser.add_argument("--db", default="/tmp/bench_reportes.db")
+    parser.add_argument("--regenerar", action="store_true", help="Volver a crear la BD aunque exista")
+    args = parser.parse_args()
+
+    if args.regenerar or not os.path.exists(args.db):
+        inicio = time.perf_counter()
+        con = crear_bd(args.db, args.filas)
+        print(f"BD con {args.filas} reportes creada en {time.perf_counter() - inicio:.1f} s")
+    else:
+        con = sqlite3.connect(args.db)
+    total = con.execute("SELECT COUNT(*) FROM Reportes").fetchone()[0]
+    print(f"{total} reportes en {args.db}\n")
+
+    mapas = cargar_mapas(con)
+    for nombre, sql in (("join", SQL_JOIN), ("lookup", SQL_LOOKUP)):
+        print(f"plan {nombre}:")
+        for paso in plan(con, sql, 50):
+            print(f"    {paso}")
+    print()
+
+    for limite, repeticiones in ((50, 200), (100_000, 5)):
+        assert leer_join(con, limite) == leer_lookup(con, limite, mapas), "los dos caminos deben devolver lo mismo"
+        t_join = medir(lambda: leer_join(con, limite), repeticiones)
+        t_lookup = medir(lambda: leer_lookup(con, limite, mapas), repeticiones)
+        print(f"LIMIT {limite:<7} join={t_join:9.2f} ms  lookup={t_lookup:9.2f} ms  ({t_join / t_lookup:.2f}x)")
@@ -0,0 +1,132 @@
+"""
+Bytes en la red con y sin gzip para el tráfico de sincronización.
+
+Arma un corpus parecido al real (descripciones de largo variable armadas
+con frases de reportes de faena, nombres y catálogos repetidos) y mide,
+para cada tipo de cuerpo:
+
+    pagina_50:    GET /reportes/?limit=50 (ReportePage)
+    pagina_200:   GET /reportes/?limit=200
+    lote_100:     POST /sync/batch con 100 reportes (cuerpo de la petición)
+    reporte_1:    POST /reportes/ con un solo reporte
+
+el tamaño sin comprimir, con gzip nivel 1, 6 y 9, y el tiempo de CPU de
+comprimir. Los cuerpos bajo GZIP_MIN_BYTES el middleware los manda tal cual.
+Las frases salen de una lista corta, así que la razón con datos reales
+será algo peor; sirve para comparar niveles y ver el orden de magnitud.
+
+Uso:
+    DATABASE_URL=sqlite:///x.db SECRET_KEY=x python benchmarks/bench_compresion.py [--semilla 7]
+"""
+import argparse
+import gzip
+import json
+import os
+import random
+import sys
+import time
+import uuid
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import settings
+from crud.reportes import reporte_page_adapter
+
+FRASES = [
+    "Se detecta derrame de aceite hidráulico en la pala 04.",
+    "Trabajador sin casco en el sector de chancado primario.",
+    "Correa transportadora CV-12 presenta desalineamiento y ruido anómalo.",
+    "Se aísla la zona y se informa al supervisor de turno.",
+    "Camión de extracción detenido por falla en el sistema de frenos.",
+    "Polvo en suspensión sobre el límite en el acceso a la rampa norte.",
+    "Baranda de pasarela suelta en el nivel 3 de la planta concentradora.",
+    "Se realiza bloqueo y etiquetado antes de la intervención.",
+    "Fuga de agua en la línea de relaves cerca de la piscina 2.",
+    "Iluminación insuficiente en el frente de carguío durante el turno noche.",
+    "Se solicita evaluación del área por parte de prevención de riesgos.",
+    "Extintor vencido en la sala eléctrica de la subestación.",
+]
+AREAS = ["Chancado", "Molienda", "Flotación", "Rajo", "Mantención", "Relaves", "Transporte"]
+SEVERIDADES = ["Baja", "Media", "Alta", "Crítica"]
+ESTADOS = ["Pendiente", "En revisión", "Aprobado", "Rechazado"]
+NOMBRES = ["Juan Pérez", "María González", "Pedro Muñoz", "Camila Rojas", "Luis Soto", "Valentina Díaz"]
+
+
+def descripcion(rnd):
+    # Mayoría de descripciones cortas, algunas largas (el TEXT no tiene tope)
+    return " ".join(rnd.choice(FRASES) for _ in range(rnd.choice([1, 1, 2, 2, 3, 5, 12])))
+
+
+def filas(rnd, n):
+    base = datetime(2025, 6, 1, 8, 0, 0)
+    resultado = []
+    for i in range(n):
+        creado = base + timedelta(minutes=rnd.randint(0, 200_000))
+        id_area, id_sev, id_est = rnd.randint(1, 7), rnd.randint(1, 4), rnd.randint(1, 4)
+        resultado.append({
+            "ID_Reporte": 100_000 + i,
+            "Titulo": rnd.choice(FRASES)[:40],
+            "Descripcion": descripcion(rnd),
+            "Fecha_Reporte": creado.date(),
+            "Hora_Creado": creado,
+            "Hora_Sincronizado": creado + timedelta(seconds=rnd.randint(5, 7200)),
+            "RUT": rnd.randint(10_000_000, 25_000_000),
+            "ID_Severidad": id_sev,
+            "ID_Area": id_area,
+            "ID_Estado_Actual": id_est,
+            "Nombre_Area": AREAS[id_area - 1],
+            "Nombre_Severidad": SEVERIDADES[id_sev - 1],
+            "Nombre_Estado": ESTADOS[id_est - 1],
+            "Nombre_Usuario": rnd.choice(NOMBRES),
+        })
+    return resultado
+
+
+def reporte_nuevo(rnd):
+    # Lo que manda la app (ver syncReportsService.ts)
+    u = str(uuid.UUID(int=rnd.getrandbits(128), version=4))
+    return {
+        "titulo": rnd.choice(FRASES)[:40],
+        "descripcion": descripcion(rnd),
+        "fecha_reporte": (date(2025, 6, 1) + timedelta(days=rnd.randint(0, 120))).isoformat(),
+        "uuid_cliente": u,
+        "peticion_idempotencia": f"mobile-{u}",
+        "id_severidad": rnd.randint(1, 4),
+        "id_area": rnd.randint(1, 7),
+        "id_estado_actual": 1,
+        "rut": rnd.randint(10_000_000, 25_000_000),
+    }
+
+
+def corpus(rnd):
+    return {
+        "pagina_50": reporte_page_adapter.dump_json({"items": filas(rnd, 50), "next_cursor": "x" * 40}),
+        "pagina_200": reporte_page_adapter.dump_json({"items": filas(rnd, 200), "next_cursor": "x" * 40}),
+        "lote_100": json.dumps({"reportes": [reporte_nuevo(rnd) for _ in range(100)]}, ensure_ascii=False).encode(),
+        "reporte_1": json.dumps(reporte_nuevo(rnd), ensure_ascii=False).encode(),
+    }
+
+
+def comprimir(cuerpo, nivel, repeticiones=50):
+    inicio = time.process_time()
+    for _ in range(repeticiones):
+        comprimido = gzip.compress(cuerpo, compresslevel=nivel)
+    return len(comprimido), (time.process_time() - inicio) * 1000 / repeticiones
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--semilla", type=int, default=7)
+    args = parser.parse_args()
+
+    rnd = random.Random(args.semilla)
+    print(f"GZIP_MIN_BYTES={settings.GZIP_MIN_BYTES}  GZIP_NIVEL={settings.GZIP_NIVEL}\n")
+    print(f"{'cuerpo':<12}{'sin gzip':>10}" + "".join(f"{f'nivel {n}':>22}" for n in (1, 6, 9)))
+    for nombre, cuerpo in corpus(rnd).items():
+        columnas = []
+        for nivel in (1, 6, 9):
+            tamano, ms = comprimir(cuerpo, nivel)
+            columnas.append(f"{tamano:>8} B {tamano / len(cuerpo):4.0%} {ms:5.2f}ms")
+        nota = "" if len(cuerpo) >= settings.GZIP_MIN_BYTES else "  (bajo el mínimo: no se comprime)"
+        print(f"{nombre:<12}{len(cuerpo):>8} B" + "".join(f"{c:>22}" for c in columnas) + nota)
@@ -0,0 +1,62 @@
+"""
+Benchmark de throughput con requests concurrentes contra un solo worker.
+
+Lanza `--total` GET a `--path` con `--concurrencia` requests en vuelo y
+reporta requests por segundo y percentiles de latencia. Sirve para comparar
+la capa de BD sync (commit anterior a get_async_db) con la async:
+
+    uvicorn main:app --workers 1
+    python benchmarks/bench_concurrencia.py --token <jwt> --path /reportes/ --concurrencia 50
+
+Con la capa sync, más requests en vuelo que conexiones del pool (5 + 10 por
+defecto) dejan el event loop esperando una conexión y las requests terminan
+en timeout: para comparar ambas capas usar --concurrencia 15 o menos, y
+mayor para ver cómo sigue la async.
+
+Requiere httpx (pip install httpx), no es dependencia del backend.
+"""
+import argparse
+import asyncio
+import time
+
+import httpx
+
+from bench_login import resumen
+
+
+async def worker(client, path, pendientes, tiempos, codigos):
+    while pendientes:
+        pendientes.pop()
+        inicio = time.perf_counter()
+        resp = await client.get(path)
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+        codigos[resp.status_code] = codigos.get(resp.status_code, 0) + 1
+
+
+async def main(args):
+    headers = {"Authorization": f"Bearer {args.token}"} if args.token else {}
+    limites = httpx.Limits(max_connections=args.concurrencia)
+    async with httpx.AsyncClient(base_url=args.url, headers=headers, limits=limites, timeout=120) as client:
+        pendientes = list(range(args.total))
+        tiempos, codigos = [], {}
+        inicio = time.perf_counter()
+        await asyncio.gather(*[
+            worker(client, args.path, pendientes, tiempos, codigos)
+            for _ in range(args.concurrencia)
+        ])
+        total = time.perf_counter() - inicio
+
+    print(f"{args.total} GET {args.path} con {args.concurrencia} concurrentes en {total:.2f} s "
+          f"-> {args.total / total:.1f} req/s")
+    print(f"códigos de respuesta: {codigos}")
+    resumen("GET", tiempos)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--path", default="/reportes/")
+    parser.add_argument("--token", help="JWT de un administrador")
+    parser.add_argument("--concurrencia", type=int, default=50)
+    parser.add_argument("--total", type=int, default=2000)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,100 @@
+"""
+Benchmark de /auth/login con muchos logins concurrentes.
+
+Mide la latencia de los logins y, en paralelo, la de GET / (una ruta que no
+hace nada) para ver cuánto se bloquea el event loop mientras bcrypt trabaja.
+
+Uso (con el servidor corriendo con un solo worker):
+
+    # Antes: bcrypt dentro del event loop
+    HASH_POOL_WORKERS=0 uvicorn main:app --workers 1
+    python benchmarks/bench_login.py --rut 21232263 --password <clave>
+
+    # Después: bcrypt en el pool
+    uvicorn main:app --workers 1
+    python benchmarks/bench_login.py --rut 21232263 --password <clave>
+
+Para comparar con commits anteriores a la capa async de BD usar pocos
+logins simultáneos y varias rondas: --concurrencia 10 --rondas 10.
+
+Requiere httpx (pip install httpx), no es dependencia del backend.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+
+
+def percentil(valores, p):
+    if not valores:
+        return float("nan")
+    ordenados = sorted(valores)
+    k = min(len(ordenados) - 1, int(round(p / 100 * (len(ordenados) - 1))))
+    return ordenados[k]
+
+
+def resumen(nombre, tiempos_ms):
+    print(
+        f"{nombre:<8} n={len(tiempos_ms):<5} "
+        f"p50={percentil(tiempos_ms, 50):8.1f} ms  "
+        f"p95={percentil(tiempos_ms, 95):8.1f} ms  "
+        f"p99={percentil(tiempos_ms, 99):8.1f} ms  "
+        f"max={max(tiempos_ms, default=float('nan')):8.1f} ms"
+    )
+
+
+async def un_login(client, rut, password, tiempos, codigos):
+    inicio = time.perf_counter()
+    resp = await client.post("/auth/login", json={"RUT": rut, "password": password})
+    tiempos.append((time.perf_counter() - inicio) * 1000)
+    codigos[resp.status_code] = codigos.get(resp.status_code, 0) + 1
+
+
+async def pings(client, detener, tiempos):
+    while not detener.is_set():
+        inicio = time.perf_counter()
+        await client.get("/")
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+        await asyncio.sleep(0.01)
+
+
+async def main(args):
+    limites = httpx.Limits(max_connections=args.concurrencia + 10)
+    async with httpx.AsyncClient(base_url=args.url, limits=limites, timeout=120) as client:
+        tiempos_login, tiempos_ping, codigos = [], [], {}
+        detener = asyncio.Event()
+        tarea_ping = asyncio.create_task(pings(client, detener, tiempos_ping))
+
+        inicio = time.perf_counter()
+        for _ in range(args.rondas):
+            await asyncio.gather(*[
+                un_login(client, args.rut, args.password, tiempos_login, codigos)
+                for _ in range(args.concurrencia)
+            ])
+        total = time.perf_counter() - inicio
+
+        detener.set()
+        await tarea_ping
+
+    n = args.concurrencia * args.rondas
+    print(f"{args.rondas} x {args.concurrencia} logins concurrentes en {total:.2f} s ({n / total:.1f} logins/s)")
+    print(f"códigos de respuesta: {codigos}")
+    resumen("login", tiempos_login)
+    resumen("ping", tiempos_ping)
+    if tiempos_ping:
+        print(f"ping medio: {statistics.mean(tiempos_ping):.1f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--rut", type=int, required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--concurrencia", type=int, default=200)
+    # Varias rondas de pocos logins: el código anterior a la capa async usa
+    # sesiones sync dentro del event loop y con más logins simultáneos que
+    # conexiones del pool (5 + 10) se queda esperando una conexión
+    parser.add_argument("--rondas", type=int, default=1)
+    asyncio.run(main(parser.parse_args()))
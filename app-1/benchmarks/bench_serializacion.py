@@ -0,0 +1,104 @@
+"""
+Microbenchmark de la serialización de una página de reportes.
+
+Compara el camino anterior (dict armado campo a campo con str() en las
+fechas, validado contra response_model y codificado con jsonable_encoder +
+json.dumps) con el actual (filas tal cual -> TypeAdapter.dump_json).
+Mide tiempo de CPU por respuesta, sin BD ni red.
+
+Uso:
+    DATABASE_URL=sqlite:///x.db SECRET_KEY=x python benchmarks/bench_serializacion.py [--filas 10000]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import date, datetime, timedelta
+from typing import List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+from crud.reportes import reporte_page_adapter
+
+
+def filas_de_prueba(n):
+    base = datetime(2025, 1, 1, 8, 0, 0)
+    return [
+        {
+            "ID_Reporte": i,
+            "Titulo": f"Reporte {i}",
+            "Descripcion": "Derrame menor en correa transportadora, se aísla la zona",
+            "Fecha_Reporte": date(2025, 1, 1) + timedelta(days=i % 365),
+            "Hora_Creado": base + timedelta(minutes=i),
+            "Hora_Sincronizado": base + timedelta(minutes=i, seconds=30),
+            "RUT": 21232263,
+            "ID_Severidad": i % 4 + 1,
+            "ID_Area": i % 7 + 1,
+            "ID_Estado_Actual": i % 3 + 1,
+            "Nombre_Area": "Chancado",
+            "Nombre_Severidad": "Alta",
+            "Nombre_Estado": "Pendiente",
+            "Nombre_Usuario": "Juan Pérez",
+        }
+        for i in range(n)
+    ]
+
+
+# Validación que hacía FastAPI con response_model=List[dict]
+lista_dict_adapter = TypeAdapter(List[dict])
+
+
+def antes(filas):
+    items = []
+    for r in filas:
+        items.append({
+            "ID_Reporte": r["ID_Reporte"],
+            "Titulo": r["Titulo"],
+            "Descripcion": r["Descripcion"],
+            "Fecha_Reporte": str(r["Fecha_Reporte"]) if r["Fecha_Reporte"] else None,
+            "Hora_Creado": str(r["Hora_Creado"]) if r["Hora_Creado"] else None,
+            "Hora_Sincronizado": str(r["Hora_Sincronizado"]) if r["Hora_Sincronizado"] else None,
+            "RUT": r["RUT"],
+            "ID_Severidad": r["ID_Severidad"],
+            "ID_Area": r["ID_Area"],
+            "ID_Estado_Actual": r["ID_Estado_Actual"],
+            "Nombre_Area": r["Nombre_Area"],
+            "Nombre_Severidad": r["Nombre_Severidad"],
+            "Nombre_Estado": r["Nombre_Estado"],
+            "Nombre_Usuario": r["Nombre_Usuario"],
+        })
+    validados = lista_dict_adapter.validate_python(items)
+    return json.dumps(jsonable_encoder(validados), ensure_ascii=False).encode("utf-8")
+
+
+def despues(filas):
+    return reporte_page_adapter.dump_json({"items": [dict(r) for r in filas], "next_cursor": None})
+
+
+def medir(nombre, fn, filas, repeticiones):
+    fn(filas)  # calentar
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.process_time()
+        cuerpo = fn(filas)
+        tiempos.append((time.process_time() - inicio) * 1000)
+    tiempos.sort()
+    print(f"{nombre:<8} mediana={tiempos[len(tiempos) // 2]:8.1f} ms CPU  min={tiempos[0]:8.1f} ms  {len(cuerpo) / 1024:8.0f} KiB")
+    return tiempos[len(tiempos) // 2]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--filas", type=int, default=10_000)
+    parser.add_argument("--repeticiones", type=int, default=20)
+    args = parser.parse_args()
+
+    filas = filas_de_prueba(args.filas)
+    print(f"{args.filas} filas, {args.repeticiones} repeticiones")
+    t_antes = medir("antes", antes, filas, args.repeticiones)
+    t_despues = medir("después", despues, filas, args.repeticiones)
+    print(f"{t_antes / t_despues:.1f}x menos CPU por respuesta")
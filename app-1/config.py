@@ -6,4 +6,63 @@ load_dotenv()
 class Settings:
     DB_URL = os.getenv("DATABASE_URL", "sqlite:///./offline.db")
 
+    # Pool de conexiones (se aplica al motor sync y al async)
+    DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+    DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+    DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "10"))  # segundos esperando una conexión libre
+    DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))  # bajo el wait_timeout de MySQL
+    DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+
+    # Cache de usuarios autenticados (get_current_user)
+    PRINCIPAL_CACHE_TTL = float(os.getenv("PRINCIPAL_CACHE_TTL", "60"))  # segundos, 0 = desactivado
+    PRINCIPAL_CACHE_MAX = int(os.getenv("PRINCIPAL_CACHE_MAX", "10000"))
+    # Cada cuánto se recargan las versiones de token revocadas (otros procesos)
+    TOKEN_VERSION_REFRESH = float(os.getenv("TOKEN_VERSION_REFRESH", "30"))
+
+    # Costo de bcrypt (2^rounds iteraciones); calibrar con `python hash.py --calibrar`
+    BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+
+    # Pool para bcrypt (hash/verificación fuera del event loop)
+    HASH_POOL_TIPO = os.getenv("HASH_POOL_TIPO", "thread")  # "thread" o "process"
+    HASH_POOL_WORKERS = int(os.getenv("HASH_POOL_WORKERS", str(os.cpu_count() or 1)))  # 0 = en el event loop
+    HASH_POOL_MAX_COLA = int(os.getenv("HASH_POOL_MAX_COLA", "100"))  # tareas en espera antes de responder 503
+    HASH_POOL_RETRY_AFTER = int(os.getenv("HASH_POOL_RETRY_AFTER", "2"))  # segundos sugeridos al cliente
+
+    # Máximo de usuarios por POST /auth/usuarios/bulk
+    USUARIOS_LOTE_MAX = int(os.getenv("USUARIOS_LOTE_MAX", "1000"))
+    # Máximo de reportes por POST /sync/batch
+    SYNC_LOTE_MAX = int(os.getenv("SYNC_LOTE_MAX", "500"))
+
+    # Límite de intentos de /auth/login (token bucket, 0 = sin límite)
+    LOGIN_LIMITE_RUT_RAFAGA = int(os.getenv("LOGIN_LIMITE_RUT_RAFAGA", "5"))
+    LOGIN_LIMITE_RUT_POR_MINUTO = float(os.getenv("LOGIN_LIMITE_RUT_POR_MINUTO", "5"))
+    LOGIN_LIMITE_IP_RAFAGA = int(os.getenv("LOGIN_LIMITE_IP_RAFAGA", "30"))
+    LOGIN_LIMITE_IP_POR_MINUTO = float(os.getenv("LOGIN_LIMITE_IP_POR_MINUTO", "60"))
+
+    # Segundos entre recargas de los catálogos en memoria (0 = solo al iniciar o a mano)
+    CATALOGOS_TTL = float(os.getenv("CATALOGOS_TTL", "3600"))
+
+    # Respuestas guardadas por Idempotency-Key (horas que se respetan y cuántas en memoria)
+    IDEMPOTENCIA_TTL_HORAS = float(os.getenv("IDEMPOTENCIA_TTL_HORAS", "24"))
+    IDEMPOTENCIA_CACHE_MAX = int(os.getenv("IDEMPOTENCIA_CACHE_MAX", "10000"))
+
+    # Compresión gzip: respuestas desde GZIP_MIN_BYTES (nivel 1-9) y cuerpos de petición
+    GZIP_MIN_BYTES = int(os.getenv("GZIP_MIN_BYTES", "1000"))
+    GZIP_NIVEL = int(os.getenv("GZIP_NIVEL", "6"))
+    GZIP_PETICION_MAX = int(os.getenv("GZIP_PETICION_MAX", str(10 * 1024 * 1024)))
+
+    # Archivos multimedia (fotos/videos de los reportes), guardados por su sha256
+    MEDIA_DIR = os.getenv("MEDIA_DIR", "media")
+    MEDIA_MAX_BYTES = int(os.getenv("MEDIA_MAX_BYTES", str(100 * 1024 * 1024)))
+    MEDIA_CHUNK_BYTES = int(os.getenv("MEDIA_CHUNK_BYTES", str(1024 * 1024)))
+    # Subida por partes: tamaño de cada parte, horas sin actividad para borrar una sesión y cada cuánto revisar
+    MEDIA_PARTE_BYTES = int(os.getenv("MEDIA_PARTE_BYTES", str(5 * 1024 * 1024)))
+    MEDIA_SESION_HORAS = float(os.getenv("MEDIA_SESION_HORAS", "24"))
+    MEDIA_LIMPIEZA_MINUTOS = float(os.getenv("MEDIA_LIMPIEZA_MINUTOS", "60"))
+
+    # Bitácora: días que quedan en Bitacora_reportes antes de pasar al archivo (0 = no archivar)
+    BITACORA_ARCHIVO_DIAS = float(os.getenv("BITACORA_ARCHIVO_DIAS", "180"))
+    BITACORA_ARCHIVO_LOTE = int(os.getenv("BITACORA_ARCHIVO_LOTE", "1000"))
+    BITACORA_ARCHIVO_MINUTOS = float(os.getenv("BITACORA_ARCHIVO_MINUTOS", "60"))
+
 settings = Settings()
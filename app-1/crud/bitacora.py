@@ -0,0 +1,199 @@
+# app-1/crud/bitacora.py
+import asyncio
+import time
+from datetime import date, datetime, timedelta
+from typing import Optional
+
+from fastapi import Query
+from pydantic import TypeAdapter
+from sqlalchemy import delete, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config import settings
+from crud.catalogos import catalogos_cache
+from crud.reportes import decode_cursor, encode_cursor, typed_text
+from database import AsyncSessionLocal
+from esquemas.reportes import BitacoraPage, FiltrosBitacora
+from modulos.modelosORM import Bitacora_reportes, Bitacora_reportes_archivo
+
+bitacora_page_adapter = TypeAdapter(BitacoraPage)
+
+COLUMNAS_BITACORA = [
+    "ID_Bitacora", "ID_Reporte", "ID_Estado_Actual", "Nombre_Administrador",
+    "Detalle", "Actualizacion_Fecha", "RUT",
+]
+
+
+def filtros_bitacora(
+    id_reporte: Optional[int] = Query(None),
+    rut: Optional[int] = Query(None, description="RUT de quien hizo el cambio"),
+    desde: Optional[date] = Query(None, description="Cambios desde esta fecha (YYYY-MM-DD)"),
+    hasta: Optional[date] = Query(None, description="Cambios hasta esta fecha, inclusive (YYYY-MM-DD)"),
+) -> FiltrosBitacora:
+    return FiltrosBitacora(id_reporte=id_reporte, rut=rut, desde=desde, hasta=hasta)
+
+
+def where_bitacora(filtros: FiltrosBitacora, cursor: Optional[str] = None) -> tuple[str, dict]:
+    """
+    WHERE sobre el alias `b` (sirve para Bitacora_reportes y para el archivo).
+    Orden (Actualizacion_Fecha DESC, ID_Bitacora DESC), como los índices
+    idx_bitacora_*fecha: cada filtro usa el índice que empieza por esa columna.
+    """
+    condiciones, params = [], {}
+    if filtros.id_reporte is not None:
+        condiciones.append("b.ID_Reporte = :id_reporte")
+        params["id_reporte"] = filtros.id_reporte
+    if filtros.rut is not None:
+        condiciones.append("b.RUT = :rut")
+        params["rut"] = filtros.rut
+    if filtros.desde is not None:
+        condiciones.append("b.Actualizacion_Fecha >= :desde")
+        params["desde"] = datetime.combine(filtros.desde, datetime.min.time())
+    if filtros.hasta is not None:
+        condiciones.append("b.Actualizacion_Fecha < :hasta")
+        params["hasta"] = datetime.combine(filtros.hasta + timedelta(days=1), datetime.min.time())
+    if cursor:
+        c_fecha, c_id = decode_cursor(cursor)
+        condiciones.append(
+            "(b.Actualizacion_Fecha < :c_fecha OR (b.Actualizacion_Fecha = :c_fecha AND b.ID_Bitacora < :c_id))"
+        )
+        params["c_fecha"] = c_fecha
+        params["c_id"] = c_id
+
+    where = ("WHERE " + " AND ".join(condiciones)) if condiciones else ""
+    return where, params
+
+
+def _select_tabla(tabla: str, archivado: int, where: str) -> str:
+    # Cada tabla se lee con su propio ORDER BY + LIMIT (búsqueda en índice) y
+    # después se mezclan: nunca se leen más de 2 * limit filas
+    columnas = ", ".join(f"b.{c}" for c in COLUMNAS_BITACORA)
+    return f"""
+        SELECT * FROM (
+            SELECT {columnas}, {archivado} AS Archivado
+            FROM {tabla} b
+            {where}
+            ORDER BY b.Actualizacion_Fecha DESC, b.ID_Bitacora DESC
+            LIMIT :limit
+        ) AS t{archivado}
+    """
+
+
+def incluye_archivo(filtros: FiltrosBitacora) -> bool:
+    # Todo lo posterior al horizonte sigue en Bitacora_reportes: si la
+    # consulta empieza después, no hace falta mirar el archivo
+    if bitacora_archiver.horizon_days <= 0 or filtros.desde is None:
+        return True
+    horizonte = datetime.now() - timedelta(days=bitacora_archiver.horizon_days)
+    return datetime.combine(filtros.desde, datetime.min.time()) < horizonte
+
+
+async def listar_bitacora(db: AsyncSession, filtros: FiltrosBitacora, cursor: Optional[str], limit: int) -> BitacoraPage:
+    """
+    Página de la bitácora, más nuevo primero, juntando Bitacora_reportes y
+    Bitacora_reportes_archivo (el archivo solo si el rango de fechas lo alcanza).
+    """
+    where, params = where_bitacora(filtros, cursor)
+    params["limit"] = limit + 1
+    partes = [_select_tabla("Bitacora_reportes", 0, where)]
+    if incluye_archivo(filtros):
+        partes.append(_select_tabla("Bitacora_reportes_archivo", 1, where))
+    query = typed_text(f"""
+        {" UNION ALL ".join(partes)}
+        ORDER BY Actualizacion_Fecha DESC, ID_Bitacora DESC
+        LIMIT :limit
+    """, params)
+    filas = (await db.execute(query, params)).mappings().all()
+
+    next_cursor = None
+    if len(filas) > limit:
+        filas = filas[:limit]
+        next_cursor = encode_cursor(filas[-1]["Actualizacion_Fecha"], filas[-1]["ID_Bitacora"])
+
+    names = await catalogos_cache.names()
+    items = []
+    for fila in filas:
+        item = dict(fila)
+        item["Archivado"] = bool(item["Archivado"])
+        item["Nombre_Estado"] = names.get("ID_Estado_Actual", item["ID_Estado_Actual"])
+        items.append(item)
+    return {"items": items, "next_cursor": next_cursor}
+
+
+class BitacoraArchiver:
+    """
+    Mueve las filas de Bitacora_reportes más viejas que `horizon_days` a
+    Bitacora_reportes_archivo, de a `batch_size` por transacción (INSERT ...
+    SELECT + DELETE), para que la tabla viva se mantenga chica.
+
+    Corre como tarea de fondo en cada proceso (lifespan en main.py). El lote
+    se toma con SELECT ... FOR UPDATE SKIP LOCKED, así dos procesos nunca
+    toman las mismas filas. El INSERT es sin IGNORE: si un ID ya está en el
+    archivo falla el lote entero y la fila viva no se borra (queda en
+    `ultimo_error`), nunca se pierde un registro de la bitácora.
+    """
+
+    def __init__(self, horizon_days: float, batch_size: int):
+        self.horizon_days = horizon_days
+        self.batch_size = batch_size
+        self.archived = 0
+        self.runs = 0
+        self.last_run: Optional[float] = None
+        self.last_error: Optional[str] = None
+
+    async def run_once(self) -> int:
+        if self.horizon_days <= 0:
+            return 0
+        limite = datetime.now() - timedelta(days=self.horizon_days)
+        columnas = [getattr(Bitacora_reportes, c) for c in COLUMNAS_BITACORA]
+        movidas = 0
+        async with AsyncSessionLocal() as db:
+            while True:
+                ids = (await db.execute(
+                    select(Bitacora_reportes.ID_Bitacora)
+                    .where(Bitacora_reportes.Actualizacion_Fecha < limite)
+                    .order_by(Bitacora_reportes.Actualizacion_Fecha, Bitacora_reportes.ID_Bitacora)
+                    .limit(self.batch_size)
+                    .with_for_update(skip_locked=True)  # SQLite no tiene FOR UPDATE (bloquea la BD entera)
+                )).scalars().all()
+                if not ids:
+                    break
+                copia = (
+                    insert(Bitacora_reportes_archivo)
+                    .from_select(COLUMNAS_BITACORA, select(*columnas).where(Bitacora_reportes.ID_Bitacora.in_(ids)))
+                )
+                await db.execute(copia)
+                await db.execute(delete(Bitacora_reportes).where(Bitacora_reportes.ID_Bitacora.in_(ids)))
+                await db.commit()
+                movidas += len(ids)
+                if len(ids) < self.batch_size:
+                    break
+        self.archived += movidas
+        self.runs += 1
+        self.last_run = time.time()
+        return movidas
+
+    async def loop(self, interval_seconds: float) -> None:
+        while True:
+            await asyncio.sleep(interval_seconds)
+            try:
+                await self.run_once()
+                self.last_error = None
+            except Exception as e:
+                self.last_error = str(e)
+                print("Error archivando bitácora:", e)
+
+    def stats(self) -> dict:
+        return {
+            "horizonte_dias": self.horizon_days,
+            "ejecuciones": self.runs,
+            "filas_archivadas": self.archived,
+            "ultima_ejecucion": datetime.fromtimestamp(self.last_run).isoformat(timespec="seconds") if self.last_run else None,
+            "ultimo_error": self.last_error,
+        }
+
+
+bitacora_archiver = BitacoraArchiver(
+    horizon_days=settings.BITACORA_ARCHIVO_DIAS,
+    batch_size=settings.BITACORA_ARCHIVO_LOTE,
+)
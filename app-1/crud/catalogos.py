@@ -0,0 +1,307 @@
+# app-1/crud/catalogos.py
+import asyncio
+import gzip
+import hashlib
+import time
+from typing import Optional
+
+from fastapi import Request, Response, status
+from pydantic import TypeAdapter
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config import settings
+from database import AsyncSessionLocal
+from esquemas.reportes import (
+    AreaSchema, SeveridadSchema, EstadoReporteSchema, EstadoTransicionSchema, CatalogosBundle, CatalogosVersion
+)
+from modulos.modelosORM import Areas, Severidad, Estado_reportes, Estado_transicion
+
+
+class CachedPayload:
+    """
+    Respuesta JSON ya serializada con su ETag (hash del contenido).
+    Con compress=True se guarda además la versión gzip, que tiene su propio ETag.
+    """
+
+    __slots__ = ("body", "etag", "gzip_body", "gzip_etag")
+
+    def __init__(self, body: bytes, compress: bool = False):
+        self.body = body
+        self.etag = f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+        self.gzip_body = None
+        self.gzip_etag = None
+        if compress:
+            # mtime=0: mismo contenido -> mismos bytes en todos los procesos
+            self.gzip_body = gzip.compress(body, compresslevel=9, mtime=0)
+            self.gzip_etag = f'{self.etag[:-1]}-gz"'
+
+
+def etag_matches(if_none_match: Optional[str], *etags: Optional[str]) -> bool:
+    # If-None-Match puede traer varias etiquetas o "*"; se compara sin el prefijo W/
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") in etags:
+            return True
+    return False
+
+
+def accepts_gzip(accept_encoding: Optional[str]) -> bool:
+    for coding in (accept_encoding or "").split(","):
+        name, _, params = coding.strip().partition(";")
+        if name.strip().lower() == "gzip":
+            return params.replace(" ", "") not in ("q=0", "q=0.0", "q=0.00", "q=0.000")
+    return False
+
+
+def cached_response(request: Request, payload: CachedPayload) -> Response:
+    # no-cache: el cliente puede guardar la respuesta pero debe revalidarla (304 sin cuerpo)
+    headers = {"Cache-Control": "no-cache"}
+    body, etag = payload.body, payload.etag
+    if payload.gzip_body is not None:
+        headers["Vary"] = "Accept-Encoding"
+        if accepts_gzip(request.headers.get("accept-encoding")):
+            body, etag = payload.gzip_body, payload.gzip_etag
+            headers["Content-Encoding"] = "gzip"
+    headers["ETag"] = etag
+    # Cualquiera de las dos variantes sirve para revalidar: el contenido es el mismo
+    if etag_matches(request.headers.get("if-none-match"), payload.etag, payload.gzip_etag):
+        headers.pop("Content-Encoding", None)
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+# Columna de Reportes -> (catálogo, columna con el nombre que se agrega a la fila)
+NOMBRES_REPORTE = {
+    "ID_Area": ("areas", "Nombre_Area"),
+    "ID_Severidad": ("severidad", "Nombre_Severidad"),
+    "ID_Estado_Actual": ("estados", "Nombre_Estado"),
+}
+
+
+class CatalogNames:
+    """Diccionarios ID -> nombre de los catálogos, para completar filas de reportes."""
+
+    __slots__ = ("_maps",)
+
+    def __init__(self, data: dict):
+        self._maps = []
+        for id_col, (catalogo, nombre_col) in NOMBRES_REPORTE.items():
+            mapa = {getattr(item, id_col): getattr(item, nombre_col) for item in data[catalogo]}
+            self._maps.append((id_col, nombre_col, mapa))
+
+    def has(self, id_col: str, value) -> bool:
+        return any(value in mapa for col, _, mapa in self._maps if col == id_col)
+
+    def get(self, id_col: str, value) -> Optional[str]:
+        for col, _, mapa in self._maps:
+            if col == id_col:
+                return mapa.get(value)
+        return None
+
+    def resolve(self, row: dict) -> bool:
+        """
+        Agrega Nombre_Area, Nombre_Severidad y Nombre_Estado a `row`.
+        Retorna False si algún ID no está en el catálogo (cache desactualizado).
+        """
+        complete = True
+        for id_col, nombre_col, mapa in self._maps:
+            id_value = row[id_col]
+            nombre = mapa.get(id_value)
+            if nombre is None and id_value is not None:
+                complete = False
+            row[nombre_col] = nombre
+        return complete
+
+
+class TransitionGraph:
+    """Grafo Estado_transicion en memoria: estado -> estados a los que se puede pasar."""
+
+    __slots__ = ("_destinos", "_alcanzables")
+
+    def __init__(self, transiciones: list):
+        self._destinos: dict[int, frozenset[int]] = {}
+        for t in transiciones:
+            self._destinos[t.Estado_Desde] = self._destinos.get(t.Estado_Desde, frozenset()) | {t.Estado_Hacia}
+        self._alcanzables = frozenset().union(*self._destinos.values())
+
+    def permite(self, desde: Optional[int], hacia: int) -> bool:
+        # desde=None: ¿se puede llegar a `hacia` desde algún estado?
+        if desde is None:
+            return hacia in self._alcanzables
+        return hacia in self._destinos.get(desde, ())
+
+    def destinos(self, desde: int) -> list[int]:
+        return sorted(self._destinos.get(desde, ()))
+
+
+class CatalogCache:
+    """
+    Copia en memoria de los catálogos (Areas, Severidad, Estado_reportes y
+    el grafo Estado_transicion), por separado y juntos en un paquete
+    ("bundle") versionado con el hash de su contenido.
+
+    Se carga al iniciar la app y se recarga cuando pasan CATALOGOS_TTL
+    segundos o cuando un administrador llama a /admin/catalogos/refrescar.
+    Entre recargas las rutas de catálogos no tocan la BD.
+    """
+
+    # nombre -> (modelo ORM, schema de la respuesta)
+    CATALOGOS = {
+        "areas": (Areas, AreaSchema),
+        "severidad": (Severidad, SeveridadSchema),
+        "estados": (Estado_reportes, EstadoReporteSchema),
+        "transiciones": (Estado_transicion, EstadoTransicionSchema),
+    }
+
+    # Mínimo entre recargas forzadas por un ID desconocido (evita recargar en cada petición)
+    MIN_RELOAD_SECONDS = 5
+
+    def __init__(self, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self._payloads: dict[str, CachedPayload] = {}
+        self._names: Optional[CatalogNames] = None
+        self._grafo: Optional[TransitionGraph] = None
+        self._loaded_at: Optional[float] = None
+        self._lock = asyncio.Lock()
+        self._adapters = {
+            nombre: TypeAdapter(list[schema]) for nombre, (_, schema) in self.CATALOGOS.items()
+        }
+        self._bundle_adapter = TypeAdapter(CatalogosBundle)
+        self._version_adapter = TypeAdapter(CatalogosVersion)
+        self.version: Optional[str] = None
+        self.reloads = 0
+        self.served = 0
+        self.not_modified = 0
+        self.transitions_rejected = 0
+
+    def is_stale(self) -> bool:
+        if self._loaded_at is None:
+            return True
+        return self.ttl_seconds > 0 and time.monotonic() - self._loaded_at >= self.ttl_seconds
+
+    async def reload(self) -> None:
+        async with self._lock:
+            await self._reload_locked()
+
+    async def _reload_locked(self) -> None:
+        async with AsyncSessionLocal() as db:
+            payloads, version, names, grafo = await self._build(db)
+        self._payloads = payloads
+        self._names = names
+        self._grafo = grafo
+        self.version = version
+        self._loaded_at = time.monotonic()
+        self.reloads += 1
+
+    async def _build(self, db: AsyncSession) -> tuple[dict[str, CachedPayload], str, CatalogNames, TransitionGraph]:
+        payloads, data = {}, {}
+        for nombre, (modelo, schema) in self.CATALOGOS.items():
+            rows = (await db.execute(select(modelo).order_by(*modelo.__table__.primary_key))).scalars().all()
+            adapter = self._adapters[nombre]
+            data[nombre] = adapter.validate_python(rows, from_attributes=True)
+            payloads[nombre] = CachedPayload(adapter.dump_json(data[nombre]))
+
+        # La versión sale del contenido (no de la hora de carga): todos los
+        # procesos calculan la misma y no cambia si se recarga lo mismo
+        digest = hashlib.sha256()
+        for nombre in self.CATALOGOS:
+            digest.update(nombre.encode())
+            digest.update(payloads[nombre].body)
+        version = digest.hexdigest()[:16]
+
+        bundle = CatalogosBundle(version=version, **data)
+        payloads["bundle"] = CachedPayload(self._bundle_adapter.dump_json(bundle), compress=True)
+        payloads["version"] = CachedPayload(self._version_adapter.dump_json(CatalogosVersion(version=version)))
+        return payloads, version, CatalogNames(data), TransitionGraph(data["transiciones"])
+
+    async def ensure_fresh(self) -> None:
+        if self.is_stale():
+            # Solo una corrutina recarga; las demás esperan el lock y ya ven el dato nuevo
+            async with self._lock:
+                if self.is_stale():
+                    await self._reload_locked()
+
+    async def get(self, nombre: str) -> CachedPayload:
+        await self.ensure_fresh()
+        return self._payloads[nombre]
+
+    async def names(self) -> CatalogNames:
+        await self.ensure_fresh()
+        return self._names
+
+    async def reload_unknown(self, names: CatalogNames) -> CatalogNames:
+        """
+        Llamar cuando `names` no tenía algún ID (catálogo editado después de
+        la última carga): recarga una vez, como mucho cada MIN_RELOAD_SECONDS.
+        """
+        if names is self._names and time.monotonic() - self._loaded_at >= self.MIN_RELOAD_SECONDS:
+            async with self._lock:
+                if names is self._names:
+                    await self._reload_locked()
+        return self._names
+
+    async def transicion_valida(self, desde: Optional[int], hacia: int) -> bool:
+        """
+        Revisa el cambio de estado contra el grafo en memoria, antes de llamar
+        a sp_cambiar_estado_reporte. Si no está permitido se recarga una vez
+        (puede ser una transición agregada después de la última carga), como
+        mucho cada MIN_RELOAD_SECONDS: el resto de los rechazos no tocan la BD.
+        """
+        await self.ensure_fresh()
+        names = self._names
+        if self._grafo.permite(desde, hacia):
+            return True
+        await self.reload_unknown(names)
+        if self._grafo.permite(desde, hacia):
+            return True
+        self.transitions_rejected += 1
+        return False
+
+    async def destinos(self, desde: int) -> list[int]:
+        await self.ensure_fresh()
+        return self._grafo.destinos(desde)
+
+    async def resolve_names(self, rows: list[dict]) -> list[dict]:
+        """
+        Completa los nombres de área, severidad y estado de cada fila desde
+        memoria (en vez de JOIN). Si aparece un ID que no está en el cache
+        se recarga una vez.
+        """
+        names = await self.names()
+        complete = True
+        for row in rows:
+            complete = names.resolve(row) and complete
+        if not complete:
+            names = await self.reload_unknown(names)
+            for row in rows:
+                names.resolve(row)
+        return rows
+
+    async def response(self, request: Request, nombre: str) -> Response:
+        payload = await self.get(nombre)
+        response = cached_response(request, payload)
+        if response.status_code == status.HTTP_304_NOT_MODIFIED:
+            self.not_modified += 1
+        else:
+            self.served += 1
+        return response
+
+    def stats(self) -> dict:
+        return {
+            "ttl_segundos": self.ttl_seconds,
+            "recargas": self.reloads,
+            "version": self.version,
+            "edad_segundos": round(time.monotonic() - self._loaded_at, 1) if self._loaded_at else None,
+            "etags": {nombre: payload.etag for nombre, payload in self._payloads.items()},
+            "bundle_bytes": len(self._payloads["bundle"].body) if self._payloads else None,
+            "bundle_gzip_bytes": len(self._payloads["bundle"].gzip_body) if self._payloads else None,
+            "respuestas_200": self.served,
+            "respuestas_304": self.not_modified,
+            "transiciones_rechazadas": self.transitions_rejected,
+        }
+
+
+catalogos_cache = CatalogCache(ttl_seconds=settings.CATALOGOS_TTL)
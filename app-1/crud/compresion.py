@@ -0,0 +1,71 @@
+# app-1/crud/compresion.py
+import zlib
+from typing import Callable
+
+from fastapi import HTTPException, Request, Response, status
+from fastapi.routing import APIRoute
+
+from config import settings
+
+
+def decompress_gzip(data: bytes, max_bytes: int) -> bytes:
+    """
+    Descomprime un cuerpo gzip sin pasar de `max_bytes` descomprimidos
+    (un gzip chico puede inflarse a gigas).
+    """
+    decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)  # 16+: formato gzip
+    try:
+        body = decompressor.decompress(data, max_bytes + 1)
+    except zlib.error:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Cuerpo gzip inválido")
+    if len(body) > max_bytes:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Cuerpo descomprimido de más de {max_bytes} bytes"
+        )
+    if not decompressor.eof:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Cuerpo gzip incompleto")
+    return body
+
+
+class GzipRequest(Request):
+    """Request que entrega el cuerpo ya descomprimido si viene con Content-Encoding: gzip."""
+
+    async def body(self) -> bytes:
+        if not hasattr(self, "_body"):
+            body = await super().body()
+            if self.headers.get("content-encoding", "").strip().lower() == "gzip":
+                body = decompress_gzip(body, settings.GZIP_PETICION_MAX)
+            self._body = body
+        return self._body
+
+
+def require_identity_encoding(request: Request) -> None:
+    """
+    Dependencia para rutas que leen request.stream() (subidas de archivos):
+    GzipRequest solo descomprime body(), así que un archivo con
+    Content-Encoding se guardaría comprimido y con otro sha256. Se rechaza.
+    """
+    encoding = request.headers.get("content-encoding", "identity").strip().lower()
+    if encoding not in ("", "identity"):
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail=f"Content-Encoding '{encoding}' no soportado en subidas de archivos",
+            headers={"Accept-Encoding": "identity"},
+        )
+
+
+class GzipRoute(APIRoute):
+    """
+    Ruta que acepta cuerpos comprimidos (la app sube lotes de reportes por
+    enlaces lentos). Sin Content-Encoding se comporta igual que APIRoute.
+    Solo cubre body(): las rutas que leen stream() usan require_identity_encoding.
+    """
+
+    def get_route_handler(self) -> Callable:
+        handler = super().get_route_handler()
+
+        async def gzip_route_handler(request: Request) -> Response:
+            return await handler(GzipRequest(request.scope, request.receive))
+
+        return gzip_route_handler
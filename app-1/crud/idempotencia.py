@@ -0,0 +1,213 @@
+# app-1/crud/idempotencia.py
+import asyncio
+import hashlib
+import json
+import time
+import weakref
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from threading import Lock
+from typing import Awaitable, Callable, Optional
+
+from fastapi import HTTPException, Request, Response, status
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import delete, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config import settings
+from modulos.modelosORM import Respuestas_idempotencia
+
+# Largo máximo de la clave (columna Clave)
+MAX_CLAVE = 255
+
+
+class StoredResponse:
+    __slots__ = ("huella", "status_code", "body")
+
+    def __init__(self, huella: str, status_code: int, body: bytes):
+        self.huella = huella
+        self.status_code = status_code
+        self.body = body
+
+    def replay(self) -> Response:
+        return Response(
+            content=self.body,
+            status_code=self.status_code,
+            media_type="application/json",
+            headers={"Idempotent-Replayed": "true"},
+        )
+
+
+async def huella_peticion(request: Request) -> str:
+    # Misma clave con otra ruta u otro cuerpo = otra petición (se rechaza)
+    digest = hashlib.sha256(f"{request.method} {request.url.path}\n".encode())
+    digest.update(await request.body())
+    return digest.hexdigest()
+
+
+class IdempotencyStore:
+    """
+    Respuestas ya enviadas por (RUT, Idempotency-Key), para que un reintento
+    reciba la misma respuesta sin volver a ejecutar la escritura.
+
+    Se guardan en la tabla Respuestas_idempotencia (compartida entre
+    procesos) con un LRU en memoria delante. Solo se guardan respuestas 2xx:
+    un error no escribió nada y se puede reintentar. Dentro de un proceso,
+    las peticiones con la misma clave se ejecutan de a una.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[tuple[int, str], tuple[float, StoredResponse]]" = OrderedDict()
+        self._lock = Lock()
+        self._key_locks: "weakref.WeakValueDictionary[tuple[int, str], asyncio.Lock]" = weakref.WeakValueDictionary()
+        self.saves = 0
+        self.memory_hits = 0
+        self.db_hits = 0
+        self.executed = 0
+        self.conflicts = 0
+        self.save_errors = 0
+
+    def _get_local(self, key) -> Optional[StoredResponse]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= now:
+                if entry is not None:
+                    del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def _put_local(self, key, stored: StoredResponse) -> None:
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, stored)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    async def _load(self, db: AsyncSession, rut: int, clave: str) -> Optional[StoredResponse]:
+        desde = datetime.now() - timedelta(seconds=self.ttl_seconds)
+        row = (await db.execute(
+            select(
+                Respuestas_idempotencia.Huella,
+                Respuestas_idempotencia.Codigo_estado,
+                Respuestas_idempotencia.Respuesta,
+            ).where(
+                Respuestas_idempotencia.RUT == rut,
+                Respuestas_idempotencia.Clave == clave,
+                Respuestas_idempotencia.Creado >= desde,
+            )
+        )).first()
+        if row is None:
+            return None
+        return StoredResponse(row.Huella, row.Codigo_estado, row.Respuesta.encode("utf-8"))
+
+    async def _save(self, db: AsyncSession, rut: int, clave: str, stored: StoredResponse) -> None:
+        # IGNORE: si otro proceso ya guardó la misma clave, vale la suya
+        stmt = insert(Respuestas_idempotencia).prefix_with("IGNORE", dialect="mysql").prefix_with("OR IGNORE", dialect="sqlite")
+        await db.execute(stmt, {
+            "RUT": rut,
+            "Clave": clave,
+            "Huella": stored.huella,
+            "Codigo_estado": stored.status_code,
+            "Respuesta": stored.body.decode("utf-8"),
+            "Creado": datetime.now(),
+        })
+        self.saves += 1
+        # Limpieza de claves vencidas de vez en cuando (usa el índice de Creado)
+        if self.saves % 500 == 0:
+            vencidas = datetime.now() - timedelta(seconds=self.ttl_seconds)
+            await db.execute(delete(Respuestas_idempotencia).where(Respuestas_idempotencia.Creado < vencidas))
+        await db.commit()
+
+    async def run(
+        self,
+        db: AsyncSession,
+        rut: int,
+        clave: Optional[str],
+        huella: str,
+        ejecutar: Callable[[], Awaitable],
+        status_code: int = status.HTTP_200_OK,
+    ) -> Response:
+        """
+        Ejecuta `ejecutar()` una sola vez por (rut, clave). `ejecutar` puede
+        retornar un Response o datos JSON (que se responden con `status_code`).
+        Sin clave se ejecuta siempre, como antes.
+        """
+        if not clave:
+            return await self._as_response(await ejecutar(), status_code)
+        if len(clave) > MAX_CLAVE:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Idempotency-Key de más de {MAX_CLAVE} caracteres")
+
+        key = (rut, clave)
+        key_lock = self._key_locks.get(key)
+        if key_lock is None:
+            key_lock = self._key_locks[key] = asyncio.Lock()
+
+        async with key_lock:
+            stored = self._get_local(key)
+            if stored is not None:
+                self.memory_hits += 1
+            else:
+                stored = await self._load(db, rut, clave)
+                if stored is not None:
+                    self.db_hits += 1
+                    self._put_local(key, stored)
+
+            if stored is not None:
+                if stored.huella != huella:
+                    self.conflicts += 1
+                    raise HTTPException(
+                        status_code=422,  # Unprocessable Content (el nombre de la constante cambia entre versiones de Starlette)
+                        detail="Idempotency-Key ya usada con otra petición"
+                    )
+                return stored.replay()
+
+            self.executed += 1
+            response = await self._as_response(await ejecutar(), status_code)
+            if 200 <= response.status_code < 300:
+                stored = StoredResponse(huella, response.status_code, bytes(response.body))
+                # La escritura ya se confirmó (las rutas y los procedimientos
+                # hacen COMMIT): si guardar la respuesta falla, igual se
+                # responde el 2xx. Un 500 haría que el cliente reintente y
+                # repita la escritura (otra fila en la bitácora, por ejemplo)
+                try:
+                    await self._save(db, rut, clave, stored)
+                except Exception as e:
+                    self.save_errors += 1
+                    print(f"Error guardando respuesta idempotente (RUT {rut}, clave {clave!r}):", e)
+                    await db.rollback()
+                # En memoria queda igual: los reintentos a este proceso se repiten bien
+                self._put_local(key, stored)
+            return response
+
+    @staticmethod
+    async def _as_response(result, status_code: int) -> Response:
+        if isinstance(result, Response):
+            return result
+        body = json.dumps(jsonable_encoder(result), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        return Response(content=body, status_code=status_code, media_type="application/json")
+
+    def stats(self) -> dict:
+        with self._lock:
+            entradas = len(self._entries)
+        return {
+            "entradas_memoria": entradas,
+            "max_entradas": self.max_entries,
+            "ttl_segundos": self.ttl_seconds,
+            "ejecutadas": self.executed,
+            "repetidas_memoria": self.memory_hits,
+            "repetidas_bd": self.db_hits,
+            "conflictos": self.conflicts,
+            "errores_guardado": self.save_errors,
+        }
+
+
+idempotency_store = IdempotencyStore(
+    max_entries=settings.IDEMPOTENCIA_CACHE_MAX,
+    ttl_seconds=settings.IDEMPOTENCIA_TTL_HORAS * 3600,
+)
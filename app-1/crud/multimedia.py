@@ -0,0 +1,389 @@
+# app-1/crud/multimedia.py
+import asyncio
+import hashlib
+import json
+import os
+import re
+import shutil
+import tempfile
+import time
+import uuid
+from dataclasses import asdict, dataclass
+from typing import AsyncIterator, List
+
+from fastapi import HTTPException, Request, Response, status
+from fastapi.responses import FileResponse
+from starlette.concurrency import run_in_threadpool
+
+from config import settings
+from crud.catalogos import etag_matches
+
+# Rutas que genera ruta_for (ab/cd/<sha256>); cualquier otra no se sirve
+RUTA_DIGEST = re.compile(r"^([0-9a-f]{2})/([0-9a-f]{2})/([0-9a-f]{64})$")
+
+# El contenido de una ruta nunca cambia (es su hash): el cliente lo guarda un año
+# sin revalidar. private: requiere token, no debe quedar en caches compartidos
+CACHE_INMUTABLE = "private, max-age=31536000, immutable"
+
+ID_SESION = re.compile(r"^[0-9a-f]{32}$")
+
+
+@dataclass
+class StoredMedia:
+    digest: str      # sha256 del contenido, en hex
+    size: int
+    ruta: str        # relativa a MEDIA_DIR (lo que se guarda en Multimedia_reportes.ruta)
+    nuevo: bool      # False si el mismo contenido ya estaba en disco
+
+
+@dataclass
+class UploadSession:
+    # Lo que se guarda en meta.json al crear la sesión (no cambia después)
+    id_sesion: str
+    reporte_id: int
+    rut: int
+    tipo: str
+    tamano: int
+    parte_bytes: int
+    creado: float
+
+    @property
+    def partes_total(self) -> int:
+        return -(-self.tamano // self.parte_bytes)
+
+    def largo_parte(self, numero: int) -> int:
+        return min(self.parte_bytes, self.tamano - numero * self.parte_bytes)
+
+
+class MultimediaService:
+    """
+    Archivos de evidencia (fotos, videos) guardados por contenido: la ruta
+    sale del sha256 (MEDIA_DIR/ab/cd/abcd...), así la misma foto subida dos
+    veces ocupa un solo archivo.
+
+    El cuerpo se escribe a disco por bloques mientras se calcula el hash;
+    nunca está entero en memoria (un video de 50 MB usa lo mismo que una foto).
+    Al descargar, el ETag es el mismo sha256.
+
+    Los archivos grandes se pueden subir por partes (sesiones en
+    MEDIA_DIR/sesiones) y retomar después de un corte, sin empezar de cero.
+    """
+
+    def __init__(self, media_dir: str, max_bytes: int, chunk_bytes: int, part_bytes: int, session_ttl_seconds: float):
+        self.media_dir = os.path.abspath(media_dir)
+        self.tmp_dir = os.path.join(self.media_dir, "tmp")
+        self.sessions_dir = os.path.join(self.media_dir, "sesiones")
+        self.max_bytes = max_bytes
+        self.chunk_bytes = chunk_bytes
+        self.part_bytes = part_bytes
+        self.session_ttl_seconds = session_ttl_seconds
+        self.stored = 0
+        self.deduplicated = 0
+        self.bytes_written = 0
+        self.served = 0
+        self.not_modified = 0
+        self.sessions_finished = 0
+        self.sessions_purged = 0
+
+    def ruta_for(self, digest: str) -> str:
+        return f"{digest[:2]}/{digest[2:4]}/{digest}"
+
+    def path_for(self, ruta: str) -> str:
+        return os.path.join(self.media_dir, *ruta.split("/"))
+
+    def _open_temp(self):
+        # En MEDIA_DIR/tmp (mismo disco que el destino) para que os.replace sea atómico
+        os.makedirs(self.tmp_dir, exist_ok=True)
+        fd, path = tempfile.mkstemp(dir=self.tmp_dir, suffix=".part")
+        return os.fdopen(fd, "wb"), path
+
+    def _commit(self, tmp_path: str, ruta: str) -> bool:
+        destino = self.path_for(ruta)
+        if os.path.exists(destino):
+            os.remove(tmp_path)
+            return False
+        os.makedirs(os.path.dirname(destino), exist_ok=True)
+        os.replace(tmp_path, destino)
+        return True
+
+    @staticmethod
+    def _discard(f, tmp_path: str) -> None:
+        f.close()
+        try:
+            os.remove(tmp_path)
+        except FileNotFoundError:
+            pass
+
+    async def save_stream(self, stream: AsyncIterator[bytes]) -> StoredMedia:
+        """
+        Guarda el contenido de `stream` y retorna su digest y ruta. Los bloques
+        se juntan hasta `chunk_bytes` antes de escribirlos (en un thread, para
+        no bloquear el event loop). Si pasa de `max_bytes` se corta con 413.
+        """
+        f, tmp_path = await run_in_threadpool(self._open_temp)
+        digest = hashlib.sha256()
+        size = 0
+        buffer = bytearray()
+        try:
+            async for chunk in stream:
+                size += len(chunk)
+                if size > self.max_bytes:
+                    raise HTTPException(
+                        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                        detail=f"Archivo de más de {self.max_bytes} bytes"
+                    )
+                digest.update(chunk)
+                buffer += chunk
+                if len(buffer) >= self.chunk_bytes:
+                    await run_in_threadpool(f.write, bytes(buffer))
+                    buffer.clear()
+            if size == 0:
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Archivo vacío")
+            if buffer:
+                await run_in_threadpool(f.write, bytes(buffer))
+            await run_in_threadpool(f.close)
+        except BaseException:
+            # Incluye al cliente que corta la conexión a mitad de la subida
+            await run_in_threadpool(self._discard, f, tmp_path)
+            raise
+
+        return await self._store(tmp_path, digest.hexdigest(), size)
+
+    async def _store(self, tmp_path: str, hexdigest: str, size: int) -> StoredMedia:
+        ruta = self.ruta_for(hexdigest)
+        nuevo = await run_in_threadpool(self._commit, tmp_path, ruta)
+        if nuevo:
+            self.stored += 1
+            self.bytes_written += size
+        else:
+            self.deduplicated += 1
+        return StoredMedia(digest=hexdigest, size=size, ruta=ruta, nuevo=nuevo)
+
+    # --- Subida por partes ---
+    # MEDIA_DIR/sesiones/<id>/meta.json   datos de la sesión (UploadSession)
+    #                        /data.part   el archivo, del tamaño final; cada parte se escribe en su offset
+    #                        /partes/<n>  marca vacía: la parte n llegó completa
+    # Las marcas (y no una lista en meta.json) permiten que varios procesos
+    # reciban partes de la misma sesión sin pisarse.
+
+    def _session_dir(self, id_sesion: str) -> str:
+        if not ID_SESION.match(id_sesion):
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Sesión de subida no encontrada")
+        return os.path.join(self.sessions_dir, id_sesion)
+
+    def _create_session(self, session: UploadSession) -> None:
+        directorio = self._session_dir(session.id_sesion)
+        os.makedirs(os.path.join(directorio, "partes"))
+        with open(os.path.join(directorio, "data.part"), "wb") as f:
+            f.truncate(session.tamano)  # archivo disperso: no ocupa disco hasta que llegan las partes
+        with open(os.path.join(directorio, "meta.json"), "w") as f:
+            json.dump(asdict(session), f)
+
+    async def create_session(self, reporte_id: int, rut: int, tipo: str, tamano: int) -> UploadSession:
+        if tamano <= 0:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Archivo vacío")
+        if tamano > self.max_bytes:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=f"Archivo de más de {self.max_bytes} bytes"
+            )
+        session = UploadSession(
+            id_sesion=uuid.uuid4().hex, reporte_id=reporte_id, rut=rut, tipo=tipo,
+            tamano=tamano, parte_bytes=self.part_bytes, creado=time.time(),
+        )
+        await run_in_threadpool(self._create_session, session)
+        return session
+
+    def _load_session(self, id_sesion: str) -> UploadSession:
+        try:
+            with open(os.path.join(self._session_dir(id_sesion), "meta.json")) as f:
+                return UploadSession(**json.load(f))
+        except FileNotFoundError:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Sesión de subida no encontrada")
+
+    async def get_session(self, id_sesion: str) -> UploadSession:
+        return await run_in_threadpool(self._load_session, id_sesion)
+
+    def _received_parts(self, session: UploadSession) -> List[int]:
+        try:
+            nombres = os.listdir(os.path.join(self._session_dir(session.id_sesion), "partes"))
+        except FileNotFoundError:
+            return []
+        return sorted(int(n) for n in nombres if n.isdigit())
+
+    async def session_status(self, session: UploadSession) -> dict:
+        partes = await run_in_threadpool(self._received_parts, session)
+        # Bytes recibidos sin huecos desde el inicio: desde ahí se retoma
+        contiguas = 0
+        while contiguas < len(partes) and partes[contiguas] == contiguas:
+            contiguas += 1
+        return {
+            "id_sesion": session.id_sesion,
+            "tipo": session.tipo,
+            "tamano": session.tamano,
+            "parte_bytes": session.parte_bytes,
+            "partes_total": session.partes_total,
+            "partes_recibidas": partes,
+            "recibido": min(contiguas * session.parte_bytes, session.tamano),
+            "completa": len(partes) == session.partes_total,
+        }
+
+    async def write_part(self, session: UploadSession, numero: int, stream: AsyncIterator[bytes]) -> None:
+        """
+        Escribe la parte `numero` en su offset de data.part (os.pwrite, sin
+        mover las demás) a medida que llega. Reenviar una parte la sobrescribe
+        con los mismos bytes, así que reintentar es seguro.
+        """
+        if not 0 <= numero < session.partes_total:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Parte fuera de rango (0 a {session.partes_total - 1})"
+            )
+        esperado = session.largo_parte(numero)
+        directorio = self._session_dir(session.id_sesion)
+        try:
+            fd = await run_in_threadpool(os.open, os.path.join(directorio, "data.part"), os.O_WRONLY)
+        except FileNotFoundError:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Sesión de subida no encontrada")
+        try:
+            offset = numero * session.parte_bytes
+            escrito = 0
+            buffer = bytearray()
+            async for chunk in stream:
+                if escrito + len(buffer) + len(chunk) > esperado:
+                    raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"La parte {numero} debe tener {esperado} bytes")
+                buffer += chunk
+                if len(buffer) >= self.chunk_bytes:
+                    await run_in_threadpool(os.pwrite, fd, bytes(buffer), offset + escrito)
+                    escrito += len(buffer)
+                    buffer.clear()
+            if buffer:
+                await run_in_threadpool(os.pwrite, fd, bytes(buffer), offset + escrito)
+                escrito += len(buffer)
+            if escrito != esperado:
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"La parte {numero} debe tener {esperado} bytes")
+            await run_in_threadpool(os.fsync, fd)
+        finally:
+            await run_in_threadpool(os.close, fd)
+        # Marca al final: una parte cortada a la mitad no cuenta como recibida
+        await run_in_threadpool(self._mark_part, directorio, numero)
+
+    @staticmethod
+    def _mark_part(directorio: str, numero: int) -> None:
+        with open(os.path.join(directorio, "partes", str(numero)), "w"):
+            pass
+
+    def _hash_file(self, path: str) -> str:
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            while bloque := f.read(self.chunk_bytes):
+                digest.update(bloque)
+        return digest.hexdigest()
+
+    async def finish_session(self, session: UploadSession) -> StoredMedia:
+        """
+        Cierra una sesión completa: calcula el sha256 leyendo data.part por
+        bloques y lo mueve (os.replace, sin copiarlo) a su ruta por contenido.
+        """
+        estado = await self.session_status(session)
+        if not estado["completa"]:
+            faltan = sorted(set(range(session.partes_total)) - set(estado["partes_recibidas"]))
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"Faltan partes: {faltan[:20]}"
+            )
+        directorio = self._session_dir(session.id_sesion)
+        data_path = os.path.join(directorio, "data.part")
+        try:
+            hexdigest = await run_in_threadpool(self._hash_file, data_path)
+            media = await self._store(data_path, hexdigest, session.tamano)
+        except FileNotFoundError:
+            # Otra petición finalizó la misma sesión entre medio
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Sesión de subida no encontrada")
+        await run_in_threadpool(shutil.rmtree, directorio, True)
+        self.sessions_finished += 1
+        return media
+
+    def purge_abandoned(self) -> int:
+        """
+        Borra las sesiones sin actividad hace más de session_ttl_seconds y los
+        temporales de subidas cortadas. Retorna cuántas sesiones borró.
+        """
+        limite = time.time() - self.session_ttl_seconds
+        borradas = 0
+        for directorio in (self.sessions_dir, self.tmp_dir):
+            try:
+                entradas = list(os.scandir(directorio))
+            except FileNotFoundError:
+                continue
+            for entrada in entradas:
+                # En una sesión, data.part y partes/ cambian con cada parte recibida
+                rutas = [entrada.path]
+                if entrada.is_dir():
+                    rutas += [os.path.join(entrada.path, "data.part"), os.path.join(entrada.path, "partes")]
+                actividad = max((os.stat(r).st_mtime for r in rutas if os.path.exists(r)), default=0)
+                if actividad >= limite:
+                    continue
+                if entrada.is_dir():
+                    shutil.rmtree(entrada.path, ignore_errors=True)
+                    borradas += 1
+                else:
+                    try:
+                        os.remove(entrada.path)
+                    except FileNotFoundError:
+                        pass
+        self.sessions_purged += borradas
+        return borradas
+
+    async def purge_loop(self, interval_seconds: float) -> None:
+        # Tarea de fondo (lifespan en main.py)
+        while True:
+            await asyncio.sleep(interval_seconds)
+            try:
+                await run_in_threadpool(self.purge_abandoned)
+            except Exception as e:
+                print("Error limpiando sesiones de subida:", e)
+
+    async def file_response(self, request: Request, ruta: str, media_type: str) -> Response:
+        """
+        Respuesta para descargar `ruta`. FileResponse atiende Range / If-Range
+        (206, para adelantar un video o retomar una descarga cortada) y usa
+        envío sin copia (pathsend) si el servidor ASGI lo soporta.
+        """
+        match = RUTA_DIGEST.match(ruta or "")
+        if match is None or match.group(3)[:4] != match.group(1) + match.group(2):
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Archivo no disponible en el servidor")
+
+        headers = {"ETag": f'"{match.group(3)}"', "Cache-Control": CACHE_INMUTABLE}
+        if etag_matches(request.headers.get("if-none-match"), headers["ETag"]):
+            self.not_modified += 1
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+        path = self.path_for(ruta)
+        try:
+            stat_result = await run_in_threadpool(os.stat, path)
+        except FileNotFoundError:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Archivo no encontrado")
+        self.served += 1
+        return FileResponse(path, media_type=media_type, headers=headers, stat_result=stat_result)
+
+    def stats(self) -> dict:
+        return {
+            "directorio": self.media_dir,
+            "archivos_guardados": self.stored,
+            "archivos_repetidos": self.deduplicated,
+            "bytes_escritos": self.bytes_written,
+            "descargas": self.served,
+            "respuestas_304": self.not_modified,
+            "sesiones_finalizadas": self.sessions_finished,
+            "sesiones_abandonadas_borradas": self.sessions_purged,
+        }
+
+
+multimedia_service = MultimediaService(
+    media_dir=settings.MEDIA_DIR,
+    max_bytes=settings.MEDIA_MAX_BYTES,
+    chunk_bytes=settings.MEDIA_CHUNK_BYTES,
+    part_bytes=settings.MEDIA_PARTE_BYTES,
+    session_ttl_seconds=settings.MEDIA_SESION_HORAS * 3600,
+)
@@ -0,0 +1,139 @@
+# app-1/crud/principales.py
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config import settings
+from esquemas.usuarios import User
+from modulos.modelosORM import Usuarios
+
+
+class PrincipalCache:
+    """
+    Cache LRU con expiración (TTL) de los usuarios ya resueltos por
+    get_current_user, indexado por RUT.
+
+    Cada proceso de uvicorn tiene su propia copia. Las rutas que modifican
+    al usuario (estado, contraseña) deben llamar a invalidate().
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[int, tuple[float, User]]" = OrderedDict()
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl_seconds > 0 and self.max_entries > 0
+
+    def get(self, rut: int) -> Optional[User]:
+        if not self.enabled:
+            return None
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(rut)
+            if entry is None or entry[0] <= now:
+                if entry is not None:
+                    del self._entries[rut]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(rut)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, rut: int, principal: User) -> None:
+        if not self.enabled:
+            return
+        expires_at = time.monotonic() + self.ttl_seconds
+        with self._lock:
+            self._entries[rut] = (expires_at, principal)
+            self._entries.move_to_end(rut)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, rut: int) -> None:
+        with self._lock:
+            self._entries.pop(rut, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entradas": len(self._entries),
+                "max_entradas": self.max_entries,
+                "ttl_segundos": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": round(self.hits / total, 4) if total else None,
+            }
+
+
+class TokenVersionRegistry:
+    """
+    Versión de token vigente por RUT (columna Usuarios.Version_token).
+
+    Los JWT llevan la versión con que fueron emitidos en el claim "ver"; si
+    es menor que la registrada aquí el token está revocado. Solo se guardan
+    los RUT con versión > 0 (usuarios revocados alguna vez), así que la
+    tabla completa cabe en memoria y se recarga cada TOKEN_VERSION_REFRESH
+    segundos para ver los cambios hechos en otros procesos.
+    """
+
+    def __init__(self, refresh_seconds: float):
+        self.refresh_seconds = refresh_seconds
+        self._versions: dict[int, int] = {}
+        self._loaded_at: Optional[float] = None
+        self._lock = Lock()
+        self.reloads = 0
+
+    def is_stale(self) -> bool:
+        return self._loaded_at is None or time.monotonic() - self._loaded_at >= self.refresh_seconds
+
+    async def reload(self, db: AsyncSession) -> None:
+        result = await db.execute(select(Usuarios.RUT, Usuarios.Version_token).where(Usuarios.Version_token > 0))
+        rows = result.all()
+        with self._lock:
+            # Las versiones solo crecen: no perder un set() local más nuevo que la consulta
+            versions = {rut: version for rut, version in rows}
+            for rut, version in self._versions.items():
+                if version > versions.get(rut, 0):
+                    versions[rut] = version
+            self._versions = versions
+            self._loaded_at = time.monotonic()
+            self.reloads += 1
+
+    def get(self, rut: int) -> int:
+        return self._versions.get(rut, 0)
+
+    def set(self, rut: int, version: int) -> None:
+        with self._lock:
+            self._versions[rut] = version
+
+    def stats(self) -> dict:
+        return {
+            "usuarios_revocados": len(self._versions),
+            "recargas": self.reloads,
+            "refresco_segundos": self.refresh_seconds,
+        }
+
+
+principal_cache = PrincipalCache(
+    max_entries=settings.PRINCIPAL_CACHE_MAX,
+    ttl_seconds=settings.PRINCIPAL_CACHE_TTL,
+)
+
+token_versions = TokenVersionRegistry(refresh_seconds=settings.TOKEN_VERSION_REFRESH)
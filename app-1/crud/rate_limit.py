@@ -0,0 +1,82 @@
+# app-1/crud/rate_limit.py
+import math
+import time
+from collections import OrderedDict
+from threading import Lock
+
+from config import settings
+
+
+class TokenBucketLimiter:
+    """
+    Limitador token bucket en memoria, una cubeta por clave (RUT, IP, ...).
+
+    Cada cubeta admite `capacity` intentos seguidos y se recarga a razón de
+    `refill_per_minute`. Se guardan como máximo `max_keys` cubetas; las menos
+    usadas se descartan (equivale a darles la cubeta llena de nuevo).
+    """
+
+    def __init__(self, name: str, capacity: int, refill_per_minute: float, max_keys: int = 100_000):
+        self.name = name
+        self.capacity = capacity
+        self.refill_per_second = refill_per_minute / 60
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[object, tuple[float, float]]" = OrderedDict()
+        self._lock = Lock()
+        self.allowed = 0
+        self.rejected = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.capacity > 0
+
+    def acquire(self, key) -> float:
+        """
+        Consume un intento para `key`. Retorna 0 si se permite, o los
+        segundos que faltan para el siguiente intento si se rechaza.
+        """
+        if not self.enabled:
+            return 0
+        now = time.monotonic()
+        with self._lock:
+            tokens, last = self._buckets.get(key, (self.capacity, now))
+            tokens = min(self.capacity, tokens + (now - last) * self.refill_per_second)
+            if tokens >= 1:
+                self._buckets[key] = (tokens - 1, now)
+                self._buckets.move_to_end(key)
+                while len(self._buckets) > self.max_keys:
+                    self._buckets.popitem(last=False)
+                self.allowed += 1
+                return 0
+            self._buckets[key] = (tokens, now)
+            self._buckets.move_to_end(key)
+            self.rejected += 1
+            if self.refill_per_second <= 0:
+                return 60
+            return (1 - tokens) / self.refill_per_second
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "capacidad": self.capacity,
+                "recarga_por_minuto": self.refill_per_second * 60,
+                "claves": len(self._buckets),
+                "permitidos": self.allowed,
+                "rechazados": self.rejected,
+            }
+
+
+def retry_after_header(seconds: float) -> dict:
+    return {"Retry-After": str(max(1, math.ceil(seconds)))}
+
+
+login_limiter_ip = TokenBucketLimiter(
+    "login_ip",
+    capacity=settings.LOGIN_LIMITE_IP_RAFAGA,
+    refill_per_minute=settings.LOGIN_LIMITE_IP_POR_MINUTO,
+)
+login_limiter_rut = TokenBucketLimiter(
+    "login_rut",
+    capacity=settings.LOGIN_LIMITE_RUT_RAFAGA,
+    refill_per_minute=settings.LOGIN_LIMITE_RUT_POR_MINUTO,
+)
@@ -0,0 +1,250 @@
+# app-1/crud/reportes.py
+import base64
+import csv
+import io
+import json
+import operator
+from datetime import date, datetime, timedelta
+from typing import Optional
+
+from fastapi import HTTPException, Query, Response, status
+from pydantic import TypeAdapter
+from sqlalchemy import DateTime, String, TextClause, bindparam, literal_column, select, text, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from crud.catalogos import catalogos_cache
+from database import AsyncSessionLocal, async_engine
+from esquemas.reportes import FiltrosReportes, ReporteDetalle, ReporteListado, ReportePage
+from modulos.modelosORM import Bitacora_reportes, Bitacora_reportes_archivo, Multimedia_reportes
+
+# "Nombre Apellido" del autor. CONCAT() no existe en SQLite (usa ||), así que
+# la expresión la compila SQLAlchemy para el motor configurado
+NOMBRE_USUARIO_SQL = str(
+    literal_column("u.Nombre", String).concat(" ").concat(literal_column("u.Apellido_1", String))
+    .compile(dialect=async_engine.dialect, compile_kwargs={"literal_binds": True})
+)
+
+# Columnas de los listados de reportes (alias `r` para Reportes). Los nombres
+# de área, severidad y estado no se traen con JOIN: se completan desde el
+# cache de catálogos con catalogos_cache.resolve_names()
+SELECT_REPORTES = f"""
+    SELECT 
+        r.ID_Reporte,
+        r.Titulo,
+        r.Descripcion,
+        r.Fecha_Reporte,
+        r.Hora_Creado,
+        r.Hora_Sincronizado,
+        r.RUT,
+        r.ID_Severidad,
+        r.ID_Area,
+        r.ID_Estado_Actual,
+        {NOMBRE_USUARIO_SQL} as Nombre_Usuario
+    FROM Reportes r
+    LEFT JOIN Usuarios u ON r.RUT = u.RUT
+"""
+
+# Orden de las columnas en la exportación CSV
+COLUMNAS_REPORTE = list(ReporteListado.__annotations__)
+
+# Serializadores precompilados: pasan las filas a JSON en pydantic-core sin
+# validarlas de nuevo ni pasar por jsonable_encoder
+reporte_adapter = TypeAdapter(ReporteListado)
+reporte_detalle_adapter = TypeAdapter(ReporteDetalle)
+reporte_page_adapter = TypeAdapter(ReportePage)
+
+
+def json_response(adapter: TypeAdapter, data) -> Response:
+    # warnings=False: con SQLite text() trae las fechas como str; salen igual en ISO
+    return Response(content=adapter.dump_json(data, warnings=False), media_type="application/json")
+
+
+# Filas que se piden al cursor del servidor por cada parte de la exportación
+EXPORT_YIELD_PER = 1000
+
+
+def filtros_reportes(
+    id_area: Optional[int] = Query(None),
+    id_severidad: Optional[int] = Query(None),
+    id_estado: Optional[int] = Query(None),
+    rut: Optional[int] = Query(None),
+    desde: Optional[date] = Query(None, description="Creados desde esta fecha (YYYY-MM-DD)"),
+    hasta: Optional[date] = Query(None, description="Creados hasta esta fecha, inclusive (YYYY-MM-DD)"),
+) -> FiltrosReportes:
+    # Dependencia con los filtros comunes de los listados de reportes
+    return FiltrosReportes(
+        id_area=id_area,
+        id_severidad=id_severidad,
+        id_estado=id_estado,
+        rut=rut,
+        desde=desde,
+        hasta=hasta,
+    )
+
+
+def encode_cursor(hora_creado, id_reporte: int) -> str:
+    # SQLite entrega los DATETIME de consultas text() como string
+    if isinstance(hora_creado, str):
+        hora_creado = datetime.fromisoformat(hora_creado)
+    raw = json.dumps([hora_creado.isoformat(), id_reporte]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        hora, id_reporte = json.loads(raw)
+        return datetime.fromisoformat(hora), int(id_reporte)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Cursor inválido")
+
+
+def where_reportes(filtros: FiltrosReportes, cursor: Optional[str] = None) -> tuple[str, dict]:
+    """
+    Arma el WHERE (sobre el alias `r` de Reportes) y sus parámetros. El
+    cursor es la última fila de la página anterior en orden
+    (Hora_Creado DESC, ID_Reporte DESC), igual que los índices compuestos.
+    """
+    condiciones, params = [], {}
+    if filtros.id_area is not None:
+        condiciones.append("r.ID_Area = :id_area")
+        params["id_area"] = filtros.id_area
+    if filtros.id_severidad is not None:
+        condiciones.append("r.ID_Severidad = :id_severidad")
+        params["id_severidad"] = filtros.id_severidad
+    if filtros.id_estado is not None:
+        condiciones.append("r.ID_Estado_Actual = :id_estado")
+        params["id_estado"] = filtros.id_estado
+    if filtros.rut is not None:
+        condiciones.append("r.RUT = :rut")
+        params["rut"] = filtros.rut
+    if filtros.desde is not None:
+        condiciones.append("r.Hora_Creado >= :desde")
+        params["desde"] = datetime.combine(filtros.desde, datetime.min.time())
+    if filtros.hasta is not None:
+        condiciones.append("r.Hora_Creado < :hasta")
+        params["hasta"] = datetime.combine(filtros.hasta + timedelta(days=1), datetime.min.time())
+    if cursor:
+        c_hora, c_id = decode_cursor(cursor)
+        condiciones.append(
+            "(r.Hora_Creado < :c_hora OR (r.Hora_Creado = :c_hora AND r.ID_Reporte < :c_id))"
+        )
+        params["c_hora"] = c_hora
+        params["c_id"] = c_id
+
+    where = ("WHERE " + " AND ".join(condiciones)) if condiciones else ""
+    return where, params
+
+
+def typed_text(sql: str, params: dict) -> TextClause:
+    # Tipa los parámetros datetime para que SQLite los compare con el mismo
+    # formato con que los guarda (en MySQL no cambia nada)
+    return text(sql).bindparams(*[
+        bindparam(nombre, type_=DateTime) for nombre, valor in params.items() if isinstance(valor, datetime)
+    ])
+
+
+async def exportar_reportes(filtros: FiltrosReportes, formato: str):
+    """
+    Generador para StreamingResponse. Abre su propia sesión porque corre
+    después de que la ruta retorna, y lee con stream_results/yield_per para
+    tener en memoria solo EXPORT_YIELD_PER filas a la vez.
+    """
+    where, params = where_reportes(filtros)
+    query = typed_text(f"""
+        {SELECT_REPORTES}
+        {where}
+        ORDER BY r.Hora_Creado DESC, r.ID_Reporte DESC
+    """, params).execution_options(yield_per=EXPORT_YIELD_PER)
+
+    async with AsyncSessionLocal() as db:
+        result = await db.stream(query, params)
+        if formato == "csv":
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerow(COLUMNAS_REPORTE)
+            por_columna = operator.itemgetter(*COLUMNAS_REPORTE)
+        async for filas in result.mappings().partitions():
+            filas = await catalogos_cache.resolve_names([dict(fila) for fila in filas])
+            if formato == "csv":
+                writer.writerows(map(por_columna, filas))
+                chunk = buffer.getvalue().encode("utf-8")
+                buffer.seek(0)
+                buffer.truncate()
+            else:
+                # Mismo serializador que GET /reportes/: las fechas salen en ISO en los dos
+                chunk = b"".join(reporte_adapter.dump_json(fila, warnings=False) + b"\n" for fila in filas)
+            yield chunk
+        if formato == "csv" and buffer.tell():
+            yield buffer.getvalue().encode("utf-8")
+
+
+# --- Detalle con datos relacionados (?include=multimedia,bitacora) ---
+INCLUDES_REPORTE = ("multimedia", "bitacora")
+
+
+def parse_include(include: Optional[str]) -> set[str]:
+    partes = {p.strip().lower() for p in (include or "").split(",") if p.strip()}
+    desconocidas = partes - set(INCLUDES_REPORTE)
+    if desconocidas:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"include no válido: {', '.join(sorted(desconocidas))} (opciones: {', '.join(INCLUDES_REPORTE)})"
+        )
+    return partes
+
+
+async def cargar_relacionados(db: AsyncSession, reportes: list[dict], include: set[str]) -> list[dict]:
+    """
+    Agrega a cada fila las listas pedidas en `include` ("multimedia",
+    "bitacora"). Es una consulta IN por relación para todas las filas juntas
+    (lo mismo que haría selectinload), no una por reporte: 1 + len(include)
+    consultas en total, sean 1 o 200 reportes. Usan idx_multimedia_id_reporte
+    e idx_bitacora_reporte_fecha (también en el archivo de la bitácora).
+    """
+    if not reportes or not include:
+        return reportes
+    por_id = {r["ID_Reporte"]: r for r in reportes}
+    ids = list(por_id)
+
+    if "multimedia" in include:
+        for r in reportes:
+            r["multimedia"] = []
+        filas = await db.execute(
+            select(Multimedia_reportes.ID_Multimedia, Multimedia_reportes.Tipo_Multimedia, Multimedia_reportes.ID_Reporte)
+            .where(Multimedia_reportes.ID_Reporte.in_(ids))
+            .order_by(Multimedia_reportes.ID_Reporte, Multimedia_reportes.ID_Multimedia)
+        )
+        for m in filas:
+            por_id[m.ID_Reporte]["multimedia"].append({
+                "ID_Multimedia": m.ID_Multimedia,
+                "Tipo_Multimedia": m.Tipo_Multimedia,
+                "url": f"/reportes/{m.ID_Reporte}/multimedia/{m.ID_Multimedia}",
+            })
+
+    if "bitacora" in include:
+        for r in reportes:
+            r["bitacora"] = []
+        names = await catalogos_cache.names()
+        # Historial completo: lo vivo y lo ya archivado, en una sola consulta
+        partes = [
+            select(
+                tabla.ID_Bitacora, tabla.ID_Reporte, tabla.ID_Estado_Actual,
+                tabla.Nombre_Administrador, tabla.Detalle, tabla.Actualizacion_Fecha,
+            ).where(tabla.ID_Reporte.in_(ids))
+            for tabla in (Bitacora_reportes, Bitacora_reportes_archivo)
+        ]
+        historial = union_all(*partes).subquery()
+        filas = await db.execute(
+            select(historial).order_by(historial.c.ID_Reporte, historial.c.ID_Bitacora)
+        )
+        for b in filas:
+            por_id[b.ID_Reporte]["bitacora"].append({
+                "ID_Bitacora": b.ID_Bitacora,
+                "ID_Estado_Actual": b.ID_Estado_Actual,
+                "Nombre_Estado": names.get("ID_Estado_Actual", b.ID_Estado_Actual),
+                "Nombre_Administrador": b.Nombre_Administrador,
+                "Detalle": b.Detalle,
+                "Actualizacion_Fecha": b.Actualizacion_Fecha,
+            })
+    return reportes
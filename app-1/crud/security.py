@@ -1,18 +1,31 @@
 import os
+import asyncio
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
 from dotenv import load_dotenv
 from passlib.context import CryptContext
 from jose import jwt, JOSEError
 from datetime import datetime, timedelta, timezone
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
-from database import get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from database import get_async_db
 from modulos.modelosORM import Usuarios
+from esquemas.usuarios import TokenData, User
+from crud.principales import principal_cache, token_versions
+from config import settings
 from typing import Optional
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# min/max iguales al costo configurado: needs_update() marca cualquier hash
+# con otro costo para que se re-hashee en el próximo login
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__min_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__max_rounds=settings.BCRYPT_ROUNDS,
+)
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     #Retorna True si la contraseña coincide con el hash, de lo contrario False
@@ -22,6 +35,92 @@ def get_password_hash(password: str) -> str:
     #Retorna el hash de la contraseña
     return pwd_context.hash(password)
 
+def password_needs_rehash(hashed_password: str) -> bool:
+    #Retorna True si el hash usa un esquema o costo distinto al configurado
+    return pwd_context.needs_update(hashed_password)
+
+# Hash de relleno para RUTs que no existen: verificar contra él cuesta lo
+# mismo que contra un hash real, así un RUT inexistente no responde más rápido
+DUMMY_PASSWORD_HASH = pwd_context.hash("sigra-rut-inexistente")
+
+
+# --- Pool para bcrypt ---
+# bcrypt tarda cientos de ms por llamada; si se ejecuta dentro de una ruta
+# async bloquea el event loop para todos los demás requests. Estas versiones
+# async lo mandan a un pool acotado y responden 503 si la cola está llena.
+_hash_executor: Optional[Executor] = None
+_hash_en_curso = 0  # tareas encoladas o ejecutándose (solo se toca desde el event loop)
+_hash_rechazos = 0
+
+
+def _get_hash_executor() -> Executor:
+    global _hash_executor
+    if _hash_executor is None:
+        if settings.HASH_POOL_TIPO == "process":
+            _hash_executor = ProcessPoolExecutor(max_workers=settings.HASH_POOL_WORKERS)
+        else:
+            _hash_executor = ThreadPoolExecutor(max_workers=settings.HASH_POOL_WORKERS, thread_name_prefix="bcrypt")
+    return _hash_executor
+
+
+async def _run_in_hash_pool(fn, *args):
+    global _hash_en_curso, _hash_rechazos
+    if settings.HASH_POOL_WORKERS <= 0:
+        return fn(*args)
+    if _hash_en_curso >= settings.HASH_POOL_WORKERS + settings.HASH_POOL_MAX_COLA:
+        _hash_rechazos += 1
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Servidor ocupado, intente nuevamente en unos segundos",
+            headers={"Retry-After": str(settings.HASH_POOL_RETRY_AFTER)},
+        )
+    _hash_en_curso += 1
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_get_hash_executor(), fn, *args)
+    finally:
+        _hash_en_curso -= 1
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await _run_in_hash_pool(verify_password, plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    return await _run_in_hash_pool(get_password_hash, password)
+
+
+def _hash_lote(passwords: list[str]) -> list[str]:
+    return [get_password_hash(p) for p in passwords]
+
+
+async def get_password_hashes_async(passwords: list[str]) -> list[str]:
+    # Reparte la lista en un trozo por worker para usar todos los núcleos
+    if not passwords:
+        return []
+    n = max(1, min(settings.HASH_POOL_WORKERS, len(passwords)))
+    tamano = -(-len(passwords) // n)
+    trozos = [passwords[i:i + tamano] for i in range(0, len(passwords), tamano)]
+    resultados = await asyncio.gather(*[_run_in_hash_pool(_hash_lote, t) for t in trozos])
+    return [h for trozo in resultados for h in trozo]
+
+
+def hash_pool_stats() -> dict:
+    return {
+        "tipo": settings.HASH_POOL_TIPO,
+        "workers": settings.HASH_POOL_WORKERS,
+        "max_cola": settings.HASH_POOL_MAX_COLA,
+        "en_curso": _hash_en_curso,
+        "rechazos": _hash_rechazos,
+    }
+
+
+def shutdown_hash_pool() -> None:
+    global _hash_executor
+    if _hash_executor is not None:
+        _hash_executor.shutdown(wait=False, cancel_futures=True)
+        _hash_executor = None
+
 SECRET_KEY = os.getenv("SECRET_KEY")
 if SECRET_KEY is None:
     raise ValueError("SECRET_KEY no está configurada en las variables de entorno.")
@@ -43,34 +142,65 @@ def create_access_token(data: dict, expires_delta: timedelta = None) -> str:
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
-async def get_current_user(
-    token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db)
-) -> Optional[Usuarios]:
-    credentials_exception = HTTPException(
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="No se pudo validar las credenciales",
         headers={"WWW-Authenticate": "Bearer"},
     )
+
+
+async def get_token_data(
+    token: str = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_async_db)
+) -> TokenData:
+    """
+    Valida el JWT usando solo sus claims firmados (rut, cargo, ver).
+
+    No consulta la BD salvo para recargar periódicamente las versiones de
+    token revocadas, así que las rutas que solo necesitan RUT y cargo
+    autentican sin SQL.
+    """
     try:
-        print(f"🔍 Validando token: {token[:10]}...")  # Solo mostramos los primeros 10 caracteres
-        # Decodificar el token
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        print(f"✅ Token decodificado: {payload}")
-        rut: int = payload.get("sub")
-        if rut is None:
-            print("❌ No se encontró 'sub' en el payload")
-            raise credentials_exception
-        
-        print(f"🔎 Buscando usuario con RUT: {rut}")
-        # Buscar el usuario en la base de datos
-        user = db.query(Usuarios).filter(Usuarios.RUT == rut).first()
-        if user is None:
-            print("❌ Usuario no encontrado en la base de datos")
-            raise credentials_exception
-            
-        print(f"✅ Usuario encontrado: RUT {user.RUT}")
-        return user
-    except JOSEError as e:
-        print(f"❌ Error decodificando JWT: {str(e)}")
-        raise credentials_exception
\ No newline at end of file
+    except JOSEError:
+        raise _credentials_exception()
+    rut: Optional[int] = payload.get("rut")
+    if rut is None:
+        raise _credentials_exception()
+
+    if token_versions.is_stale():
+        await token_versions.reload(db)
+    # Tokens emitidos antes de existir el claim "ver" cuentan como versión 0
+    if payload.get("ver", 0) < token_versions.get(rut):
+        raise _credentials_exception()
+    return TokenData(RUT=rut, cargo=payload.get("cargo"))
+
+
+def require_cargo(*cargos: int):
+    """Dependencia que exige que el claim "cargo" del token esté en `cargos`."""
+    async def dependency(token_data: TokenData = Depends(get_token_data)) -> TokenData:
+        if token_data.cargo not in cargos:
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="No autorizado")
+        return token_data
+    return dependency
+
+
+async def get_current_user(
+    token_data: TokenData = Depends(get_token_data),
+    db: AsyncSession = Depends(get_async_db)
+) -> User:
+    """
+    Usuario completo (nombre, estado, etc.) del token. Usa el cache de
+    principales; solo consulta Usuarios cuando no está en cache.
+    """
+    principal = principal_cache.get(token_data.RUT)
+    if principal is not None:
+        return principal
+
+    user = await db.get(Usuarios, token_data.RUT)
+    if user is None:
+        raise _credentials_exception()
+    principal = User.model_validate(user)
+    principal_cache.put(user.RUT, principal)
+    return principal
@@ -0,0 +1,255 @@
+# app-1/crud/sync.py
+import re
+from typing import List, Optional
+
+from pydantic import TypeAdapter
+from sqlalchemy import bindparam, or_, select
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from crud.catalogos import catalogos_cache
+from crud.reportes import decode_cursor, encode_cursor, typed_text
+from esquemas.reportes import ReporteCreate
+from esquemas.sync import SyncBatchResult, SyncChanges, SyncItemResult
+from esquemas.usuarios import TokenData
+from modulos.modelosORM import Reportes, Usuarios
+
+# Mismo patrón que fn_validar_uuid_v4 en db.sql
+UUID_V4 = re.compile(r"^[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-4[0-9a-fA-F]{3}-[89abAB][0-9a-fA-F]{3}-[0-9a-fA-F]{12}$")
+
+# Estado con que se crea un reporte si el dispositivo no manda uno (Pendiente)
+ESTADO_POR_DEFECTO = 1
+
+# Largos de las columnas de Reportes: sin este chequeo MySQL (en modo no
+# estricto) truncaría el valor en vez de rechazarlo
+MAX_TITULO = Reportes.__table__.c.Titulo.type.length
+MAX_PETICION = Reportes.__table__.c.Peticiones_Idempotencia.type.length
+MAX_DESCRIPCION_BYTES = 65535  # TEXT de MySQL
+
+
+def _validar(reporte: ReporteCreate, rut: int, names, ruts_validos: set) -> Optional[str]:
+    if not UUID_V4.match(reporte.uuid_cliente):
+        return "UUID_Cliente no es un UUID v4 válido."
+    if not reporte.titulo:
+        return "Titulo es obligatorio."
+    if len(reporte.titulo) > MAX_TITULO:
+        return f"Titulo de más de {MAX_TITULO} caracteres."
+    if reporte.descripcion and len(reporte.descripcion.encode("utf-8")) > MAX_DESCRIPCION_BYTES:
+        return f"Descripcion de más de {MAX_DESCRIPCION_BYTES} bytes."
+    if reporte.peticion_idempotencia and len(reporte.peticion_idempotencia) > MAX_PETICION:
+        return f"Peticiones_Idempotencia de más de {MAX_PETICION} caracteres."
+    if not names.has("ID_Area", reporte.id_area):
+        return "ID_Area no existe."
+    if not names.has("ID_Severidad", reporte.id_severidad):
+        return "ID_Severidad no existe."
+    if not names.has("ID_Estado_Actual", reporte.id_estado_actual or ESTADO_POR_DEFECTO):
+        return "ID_Estado_Actual no existe."
+    if rut not in ruts_validos:
+        return "RUT no existe."
+    return None
+
+
+def _insert_ignorando_duplicados(db: AsyncSession):
+    # INSERT IGNORE de MySQL también convierte en advertencias los valores
+    # muy largos o nulos (los guarda alterados); estas variantes solo
+    # absorben el choque con uq_reportes_uuid_cliente / uq_reportes_peticion_idempotencia
+    if db.get_bind().dialect.name == "mysql":
+        stmt = mysql_insert(Reportes)
+        return stmt.on_duplicate_key_update(ID_Reporte=Reportes.__table__.c.ID_Reporte)
+    return sqlite_insert(Reportes).on_conflict_do_nothing()
+
+
+async def sincronizar_lote(db: AsyncSession, reportes: List[ReporteCreate], token_data: TokenData) -> SyncBatchResult:
+    """
+    Guarda un lote de reportes creados offline, en una sola transacción:
+
+    1. Valida catálogos (desde memoria), UUID y RUT de todo el lote de una vez.
+    2. Una consulta IN para ver qué UUID_Cliente / Peticiones_Idempotencia ya existen.
+    3. Un INSERT de varias filas que ignora solo los choques de índice único
+       (ON DUPLICATE KEY UPDATE sin cambios / ON CONFLICT DO NOTHING): si otro
+       dispositivo insertó el mismo reporte entre medio, se descarta sin
+       error. Cualquier otro error de la BD falla el lote completo.
+    4. Otra consulta IN para obtener los ID del servidor.
+
+    Hace las mismas validaciones que sp_insertar_reporte, pero sin una
+    llamada (y un SELECT @out_id) por reporte.
+    """
+    names = await catalogos_cache.names()
+    if any(
+        not names.has("ID_Area", r.id_area) or not names.has("ID_Severidad", r.id_severidad)
+        for r in reportes
+    ):
+        # Puede ser un área/severidad creada después de cargar el cache
+        names = await catalogos_cache.reload_unknown(names)
+
+    # Los trabajadores solo pueden subir reportes a su nombre
+    def rut_de(reporte: ReporteCreate) -> int:
+        return reporte.rut or token_data.RUT
+
+    ruts = {rut_de(r) for r in reportes}
+    ruts_validos = set((await db.execute(select(Usuarios.RUT).where(Usuarios.RUT.in_(ruts)))).scalars().all()) if ruts else set()
+
+    resultados: List[SyncItemResult] = []
+    candidatos: dict[str, ReporteCreate] = {}  # uuid -> reporte, sin repetidos dentro del lote
+    for reporte in reportes:
+        rut = rut_de(reporte)
+        error = _validar(reporte, rut, names, ruts_validos)
+        if error is None and token_data.cargo != 1 and rut != token_data.RUT:
+            error = "No autorizado para crear reportes de otro usuario."
+        resultados.append(SyncItemResult(uuid_cliente=reporte.uuid_cliente, estado="error" if error else "creado", error=error))
+        if error is None:
+            candidatos.setdefault(reporte.uuid_cliente, reporte)
+
+    def buscar(uuids, peticiones):
+        condiciones = [Reportes.UUID_Cliente.in_(uuids)]
+        if peticiones:
+            condiciones.append(Reportes.Peticiones_Idempotencia.in_(peticiones))
+        return select(Reportes.ID_Reporte, Reportes.UUID_Cliente, Reportes.Peticiones_Idempotencia).where(or_(*condiciones))
+
+    por_uuid: dict[str, int] = {}
+    por_peticion: dict[str, int] = {}
+    nuevos: List[ReporteCreate] = []
+    if candidatos:
+        peticiones = [r.peticion_idempotencia for r in candidatos.values() if r.peticion_idempotencia]
+        for id_reporte, uuid, peticion in (await db.execute(buscar(list(candidatos), peticiones))).all():
+            por_uuid[uuid] = id_reporte
+            if peticion:
+                por_peticion[peticion] = id_reporte
+        nuevos = [
+            r for uuid, r in candidatos.items()
+            if uuid not in por_uuid and r.peticion_idempotencia not in por_peticion
+        ]
+
+    creados = set()
+    if nuevos:
+        await db.execute(_insert_ignorando_duplicados(db), [
+            {
+                "Titulo": r.titulo,
+                "Descripcion": r.descripcion,
+                "Fecha_Reporte": r.fecha_reporte,
+                "UUID_Cliente": r.uuid_cliente,
+                "RUT": rut_de(r),
+                "ID_Severidad": r.id_severidad,
+                "ID_Area": r.id_area,
+                "ID_Estado_Actual": r.id_estado_actual or ESTADO_POR_DEFECTO,
+                "Peticiones_Idempotencia": r.peticion_idempotencia,
+            }
+            for r in nuevos
+        ])
+        peticiones = [r.peticion_idempotencia for r in nuevos if r.peticion_idempotencia]
+        for id_reporte, uuid, peticion in (await db.execute(buscar([r.uuid_cliente for r in nuevos], peticiones))).all():
+            if uuid not in por_uuid:
+                por_uuid[uuid] = id_reporte
+                creados.add(uuid)
+            if peticion:
+                por_peticion.setdefault(peticion, id_reporte)
+        await db.commit()
+
+    # Armar el resultado de cada ítem en el orden recibido
+    vistos = set()
+    for reporte, resultado in zip(reportes, resultados):
+        if resultado.estado == "error":
+            continue
+        uuid = reporte.uuid_cliente
+        id_reporte = por_uuid.get(uuid) or por_peticion.get(reporte.peticion_idempotencia)
+        if id_reporte is None:
+            resultado.estado, resultado.error = "error", "No se pudo guardar el reporte."
+        elif uuid in creados and uuid not in vistos:
+            resultado.id_reporte = id_reporte
+        else:
+            resultado.estado, resultado.id_reporte = "duplicado", id_reporte
+        vistos.add(uuid)
+
+    return SyncBatchResult(
+        creados=sum(r.estado == "creado" for r in resultados),
+        duplicados=sum(r.estado == "duplicado" for r in resultados),
+        errores=sum(r.estado == "error" for r in resultados),
+        resultados=resultados,
+    )
+
+
+# --- Cambios para el dispositivo (GET /sync/changes) ---
+sync_changes_adapter = TypeAdapter(SyncChanges)
+
+SELECT_CAMBIOS = """
+    SELECT
+        r.ID_Reporte,
+        r.UUID_Cliente,
+        r.Titulo,
+        r.Descripcion,
+        r.Fecha_Reporte,
+        r.Hora_Creado,
+        r.Hora_Actualizado,
+        r.RUT,
+        r.ID_Severidad,
+        r.ID_Area,
+        r.ID_Estado_Actual
+    FROM Reportes r
+"""
+
+
+async def cambios_desde(db: AsyncSession, since: Optional[str], limit: int, token_data: TokenData) -> SyncChanges:
+    """
+    Reportes actualizados después del watermark `since`, en orden
+    (Hora_Actualizado, ID_Reporte), y las entradas de bitácora de esos
+    reportes. El watermark es la última fila entregada; sin `since` se
+    entrega todo desde el principio.
+
+    Solo se entregan filas con Hora_Actualizado anterior al segundo actual
+    de la BD: la columna tiene resolución de segundos, y una fila cambiada
+    más tarde en ese mismo segundo quedaría detrás de un watermark ya
+    entregado. Así el watermark solo avanza y no se pierden cambios.
+    """
+    condiciones = ["r.Hora_Actualizado < CURRENT_TIMESTAMP"]
+    params = {"limit": limit + 1}
+    if since:
+        w_hora, w_id = decode_cursor(since)
+        condiciones.append(
+            "(r.Hora_Actualizado > :w_hora OR (r.Hora_Actualizado = :w_hora AND r.ID_Reporte > :w_id))"
+        )
+        params.update(w_hora=w_hora, w_id=w_id)
+    # Los trabajadores solo ven sus propios reportes
+    if token_data.cargo != 1:
+        condiciones.append("r.RUT = :rut")
+        params["rut"] = token_data.RUT
+
+    query = typed_text(f"""
+        {SELECT_CAMBIOS}
+        WHERE {" AND ".join(condiciones)}
+        ORDER BY r.Hora_Actualizado, r.ID_Reporte
+        LIMIT :limit
+    """, params)
+    filas = (await db.execute(query, params)).mappings().all()
+
+    hay_mas = len(filas) > limit
+    filas = filas[:limit]
+    if not filas:
+        return {"reportes": [], "bitacora": [], "watermark": since, "hay_mas": False}
+
+    reportes = await catalogos_cache.resolve_names([dict(fila) for fila in filas])
+
+    # Bitácora de los reportes de la página (usa idx_bitacora_id_reporte)
+    params_b = {"ids": [r["ID_Reporte"] for r in reportes]}
+    filtro_fecha = ""
+    if since:
+        # >= y no >: una entrada del mismo segundo que el watermark se repite
+        # en vez de perderse (el dispositivo la guarda por ID_Bitacora)
+        filtro_fecha = "AND b.Actualizacion_Fecha >= :w_hora"
+        params_b["w_hora"] = params["w_hora"]
+    query_b = typed_text(f"""
+        SELECT b.ID_Bitacora, b.ID_Reporte, b.ID_Estado_Actual, b.Nombre_Administrador, b.Detalle, b.Actualizacion_Fecha
+        FROM Bitacora_reportes b
+        WHERE b.ID_Reporte IN :ids
+        {filtro_fecha}
+        ORDER BY b.ID_Reporte, b.ID_Bitacora
+    """, params_b).bindparams(bindparam("ids", expanding=True))
+    bitacora = [dict(fila) for fila in (await db.execute(query_b, params_b)).mappings().all()]
+
+    ultimo = reportes[-1]
+    return {
+        "reportes": reportes,
+        "bitacora": bitacora,
+        "watermark": encode_cursor(ultimo["Hora_Actualizado"], ultimo["ID_Reporte"]),
+        "hay_mas": hay_mas,
+    }
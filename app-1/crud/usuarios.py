@@ -0,0 +1,58 @@
+# app-1/crud/usuarios.py
+from typing import List
+
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from modulos.modelosORM import Usuarios
+from esquemas.usuarios import UserCreate, UserBulkResult
+from crud.security import get_password_hashes_async
+
+
+def initial_password(rut: int) -> str:
+    # Los últimos 4 dígitos del RUT son la contraseña inicial
+    return str(rut)[-4:]
+
+
+async def crear_usuarios_lote(db: AsyncSession, usuarios: List[UserCreate]) -> UserBulkResult:
+    """
+    Crea muchos usuarios de una vez: una sola consulta IN para ver cuáles
+    RUT ya existen, hashes en paralelo en el pool de bcrypt y un único
+    INSERT de varias filas.
+    """
+    # Descartar RUTs repetidos dentro del mismo lote (gana el primero)
+    unicos: dict[int, UserCreate] = {}
+    repetidos: List[int] = []
+    for usuario in usuarios:
+        if usuario.RUT in unicos:
+            repetidos.append(usuario.RUT)
+        else:
+            unicos[usuario.RUT] = usuario
+
+    existentes = set()
+    if unicos:
+        result = await db.execute(select(Usuarios.RUT).where(Usuarios.RUT.in_(list(unicos))))
+        existentes = set(result.scalars().all())
+    nuevos = [u for rut, u in unicos.items() if rut not in existentes]
+
+    hashes = await get_password_hashes_async([initial_password(u.RUT) for u in nuevos])
+    if nuevos:
+        await db.execute(insert(Usuarios), [
+            {
+                "RUT": u.RUT,
+                "Nombre": u.Nombre,
+                "Apellido_1": u.Apellido_1,
+                "Apellido_2": u.Apellido_2,
+                "Contraseña": password_hash,
+                "ID_Cargo": u.ID_Cargo,
+                "ID_Estado_trabajador": u.ID_Estado_trabajador,
+                "Primer_inicio_sesion": 1,
+            }
+            for u, password_hash in zip(nuevos, hashes)
+        ])
+        await db.commit()
+
+    return UserBulkResult(
+        creados=[u.RUT for u in nuevos],
+        existentes=sorted(existentes) + repetidos,
+    )
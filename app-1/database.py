@@ -1,6 +1,13 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, exc
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
+from threading import Lock
 import os
+import time
+
+from config import settings
 
 # 1. ESTA ES LA LÍNEA QUE DEBES CAMBIAR
 # Apunta directamente a tu base de datos MySQL de reportes_mineria.
@@ -9,13 +16,138 @@ DATABASE_URL = os.getenv("DATABASE_URL")
 if not DATABASE_URL:
     raise ValueError("DATABASE_URL no está configurada en las variables de entorno.")
 
+# Driver async equivalente a cada driver sync (y al revés). DATABASE_URL puede
+# venir con cualquiera de los dos; el otro motor se arma cambiando el esquema.
+# Ej: mysql+pymysql://... <-> mysql+aiomysql://...   sqlite:///x.db <-> sqlite+aiosqlite:///x.db
+ASYNC_DRIVERS = {
+    "mysql": "mysql+aiomysql",
+    "mysql+pymysql": "mysql+aiomysql",
+    "sqlite": "sqlite+aiosqlite",
+    "sqlite+pysqlite": "sqlite+aiosqlite",
+}
+SYNC_DRIVERS = {
+    "mysql+aiomysql": "mysql+pymysql",
+    "mysql+asyncmy": "mysql+pymysql",
+    "sqlite+aiosqlite": "sqlite",
+}
+
+
+def _with_driver(url: str, drivers: dict) -> str:
+    parsed = make_url(url)
+    driver = drivers.get(parsed.drivername)
+    if driver is None:
+        return url
+    return parsed.set(drivername=driver).render_as_string(hide_password=False)
+
+
+SYNC_DATABASE_URL = _with_driver(DATABASE_URL, SYNC_DRIVERS)
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL") or _with_driver(DATABASE_URL, ASYNC_DRIVERS)
+
+
+# --- Pool de conexiones instrumentado ---
+class PoolStats:
+    """Contadores de checkout de un pool (tiempo de espera, overflow, timeouts)."""
+
+    def __init__(self):
+        self._lock = Lock()
+        self.checkouts = 0
+        self.espera_total = 0.0
+        self.espera_max = 0.0
+        self.overflows = 0
+        self.timeouts = 0
+
+    def registrar_checkout(self, espera: float) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.espera_total += espera
+            self.espera_max = max(self.espera_max, espera)
+
+    def registrar_overflow(self) -> None:
+        with self._lock:
+            self.overflows += 1
+
+    def registrar_timeout(self) -> None:
+        with self._lock:
+            self.timeouts += 1
+
+    def snapshot(self, pool) -> dict:
+        with self._lock:
+            return {
+                "tamano": pool.size(),
+                "en_uso": pool.checkedout(),
+                "libres": pool.checkedin(),
+                "overflow_actual": max(pool.overflow(), 0),
+                "checkouts": self.checkouts,
+                "espera_media_ms": round(self.espera_total / self.checkouts * 1000, 3) if self.checkouts else 0,
+                "espera_max_ms": round(self.espera_max * 1000, 3),
+                "eventos_overflow": self.overflows,
+                "timeouts": self.timeouts,
+            }
+
+
+class _InstrumentedPoolMixin:
+    # Compartido por clase: Pool.recreate() crea una instancia nueva sin argumentos extra
+    stats: PoolStats
+
+    def connect(self):
+        inicio = time.perf_counter()
+        try:
+            conn = super().connect()
+        except exc.TimeoutError:
+            self.stats.registrar_timeout()
+            raise
+        self.stats.registrar_checkout(time.perf_counter() - inicio)
+        return conn
+
+    def _create_connection(self):
+        # _overflow > 0: la conexión se abre por sobre pool_size
+        if self._overflow > 0:
+            self.stats.registrar_overflow()
+        return super()._create_connection()
+
+
+class InstrumentedQueuePool(_InstrumentedPoolMixin, QueuePool):
+    stats = PoolStats()
+
+
+class InstrumentedAsyncPool(_InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    stats = PoolStats()
+
+
+def _pool_kwargs() -> dict:
+    # SQLite en memoria usa su propio pool sin tamaño configurable
+    if make_url(SYNC_DATABASE_URL).get_backend_name() == "sqlite" and ":memory:" in SYNC_DATABASE_URL:
+        return {}
+    return {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+
+
+def pool_stats() -> dict:
+    return {
+        "sync": InstrumentedQueuePool.stats.snapshot(engine.pool) if isinstance(engine.pool, QueuePool) else None,
+        "async": InstrumentedAsyncPool.stats.snapshot(async_engine.pool) if isinstance(async_engine.pool, QueuePool) else None,
+    }
+
 
 # El 'connect_args' es solo para SQLite, ya no lo necesitas.
-engine = create_engine(DATABASE_URL)
+# Motor sync: scripts y migraciones
+_sync_pool = {"poolclass": InstrumentedQueuePool, **_pool_kwargs()} if _pool_kwargs() else {}
+engine = create_engine(SYNC_DATABASE_URL, **_sync_pool)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
+# Motor async: lo usan las rutas, así las consultas no bloquean el event loop
+_async_pool = {"poolclass": InstrumentedAsyncPool, **_pool_kwargs()} if _pool_kwargs() else {}
+async_engine = create_async_engine(ASYNC_DATABASE_URL, **_async_pool)
+
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False, class_=AsyncSession)
+
 def get_db():
     db = SessionLocal()
     try:
@@ -23,3 +155,6 @@ def get_db():
     finally:
         db.close()
 
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
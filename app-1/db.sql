@@ -1,8 +1,10 @@
 --BORRA TABLAS SI EXISTEN
+DROP TABLE IF EXISTS Bitacora_reportes_archivo;
 DROP TABLE IF EXISTS Bitacora_reportes;
 DROP TABLE IF EXISTS Multimedia_reportes;
 DROP TABLE IF EXISTS Reportes;
 DROP TABLE IF EXISTS Usuarios;
+DROP TABLE IF EXISTS Respuestas_idempotencia;
 DROP TABLE IF EXISTS Estado_transicion;
 DROP TABLE IF EXISTS Estado_reportes;
 DROP TABLE IF EXISTS Severidad;
@@ -32,6 +34,7 @@ CREATE TABLE Usuarios(
     `ID_Cargo` INT,
     `ID_Estado_trabajador` INT,
     `Primer_inicio_sesion` TINYINT NOT NULL DEFAULT 1,
+    `Version_token` INT NOT NULL DEFAULT 0,
     PRIMARY KEY (`RUT`),
     FOREIGN KEY (`ID_Cargo`) REFERENCES Cargos(`ID_Cargo`) ON UPDATE CASCADE ON DELETE SET NULL,
     FOREIGN KEY (`ID_Estado_trabajador`) REFERENCES Estado_trabajador(`ID_Estado_trabajador`) ON UPDATE CASCADE ON DELETE SET NULL
@@ -77,9 +80,20 @@ CREATE TABLE Reportes(
 );
 
 -- Índices sugeridos para rendimiento en joins/consultas
-CREATE INDEX idx_reportes_rut_usuario ON Reportes(`RUT`);
-CREATE INDEX idx_reportes_id_area ON Reportes(`ID_Area`);
 CREATE INDEX idx_reportes_fecha ON Reportes(`Fecha_Reporte`);
+-- Paginación por cursor (Hora_Creado, ID_Reporte), sin filtro y con cada filtro de igualdad.
+-- Los de RUT y área también cubren sus llaves foráneas.
+CREATE INDEX idx_reportes_creado ON Reportes(`Hora_Creado`, `ID_Reporte`);
+CREATE INDEX idx_reportes_rut_creado ON Reportes(`RUT`, `Hora_Creado`, `ID_Reporte`);
+CREATE INDEX idx_reportes_area_creado ON Reportes(`ID_Area`, `Hora_Creado`, `ID_Reporte`);
+CREATE INDEX idx_reportes_severidad_creado ON Reportes(`ID_Severidad`, `Hora_Creado`, `ID_Reporte`);
+CREATE INDEX idx_reportes_estado_creado ON Reportes(`ID_Estado_Actual`, `Hora_Creado`, `ID_Reporte`);
+-- Cambios desde un watermark para GET /sync/changes (todos, y los de un trabajador)
+CREATE INDEX idx_reportes_actualizado ON Reportes(`Hora_Actualizado`, `ID_Reporte`);
+CREATE INDEX idx_reportes_rut_actualizado ON Reportes(`RUT`, `Hora_Actualizado`, `ID_Reporte`);
+-- Un reporte por UUID de la app y por petición de idempotencia (sp_insertar_reporte depende de esto)
+CREATE UNIQUE INDEX uq_reportes_uuid_cliente ON Reportes(`UUID_Cliente`);
+CREATE UNIQUE INDEX uq_reportes_peticion_idempotencia ON Reportes(`Peticiones_Idempotencia`);
 
 CREATE TABLE Multimedia_reportes(
     `ID_Multimedia` INT NOT NULL AUTO_INCREMENT,
@@ -106,6 +120,39 @@ CREATE TABLE Bitacora_reportes(
 );
 
 CREATE INDEX idx_bitacora_id_reporte ON Bitacora_reportes(`ID_Reporte`);
+CREATE INDEX idx_bitacora_fecha ON Bitacora_reportes(`Actualizacion_Fecha`, `ID_Bitacora`);
+CREATE INDEX idx_bitacora_rut_fecha ON Bitacora_reportes(`RUT`, `Actualizacion_Fecha`, `ID_Bitacora`);
+CREATE INDEX idx_bitacora_reporte_fecha ON Bitacora_reportes(`ID_Reporte`, `Actualizacion_Fecha`, `ID_Bitacora`);
+
+-- Bitácora archivada: filas más viejas que BITACORA_ARCHIVO_DIAS (ver crud/bitacora.py)
+CREATE TABLE Bitacora_reportes_archivo(
+    `ID_Bitacora` INT NOT NULL,
+    `Nombre_Administrador` VARCHAR(255),
+    `Detalle` TEXT,
+    `Actualizacion_Fecha` DATETIME NOT NULL,
+    `ID_Estado_Actual` INT,
+    `ID_Reporte` INT,
+    `RUT` BIGINT,
+    `Archivado` DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (`ID_Bitacora`)
+);
+
+CREATE INDEX idx_bitacora_archivo_fecha ON Bitacora_reportes_archivo(`Actualizacion_Fecha`, `ID_Bitacora`);
+CREATE INDEX idx_bitacora_archivo_rut_fecha ON Bitacora_reportes_archivo(`RUT`, `Actualizacion_Fecha`, `ID_Bitacora`);
+CREATE INDEX idx_bitacora_archivo_reporte_fecha ON Bitacora_reportes_archivo(`ID_Reporte`, `Actualizacion_Fecha`, `ID_Bitacora`);
+
+-- Respuestas ya enviadas por Idempotency-Key, para repetirlas sin volver a escribir
+CREATE TABLE Respuestas_idempotencia(
+    `RUT` BIGINT NOT NULL,
+    `Clave` VARCHAR(255) NOT NULL,
+    `Huella` CHAR(64) NOT NULL,
+    `Codigo_estado` INT NOT NULL,
+    `Respuesta` MEDIUMTEXT NOT NULL,
+    `Creado` DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (`RUT`, `Clave`)
+);
+
+CREATE INDEX idx_respuestas_idempotencia_creado ON Respuestas_idempotencia(`Creado`);
 
 CREATE TABLE Estado_transicion(
     `ID_Transicion` INT NOT NULL AUTO_INCREMENT,
@@ -116,6 +163,9 @@ CREATE TABLE Estado_transicion(
     FOREIGN KEY (`Estado_Hacia`) REFERENCES Estado_reportes(`ID_Estado_Actual`) ON UPDATE CASCADE ON DELETE CASCADE     
 );
 
+-- fn_transicion_valida busca por las dos columnas
+CREATE UNIQUE INDEX uq_estado_transicion ON Estado_transicion(`Estado_Desde`, `Estado_Hacia`);
+
 
 -- INSERTS
 INSERT INTO Cargos (ID_Cargo, Nombre_Cargo) VALUES
@@ -257,7 +307,9 @@ BEGIN
     IF NEW.UUID_Cliente <> OLD.UUID_Cliente THEN
         SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = 'UUID_Cliente no puede ser modificado.';
     END IF;
-    IF NEW.ID_Estado_Actual <> OLD.ID_Estado_Actual THEN
+    -- sp_cambiar_estado_reporte ya validó la transición y lo avisa con
+    -- @sigra_transicion_validada; un UPDATE directo sí se valida aquí
+    IF NEW.ID_Estado_Actual <> OLD.ID_Estado_Actual AND @sigra_transicion_validada IS NULL THEN
         IF fn_transicion_valida(OLD.ID_Estado_Actual, NEW.ID_Estado_Actual) = 0 THEN
             SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = 'Transición de estado no permitida.';
         END IF;
@@ -277,7 +329,8 @@ DELIMITER ;
 
 -- PROCEDIMIENTOS ALMACENADOS
 
--- INSERTAR UN REPORTE VALIDANDO AREA/SEVERIDAD Y EVITANDO DUPLICADOS POR PETICION IDEMPOTENCIA O UUID_CLIENTE
+-- INSERTAR UN REPORTE VALIDANDO AREA/SEVERIDAD. LOS DUPLICADOS (UUID_CLIENTE O PETICION IDEMPOTENCIA)
+-- LOS DETIENEN LOS INDICES UNICOS: EN ESE CASO RETORNA EL ID EXISTENTE Y p_duplicado = 1
 DELIMITER $$
 CREATE PROCEDURE sp_insertar_reporte(
     IN p_titulo VARCHAR(255),
@@ -289,9 +342,14 @@ CREATE PROCEDURE sp_insertar_reporte(
     IN p_id_area INT,
     IN p_id_estado_actual INT,
     IN p_peticiones_idempotencia VARCHAR(255),
-    OUT p_id_reporte INT
+    OUT p_id_reporte INT,
+    OUT p_duplicado TINYINT
 )
 BEGIN
+    -- 1062 = llave duplicada en uq_reportes_uuid_cliente o uq_reportes_peticion_idempotencia
+    DECLARE CONTINUE HANDLER FOR 1062 SET p_duplicado = 1;
+    SET p_duplicado = 0;
+    SET p_id_reporte = NULL;
     -- Validar existencia de Area
     IF NOT EXISTS (SELECT 1 FROM Areas WHERE ID_Area = p_id_area) THEN
         SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = 'ID_Area no existe.';
@@ -300,18 +358,20 @@ BEGIN
     IF NOT EXISTS (SELECT 1 FROM Severidad WHERE ID_Severidad = p_id_severidad) THEN
         SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = 'ID_Severidad no existe.';
     END IF;
-    -- Evitar duplicados por Peticiones_Idempotencia
-    IF p_peticiones_idempotencia IS NOT NULL AND EXISTS (SELECT 1 FROM Reportes WHERE Peticiones_Idempotencia = p_peticiones_idempotencia) THEN
-        SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = 'Reporte con la misma Peticiones_Idempotencia ya existe.';
-    END IF;
-    -- Evitar duplicados por UUID_Cliente
-    IF p_uuid_cliente IS NOT NULL AND EXISTS (SELECT 1 FROM Reportes WHERE UUID_Cliente = p_uuid_cliente) THEN
-        SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = 'Reporte con el mismo UUID_Cliente ya existe.';
-    END IF;
-    -- Insertar el reporte
+    -- Insertar el reporte; los índices únicos detienen los duplicados sin carrera
     INSERT INTO Reportes (Titulo, Descripcion, Fecha_Reporte, UUID_Cliente, RUT, ID_Severidad, ID_Area, ID_Estado_Actual, Peticiones_Idempotencia)
     VALUES (p_titulo, p_descripcion, p_fecha_reporte, p_uuid_cliente, p_rut, p_id_severidad, p_id_area, p_id_estado_actual, p_peticiones_idempotencia);
-    SET p_id_reporte = LAST_INSERT_ID();
+    IF p_duplicado = 0 THEN
+        SET p_id_reporte = LAST_INSERT_ID();
+    ELSE
+        -- Retornar el reporte que ya existía (búsqueda por índice único)
+        IF p_uuid_cliente IS NOT NULL THEN
+            SELECT ID_Reporte INTO p_id_reporte FROM Reportes WHERE UUID_Cliente = p_uuid_cliente;
+        END IF;
+        IF p_id_reporte IS NULL AND p_peticiones_idempotencia IS NOT NULL THEN
+            SELECT ID_Reporte INTO p_id_reporte FROM Reportes WHERE Peticiones_Idempotencia = p_peticiones_idempotencia;
+        END IF;
+    END IF;
 END$$
 DELIMITER ;
 
@@ -326,6 +386,12 @@ CREATE PROCEDURE sp_cambiar_estado_reporte(
 )
 BEGIN
     DECLARE v_estado_actual INT;
+    -- Si algo falla no dejar la variable puesta en la conexión (vuelve al pool)
+    DECLARE EXIT HANDLER FOR SQLEXCEPTION
+    BEGIN
+        SET @sigra_transicion_validada = NULL;
+        RESIGNAL;
+    END;
     -- Obtener estado actual
     SELECT ID_Estado_Actual INTO v_estado_actual FROM Reportes WHERE ID_Reporte = p_id_reporte;
     IF v_estado_actual IS NULL THEN
@@ -335,8 +401,10 @@ BEGIN
     IF fn_transicion_valida(v_estado_actual, p_nuevo_estado) = 0 THEN
         SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = 'Transición de estado no permitida.';
     END IF;
-    -- Actualizar estado
+    -- Actualizar estado (el trigger no repite la validación)
+    SET @sigra_transicion_validada = 1;
     UPDATE Reportes SET ID_Estado_Actual = p_nuevo_estado WHERE ID_Reporte = p_id_reporte;
+    SET @sigra_transicion_validada = NULL;
     -- Registrar en bitacora
     INSERT INTO Bitacora_reportes (Nombre_Administrador, Detalle, Actualizacion_Fecha, ID_Reporte, ID_Estado_Actual, RUT)
     VALUES (p_nombre_administrador, COALESCE(p_detalle, CONCAT('Cambio de estado ',v_estado_actual, ' -> ',p_nuevo_estado)), CURRENT_TIMESTAMP, p_id_reporte, p_nuevo_estado, p_rut);
@@ -1,7 +1,8 @@
 # app-1/esquemas/reportes.py
 from pydantic import BaseModel, Field
 from datetime import date, datetime
-from typing import Optional
+from typing import List, Optional
+from typing_extensions import TypedDict  # pydantic lo exige en Python < 3.12
 
 # --- Schema para CREAR un Reporte ---
 class ReporteCreate(BaseModel):
@@ -16,6 +17,24 @@ class ReporteCreate(BaseModel):
     rut: Optional[int] = None
 
 
+# --- Filtros para listar/exportar Reportes ---
+class FiltrosReportes(BaseModel):
+    id_area: Optional[int] = None
+    id_severidad: Optional[int] = None
+    id_estado: Optional[int] = None
+    rut: Optional[int] = None
+    desde: Optional[date] = None  # Hora_Creado >= desde
+    hasta: Optional[date] = None  # Hora_Creado < hasta + 1 día
+
+
+# --- Filtros de GET /reportes/bitacora ---
+class FiltrosBitacora(BaseModel):
+    id_reporte: Optional[int] = None
+    rut: Optional[int] = None     # quién hizo el cambio
+    desde: Optional[date] = None  # Actualizacion_Fecha >= desde
+    hasta: Optional[date] = None  # Actualizacion_Fecha < hasta + 1 día
+
+
 # --- Schemas para Catálogos ---
 class AreaSchema(BaseModel):
     ID_Area: int
@@ -37,6 +56,54 @@ class EstadoReporteSchema(BaseModel):
         from_attributes = True
 
 
+class EstadoTransicionSchema(BaseModel):
+    ID_Transicion: int
+    Estado_Desde: Optional[int] = None
+    Estado_Hacia: Optional[int] = None
+
+    class Config:
+        from_attributes = True
+
+
+# --- Todos los catálogos en una sola respuesta (arranque de la app móvil) ---
+class CatalogosBundle(BaseModel):
+    version: str  # hash del contenido; cambia solo si cambia algún catálogo
+    areas: List[AreaSchema]
+    severidad: List[SeveridadSchema]
+    estados: List[EstadoReporteSchema]
+    transiciones: List[EstadoTransicionSchema]
+
+
+class CatalogosVersion(BaseModel):
+    version: str
+
+
+# --- Respuesta de POST /reportes/{id}/multimedia ---
+class MultimediaSubida(BaseModel):
+    id_multimedia: int
+    tipo: str
+    sha256: str
+    bytes: int
+    duplicado: bool  # True si el reporte ya tenía este mismo archivo
+
+
+# --- Subida por partes (POST /reportes/{id}/multimedia/sesiones) ---
+class SesionSubidaCreate(BaseModel):
+    tipo: str      # Content-Type del archivo, ej. video/mp4
+    tamano: int    # bytes del archivo completo
+
+
+class SesionSubida(BaseModel):
+    id_sesion: str
+    tipo: str
+    tamano: int
+    parte_bytes: int             # todas las partes miden esto, salvo la última
+    partes_total: int
+    partes_recibidas: List[int]
+    recibido: int                # bytes recibidos sin huecos desde el inicio
+    completa: bool
+
+
 # --- Schema para MOSTRAR un Reporte ---
 class Reporte(BaseModel):
     ID_Reporte: int
@@ -51,4 +118,70 @@ class Reporte(BaseModel):
     ID_Estado_Actual: int
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+
+# --- Filas de los listados de reportes ---
+# TypedDict y no BaseModel: las filas de la BD se serializan directo a JSON
+# con un TypeAdapter, sin crear un objeto por fila (ver crud/reportes.py)
+class ReporteListado(TypedDict):
+    ID_Reporte: int
+    Titulo: str
+    Descripcion: Optional[str]
+    Fecha_Reporte: Optional[date]
+    Hora_Creado: datetime
+    Hora_Sincronizado: Optional[datetime]
+    RUT: Optional[int]
+    ID_Severidad: Optional[int]
+    ID_Area: Optional[int]
+    ID_Estado_Actual: Optional[int]
+    Nombre_Area: Optional[str]
+    Nombre_Severidad: Optional[str]
+    Nombre_Estado: Optional[str]
+    Nombre_Usuario: Optional[str]
+
+
+# --- Detalle de un reporte con ?include=multimedia,bitacora ---
+class MultimediaReporte(TypedDict):
+    ID_Multimedia: int
+    Tipo_Multimedia: Optional[str]
+    url: str  # GET /reportes/{id}/multimedia/{ID_Multimedia}
+
+
+class BitacoraReporte(TypedDict):
+    ID_Bitacora: int
+    ID_Estado_Actual: Optional[int]
+    Nombre_Estado: Optional[str]
+    Nombre_Administrador: Optional[str]
+    Detalle: Optional[str]
+    Actualizacion_Fecha: datetime
+
+
+# total=False: multimedia y bitacora solo vienen si se pidieron en include
+class ReporteDetalle(ReporteListado, total=False):
+    multimedia: List[MultimediaReporte]
+    bitacora: List[BitacoraReporte]
+
+
+# --- Historial de cambios (GET /reportes/bitacora) ---
+class BitacoraRegistro(TypedDict):
+    ID_Bitacora: int
+    ID_Reporte: Optional[int]
+    ID_Estado_Actual: Optional[int]
+    Nombre_Estado: Optional[str]
+    Nombre_Administrador: Optional[str]
+    Detalle: Optional[str]
+    Actualizacion_Fecha: datetime
+    RUT: Optional[int]
+    Archivado: bool  # True si viene de Bitacora_reportes_archivo
+
+
+class BitacoraPage(TypedDict):
+    items: List[BitacoraRegistro]
+    next_cursor: Optional[str]
+
+
+# --- Página de reportes (paginación por cursor) ---
+class ReportePage(TypedDict):
+    items: List[ReporteListado]
+    next_cursor: Optional[str]  # None = no hay más páginas
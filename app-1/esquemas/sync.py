@@ -0,0 +1,63 @@
+# app-1/esquemas/sync.py
+from pydantic import BaseModel
+from datetime import date, datetime
+from typing import List, Literal, Optional
+from typing_extensions import TypedDict  # pydantic lo exige en Python < 3.12
+
+from esquemas.reportes import ReporteCreate
+
+
+# --- Lote de reportes guardados offline en el dispositivo ---
+class SyncBatch(BaseModel):
+    reportes: List[ReporteCreate]
+    device_id: Optional[str] = None  # solo informativo (logs)
+
+
+# --- Resultado de cada reporte del lote (mismo orden que se enviaron) ---
+class SyncItemResult(BaseModel):
+    uuid_cliente: str
+    estado: Literal["creado", "duplicado", "error"]
+    id_reporte: Optional[int] = None  # ID en el servidor (creado o ya existente)
+    error: Optional[str] = None
+
+
+class SyncBatchResult(BaseModel):
+    creados: int
+    duplicados: int
+    errores: int
+    resultados: List[SyncItemResult]
+
+
+# --- Cambios desde el último watermark (GET /sync/changes) ---
+# TypedDict: se serializan directo desde las filas, como los listados de reportes
+class ReporteCambio(TypedDict):
+    ID_Reporte: int
+    UUID_Cliente: Optional[str]
+    Titulo: str
+    Descripcion: Optional[str]
+    Fecha_Reporte: Optional[date]
+    Hora_Creado: datetime
+    Hora_Actualizado: datetime
+    RUT: Optional[int]
+    ID_Severidad: Optional[int]
+    ID_Area: Optional[int]
+    ID_Estado_Actual: Optional[int]
+    Nombre_Area: Optional[str]
+    Nombre_Severidad: Optional[str]
+    Nombre_Estado: Optional[str]
+
+
+class BitacoraCambio(TypedDict):
+    ID_Bitacora: int
+    ID_Reporte: Optional[int]
+    ID_Estado_Actual: Optional[int]
+    Nombre_Administrador: Optional[str]
+    Detalle: Optional[str]
+    Actualizacion_Fecha: datetime
+
+
+class SyncChanges(TypedDict):
+    reportes: List[ReporteCambio]
+    bitacora: List[BitacoraCambio]  # cambios de estado de los reportes de esta página
+    watermark: Optional[str]  # enviar como `since` en la próxima llamada
+    hay_mas: bool  # True: llamar de nuevo enseguida con el nuevo watermark
@@ -1,4 +1,5 @@
 from pydantic import BaseModel
+from typing import List
 
 
 # Schema para crear un usuario (por el admin)
@@ -10,6 +11,11 @@ class UserCreate(BaseModel):
     ID_Cargo: int
     ID_Estado_trabajador: int = 1  # Por defecto activo
 
+# Resultado de la creación masiva de usuarios
+class UserBulkResult(BaseModel):
+    creados: List[int]
+    existentes: List[int]  # RUTs que ya estaban registrados (o repetidos en el lote)
+
 # Schema para cambiar contraseña
 class PasswordChange(BaseModel):
     password: str
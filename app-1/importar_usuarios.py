@@ -0,0 +1,104 @@
+"""
+Importa usuarios desde una lista de texto como trabajadores_admins.txt.
+
+Formato: una línea de encabezado por sección (TRABAJADORES o
+ADMINISTRADORES/ADMINS) y debajo una persona por línea:
+
+    Nombre(s) Apellido_1 Apellido_2 RUT
+
+La contraseña inicial es la de siempre (últimos 4 dígitos del RUT) y todos
+quedan con Primer_inicio_sesion = 1.
+
+Uso:
+    python importar_usuarios.py ../trabajadores_admins.txt [--dry-run]
+"""
+import argparse
+import asyncio
+import sys
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from database import AsyncSessionLocal, async_engine
+from esquemas.usuarios import UserCreate
+from crud.usuarios import crear_usuarios_lote
+from crud.security import shutdown_hash_pool
+
+# Encabezado de sección -> ID_Cargo
+SECCIONES = {
+    "ADMINISTRADORES": 1,
+    "ADMINS": 1,
+    "TRABAJADORES": 2,
+}
+
+
+def parsear_lista(lineas, cargo_por_defecto=2):
+    usuarios, errores = [], []
+    cargo = cargo_por_defecto
+    for numero, linea in enumerate(lineas, start=1):
+        partes = linea.split()
+        if not partes:
+            continue
+        if len(partes) == 1 and partes[0].upper() in SECCIONES:
+            cargo = SECCIONES[partes[0].upper()]
+            continue
+
+        rut = partes[-1].replace(".", "").split("-")[0]
+        nombres = partes[:-1]
+        if not rut.isdigit() or len(nombres) < 2:
+            errores.append(f"línea {numero}: no se pudo leer '{linea.strip()}'")
+            continue
+
+        # Los dos últimos nombres son los apellidos; el resto es el nombre
+        if len(nombres) == 2:
+            nombre, apellido_1, apellido_2 = nombres[0], nombres[1], None
+        else:
+            nombre, apellido_1, apellido_2 = " ".join(nombres[:-2]), nombres[-2], nombres[-1]
+        usuarios.append(UserCreate(
+            RUT=int(rut),
+            Nombre=nombre,
+            Apellido_1=apellido_1,
+            Apellido_2=apellido_2,
+            ID_Cargo=cargo,
+        ))
+    return usuarios, errores
+
+
+async def importar(usuarios):
+    try:
+        async with AsyncSessionLocal() as db:
+            return await crear_usuarios_lote(db, usuarios)
+    finally:
+        await async_engine.dispose()
+        shutdown_hash_pool()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("archivo")
+    parser.add_argument("--dry-run", action="store_true", help="Solo mostrar lo que se importaría")
+    args = parser.parse_args()
+
+    with open(args.archivo, encoding="utf-8") as f:
+        usuarios, errores = parsear_lista(f)
+
+    for error in errores:
+        print(f"⚠️ {error}")
+    print(f"{len(usuarios)} usuarios leídos de {args.archivo}")
+
+    if args.dry_run:
+        for u in usuarios:
+            print(f"  {u.RUT}  cargo={u.ID_Cargo}  {u.Nombre} {u.Apellido_1} {u.Apellido_2 or ''}")
+        return
+
+    resultado = asyncio.run(importar(usuarios))
+    print(f"✅ Creados: {len(resultado.creados)}")
+    if resultado.existentes:
+        print(f"ℹ️ Ya existían: {', '.join(str(r) for r in resultado.existentes)}")
+    if errores:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,7 @@
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.middleware.gzip import GZipMiddleware
 from dotenv import load_dotenv  # <-- 1. IMPORTA load_dotenv
 
 # 2. LLAMA a la función INMEDIATAMENTE
@@ -9,20 +12,48 @@ load_dotenv()
 # (Porque ahora la SECRET_KEY ya existe en el entorno)
 from routes import auth
 from routes import reportes
+from routes import admin
+from routes import sync
 from database import engine, Base
+from crud.security import shutdown_hash_pool
+from crud.catalogos import catalogos_cache
+from crud.multimedia import multimedia_service
+from crud.bitacora import bitacora_archiver
+from config import settings
 
 # Crear las tablas en la base de datos (si no existen) da Problemas
 #Base.metadata.create_all(bind=engine)
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Catálogos en memoria: desde aquí las rutas de catálogos no consultan la BD
+    await catalogos_cache.reload()
+    # Limpieza periódica de subidas por partes abandonadas
+    limpieza = asyncio.create_task(multimedia_service.purge_loop(settings.MEDIA_LIMPIEZA_MINUTOS * 60))
+    # Paso de la bitácora vieja a Bitacora_reportes_archivo
+    archivado = asyncio.create_task(bitacora_archiver.loop(settings.BITACORA_ARCHIVO_MINUTOS * 60))
+    yield
+    limpieza.cancel()
+    archivado.cancel()
+    # Liberar los workers de bcrypt al apagar
+    shutdown_hash_pool()
+
 app = FastAPI(
     title="SIGRA API",
     description="API para el sistema de gestion reportes de seguridad minera",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
+# Respuestas comprimidas si el cliente manda Accept-Encoding: gzip. Las que ya
+# traen Content-Encoding (el paquete de catálogos, precomprimido) pasan tal cual
+app.add_middleware(GZipMiddleware, minimum_size=settings.GZIP_MIN_BYTES, compresslevel=settings.GZIP_NIVEL)
+
 # Incluimos los routers
 app.include_router(auth.router)
 app.include_router(reportes.router)
+app.include_router(admin.router)
+app.include_router(sync.router)
 
 # Ruta base de prueba
 @app.get("/")
@@ -1,8 +1,9 @@
 # app-1/modulos/modelosORM.py
 from sqlalchemy import (
     Column, Integer, String, BIGINT, ForeignKey, 
-    Date, DateTime, Text
+    Date, DateTime, Text, Index
 )
+from sqlalchemy.dialects.mysql import MEDIUMTEXT
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship 
 from database import Base
@@ -66,6 +67,8 @@ class Usuarios(Base):
     ID_Cargo = Column(Integer, ForeignKey("Cargos.ID_Cargo"), nullable=False)
     ID_Estado_trabajador = Column(Integer, ForeignKey("Estado_trabajador.ID_Estado_trabajador"), nullable=False)
     Primer_inicio_sesion = Column(Integer, nullable=False, default=1)
+    # Se incrementa para revocar los JWT ya emitidos (claim "ver")
+    Version_token = Column(Integer, nullable=False, default=0, server_default="0")
 
     cargo_rel = relationship("Cargos", back_populates="usuarios")
     estado_trabajador_rel = relationship("Estado_trabajador", back_populates="usuarios")
@@ -99,6 +102,22 @@ class Reportes(Base):
     multimedia = relationship("Multimedia_reportes", back_populates="reporte_rel")
     bitacoras = relationship("Bitacora_reportes", back_populates="reporte_rel")
 
+    # Índices de Reportes (ver db.sql y las migraciones en alembic/)
+    __table_args__ = (
+        Index("idx_reportes_fecha", "Fecha_Reporte"),
+        Index("idx_reportes_creado", "Hora_Creado", "ID_Reporte"),
+        Index("idx_reportes_rut_creado", "RUT", "Hora_Creado", "ID_Reporte"),
+        Index("idx_reportes_area_creado", "ID_Area", "Hora_Creado", "ID_Reporte"),
+        Index("idx_reportes_severidad_creado", "ID_Severidad", "Hora_Creado", "ID_Reporte"),
+        Index("idx_reportes_estado_creado", "ID_Estado_Actual", "Hora_Creado", "ID_Reporte"),
+        # GET /sync/changes: cambios desde un watermark (Hora_Actualizado, ID_Reporte)
+        Index("idx_reportes_actualizado", "Hora_Actualizado", "ID_Reporte"),
+        Index("idx_reportes_rut_actualizado", "RUT", "Hora_Actualizado", "ID_Reporte"),
+        # Evitan reportes duplicados al sincronizar (ver sp_insertar_reporte)
+        Index("uq_reportes_uuid_cliente", "UUID_Cliente", unique=True),
+        Index("uq_reportes_peticion_idempotencia", "Peticiones_Idempotencia", unique=True),
+    )
+
 
 class Multimedia_reportes(Base):
     __tablename__ = "Multimedia_reportes"
@@ -127,9 +146,54 @@ class Bitacora_reportes(Base):
     reporte_rel = relationship("Reportes", back_populates="bitacoras")
     usuario_rel = relationship("Usuarios", back_populates="bitacoras")
 
+    # GET /reportes/bitacora: orden (Actualizacion_Fecha, ID_Bitacora) con y sin filtro
+    __table_args__ = (
+        Index("idx_bitacora_fecha", "Actualizacion_Fecha", "ID_Bitacora"),
+        Index("idx_bitacora_rut_fecha", "RUT", "Actualizacion_Fecha", "ID_Bitacora"),
+        Index("idx_bitacora_reporte_fecha", "ID_Reporte", "Actualizacion_Fecha", "ID_Bitacora"),
+    )
+
+
+class Bitacora_reportes_archivo(Base):
+    # Filas de Bitacora_reportes más viejas que BITACORA_ARCHIVO_DIAS (las mueve
+    # crud/bitacora.py). Mismo ID_Bitacora que tenían; sin llaves foráneas
+    __tablename__ = "Bitacora_reportes_archivo"
+    ID_Bitacora = Column(Integer, primary_key=True, autoincrement=False)
+    Nombre_Administrador = Column(String(255), nullable=True)
+    Detalle = Column(Text, nullable=True)
+    Actualizacion_Fecha = Column(DateTime, nullable=False)
+    ID_Estado_Actual = Column(Integer, nullable=True)
+    ID_Reporte = Column(Integer, nullable=True)
+    RUT = Column(BIGINT, nullable=True)
+    Archivado = Column(DateTime, nullable=False, server_default=func.now())
+
+    __table_args__ = (
+        Index("idx_bitacora_archivo_fecha", "Actualizacion_Fecha", "ID_Bitacora"),
+        Index("idx_bitacora_archivo_rut_fecha", "RUT", "Actualizacion_Fecha", "ID_Bitacora"),
+        Index("idx_bitacora_archivo_reporte_fecha", "ID_Reporte", "Actualizacion_Fecha", "ID_Bitacora"),
+    )
+
 
 class Estado_transicion(Base):
     __tablename__ = "Estado_transicion"
     ID_Transicion = Column(Integer, primary_key=True, autoincrement=True)
     Estado_Desde = Column(Integer, ForeignKey("Estado_reportes.ID_Estado_Actual"), nullable=True)
-    Estado_Hacia = Column(Integer, ForeignKey("Estado_reportes.ID_Estado_Actual"), nullable=True)
\ No newline at end of file
+    Estado_Hacia = Column(Integer, ForeignKey("Estado_reportes.ID_Estado_Actual"), nullable=True)
+    __table_args__ = (
+        # fn_transicion_valida busca por (Estado_Desde, Estado_Hacia)
+        Index("uq_estado_transicion", "Estado_Desde", "Estado_Hacia", unique=True),
+    )
+
+class Respuestas_idempotencia(Base):
+    # Respuestas guardadas por Idempotency-Key (ver crud/idempotencia.py)
+    __tablename__ = "Respuestas_idempotencia"
+    RUT = Column(BIGINT, primary_key=True)
+    Clave = Column(String(255), primary_key=True)
+    Huella = Column(String(64), nullable=False)  # sha256 del cuerpo de la petición
+    Codigo_estado = Column(Integer, nullable=False)
+    Respuesta = Column(Text().with_variant(MEDIUMTEXT(), "mysql"), nullable=False)  # cuerpo JSON original
+    Creado = Column(DateTime, nullable=False, server_default=func.now())
+
+    __table_args__ = (
+        Index("idx_respuestas_idempotencia_creado", "Creado"),
+    )
@@ -0,0 +1,57 @@
+# app-1/routes/admin.py
+from fastapi import APIRouter, Depends
+
+from esquemas.usuarios import TokenData
+from crud.bitacora import bitacora_archiver
+from crud.catalogos import catalogos_cache
+from crud.idempotencia import idempotency_store
+from crud.multimedia import multimedia_service
+from crud.principales import principal_cache, token_versions
+from crud.security import hash_pool_stats, require_cargo
+from crud.rate_limit import login_limiter_ip, login_limiter_rut
+from database import pool_stats
+
+router = APIRouter(prefix="/admin", tags=["Administración"])
+
+
+@router.get('/metricas')
+async def metricas(admin: TokenData = Depends(require_cargo(1))):
+    """
+    Contadores internos de este proceso (caches, pools, etc.).
+    Solo para administradores.
+    """
+    return {
+        "cache_usuarios": principal_cache.stats(),
+        "versiones_token": token_versions.stats(),
+        "pool_bd": pool_stats(),
+        "pool_bcrypt": hash_pool_stats(),
+        "limite_login": {
+            "por_ip": login_limiter_ip.stats(),
+            "por_rut": login_limiter_rut.stats(),
+        },
+        "catalogos": catalogos_cache.stats(),
+        "idempotencia": idempotency_store.stats(),
+        "multimedia": multimedia_service.stats(),
+        "archivo_bitacora": bitacora_archiver.stats(),
+    }
+
+
+@router.post('/catalogos/refrescar')
+async def refrescar_catalogos(admin: TokenData = Depends(require_cargo(1))):
+    """
+    Recarga los catálogos desde la BD (después de editar Areas, Severidad o
+    Estado_reportes). Solo afecta a este proceso; los demás se actualizan
+    al vencer CATALOGOS_TTL.
+    """
+    await catalogos_cache.reload()
+    return catalogos_cache.stats()
+
+
+@router.post('/bitacora/archivar')
+async def archivar_bitacora(admin: TokenData = Depends(require_cargo(1))):
+    """
+    Pasa ahora (sin esperar a la tarea periódica) la bitácora más vieja que
+    BITACORA_ARCHIVO_DIAS a Bitacora_reportes_archivo.
+    """
+    movidas = await bitacora_archiver.run_once()
+    return {"filas_movidas": movidas, **bitacora_archiver.stats()}
@@ -1,97 +1,97 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Request
-from fastapi.security import OAuth2PasswordRequestForm, OAuth2PasswordBearer
-from sqlalchemy.orm import Session
+from fastapi.security import OAuth2PasswordRequestForm
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from jose import JWTError, jwt
 from typing import Optional
 
-from database import get_db
+from database import get_async_db
 from modulos.modelosORM import Usuarios
-from esquemas.usuarios import Token, UserLogin, UserCreate, PasswordChange, TokenData, User, UserStateUpdate
-from crud.security import verify_password, create_access_token, get_password_hash, SECRET_KEY, ALGORITHM
+from esquemas.usuarios import Token, UserLogin, UserCreate, PasswordChange, TokenData, User, UserStateUpdate, UserBulkResult
+from crud.security import (
+    verify_password_async, create_access_token, get_password_hash_async, SECRET_KEY, ALGORITHM,
+    get_current_user, require_cargo, DUMMY_PASSWORD_HASH, password_needs_rehash
+)
+from crud.usuarios import crear_usuarios_lote, initial_password
+from crud.rate_limit import login_limiter_ip, login_limiter_rut, retry_after_header
+from crud.principales import principal_cache, token_versions
 from typing import List
-
-oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
+from config import settings
 
 router = APIRouter(prefix="/auth", tags=["Authenticación"])
 
 
-async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> Usuarios:
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="No se pudo validar las credenciales",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        rut: Optional[int] = payload.get("rut")
-        if rut is None:
-            raise credentials_exception
-        token_data = TokenData(RUT=rut, cargo=payload.get("cargo"))
-    except JWTError:
-        raise credentials_exception
-    
-    user = db.query(Usuarios).filter(Usuarios.RUT == token_data.RUT).first()
-    if user is None:
-        raise credentials_exception
-    return user
-
 @router.post("/usuarios", status_code=status.HTTP_201_CREATED)
-async def create_user(user: UserCreate, db: Session = Depends(get_db)):
+async def create_user(user: UserCreate, db: AsyncSession = Depends(get_async_db)):
     # Verificar si el RUT ya existe
-    if db.query(Usuarios).filter(Usuarios.RUT == user.RUT).first():
+    if await db.get(Usuarios, user.RUT):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="El RUT ya está registrado"
         )
     
-    # Obtener los últimos 4 dígitos del RUT como contraseña inicial
-    initial_password = str(user.RUT)[-4:]
-    
-    # Crear el nuevo usuario
+    # Crear el nuevo usuario (contraseña inicial: últimos 4 dígitos del RUT)
     db_user = Usuarios(
         RUT=user.RUT,
         Nombre=user.Nombre,
         Apellido_1=user.Apellido_1,
         Apellido_2=user.Apellido_2,
-        Contraseña=get_password_hash(initial_password),
+        Contraseña=await get_password_hash_async(initial_password(user.RUT)),
         ID_Cargo=user.ID_Cargo,
         ID_Estado_trabajador=user.ID_Estado_trabajador,
         Primer_inicio_sesion=1
     )
     
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    await db.commit()
     return {"message": "Usuario creado exitosamente"}
 
 
+@router.post("/usuarios/bulk", response_model=UserBulkResult, status_code=status.HTTP_201_CREATED)
+async def create_users_bulk(
+    users: List[UserCreate],
+    admin: TokenData = Depends(require_cargo(1)),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Crea muchos usuarios en una sola llamada (ej: una cuadrilla nueva).
+    Los RUT ya registrados se informan en `existentes` y no se modifican.
+    """
+    if len(users) > settings.USUARIOS_LOTE_MAX:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Máximo {settings.USUARIOS_LOTE_MAX} usuarios por lote"
+        )
+    return await crear_usuarios_lote(db, users)
+
+
 @router.get("/usuarios", response_model=List[User])
-async def list_users(current_user: Usuarios = Depends(get_current_user), db: Session = Depends(get_db)):
+async def list_users(admin: TokenData = Depends(require_cargo(1)), db: AsyncSession = Depends(get_async_db)):
     # Solo administradores (ID_Cargo == 1) pueden listar usuarios
-    if current_user.ID_Cargo != 1:
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="No autorizado")
-    users = db.query(Usuarios).all()
-    return users
+    result = await db.execute(select(Usuarios))
+    return result.scalars().all()
 
 
 @router.patch("/usuarios/{rut}/estado", response_model=User)
-async def update_user_state(rut: int, state: UserStateUpdate, current_user: Usuarios = Depends(get_current_user), db: Session = Depends(get_db)):
+async def update_user_state(rut: int, state: UserStateUpdate, admin: TokenData = Depends(require_cargo(1)), db: AsyncSession = Depends(get_async_db)):
     # Solo administradores pueden actualizar estado
-    if current_user.ID_Cargo != 1:
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="No autorizado")
-    usuario = db.query(Usuarios).filter(Usuarios.RUT == rut).first()
+    usuario = await db.get(Usuarios, rut)
     if not usuario:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Usuario no encontrado")
+    if usuario.ID_Estado_trabajador != state.ID_Estado_trabajador:
+        # Revocar los tokens ya emitidos (ej: al desactivar al trabajador)
+        usuario.Version_token = (usuario.Version_token or 0) + 1
     usuario.ID_Estado_trabajador = state.ID_Estado_trabajador
-    db.commit()
-    db.refresh(usuario)
+    await db.commit()
+    token_versions.set(rut, usuario.Version_token)
+    principal_cache.invalidate(rut)
     return usuario
 
 @router.post("/cambiar-password", response_model=Token)
 async def change_password(
     request: Request,
     form_data: PasswordChange,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Permite cambiar la contraseña.
@@ -110,8 +110,11 @@ async def change_password(
         try:
             payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
             rut: Optional[int] = payload.get("rut")
-            if rut is not None:
-                usuario = db.query(Usuarios).filter(Usuarios.RUT == rut).first()
+            if token_versions.is_stale():
+                await token_versions.reload(db)
+            # Un token revocado no sirve para cambiar la contraseña
+            if rut is not None and payload.get("ver", 0) >= token_versions.get(rut):
+                usuario = await db.get(Usuarios, rut)
         except JWTError:
             usuario = None
 
@@ -119,7 +122,7 @@ async def change_password(
     if usuario is None:
         if form_data.RUT is None:
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="No se pudo validar las credenciales")
-        usuario = db.query(Usuarios).filter(Usuarios.RUT == form_data.RUT).first()
+        usuario = await db.get(Usuarios, form_data.RUT)
         if usuario is None:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Usuario no encontrado")
         # Permitir cambio sin token solo si es primer inicio de sesión
@@ -127,29 +130,43 @@ async def change_password(
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Operación no permitida sin autenticación completa")
 
     # Verificar la contraseña actual
-    if not verify_password(form_data.password, usuario.Contraseña):
+    if not await verify_password_async(form_data.password, usuario.Contraseña):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Contraseña actual incorrecta"
         )
 
     # Actualizar la contraseña y marcar que ya no es primer inicio de sesión
-    usuario.Contraseña = get_password_hash(form_data.new_password)
+    usuario.Contraseña = await get_password_hash_async(form_data.new_password)
     usuario.Primer_inicio_sesion = 0
-    db.commit()
-    db.refresh(usuario)
+    await db.commit()
+    principal_cache.invalidate(usuario.RUT)
 
     # Generar nuevo token
     access_token = create_access_token(
-        data={"sub": str(usuario.RUT), "rut": usuario.RUT, "cargo": usuario.ID_Cargo}
+        data={"sub": str(usuario.RUT), "rut": usuario.RUT, "cargo": usuario.ID_Cargo, "ver": usuario.Version_token}
     )
     return {"access_token": access_token, "token_type": "bearer"}
 
 @router.post("/login", response_model=Token)
-async def login_for_access_token(form_data: UserLogin, db: Session = Depends(get_db)):
+async def login_for_access_token(form_data: UserLogin, request: Request, db: AsyncSession = Depends(get_async_db)):
+    # Limitar intentos por IP y por RUT antes de gastar CPU en bcrypt
+    client_ip = request.client.host if request.client else "desconocida"
+    for limiter, key in ((login_limiter_ip, client_ip), (login_limiter_rut, form_data.RUT)):
+        espera = limiter.acquire(key)
+        if espera:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Demasiados intentos de inicio de sesión, intente más tarde",
+                headers=retry_after_header(espera),
+            )
+
     # Buscar el usuario por RUT
-    usuario = db.query(Usuarios).filter(Usuarios.RUT == form_data.RUT).first()
-    if not usuario or not verify_password(form_data.password, usuario.Contraseña):
+    usuario = await db.get(Usuarios, form_data.RUT)
+    # Si el RUT no existe se verifica igual contra un hash de relleno (mismo costo)
+    hash_guardado = usuario.Contraseña if usuario else DUMMY_PASSWORD_HASH
+    password_ok = await verify_password_async(form_data.password, hash_guardado)
+    if not usuario or not password_ok:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="RUT o contraseña incorrectos",
@@ -162,6 +179,11 @@ async def login_for_access_token(form_data: UserLogin, db: Session = Depends(get
             status_code=status.HTTP_403_FORBIDDEN,
             detail="El usuario no está activo",
         )
+
+    # Actualizar hashes con un costo de bcrypt distinto al configurado
+    if password_needs_rehash(usuario.Contraseña):
+        usuario.Contraseña = await get_password_hash_async(form_data.password)
+        await db.commit()
     
     # Si es primer inicio de sesión, devolver estado especial
     if usuario.Primer_inicio_sesion == 1:
@@ -173,13 +195,13 @@ async def login_for_access_token(form_data: UserLogin, db: Session = Depends(get
     
     # Crear el token de acceso
     access_token = create_access_token(
-        data={"sub": str(usuario.RUT), "rut": usuario.RUT, "cargo": usuario.ID_Cargo}
+        data={"sub": str(usuario.RUT), "rut": usuario.RUT, "cargo": usuario.ID_Cargo, "ver": usuario.Version_token}
     )
 
     return {"access_token": access_token, "token_type": "bearer"}
 
 
 @router.get('/me', response_model=User)
-async def read_current_user(current_user: Usuarios = Depends(get_current_user)):
+async def read_current_user(current_user: User = Depends(get_current_user)):
     # Devuelve la información del usuario actual
     return current_user
\ No newline at end of file
@@ -1,56 +1,104 @@
 # app-1/routes/reportes.py
-from fastapi import APIRouter, Depends, HTTPException, status, Body
+from fastapi import APIRouter, Depends, HTTPException, Header, Request, status, Body, Query
+from fastapi.responses import JSONResponse, StreamingResponse
 from sqlalchemy import text
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 
-from database import get_db
-from modulos.modelosORM import Areas, Severidad, Estado_reportes, Usuarios
-from esquemas.reportes import ReporteCreate, AreaSchema, SeveridadSchema , EstadoReporteSchema
-from routes.auth import get_current_user
+from database import get_async_db
+from esquemas.reportes import (
+    ReporteCreate, AreaSchema, SeveridadSchema , EstadoReporteSchema, FiltrosReportes, ReportePage, ReporteDetalle,
+    FiltrosBitacora, BitacoraPage,
+    CatalogosBundle, CatalogosVersion, MultimediaSubida, SesionSubidaCreate, SesionSubida
+)
+from esquemas.usuarios import User, TokenData
+from crud.bitacora import bitacora_page_adapter, filtros_bitacora, listar_bitacora
+from crud.catalogos import catalogos_cache
+from crud.compresion import GzipRoute, require_identity_encoding
+from crud.idempotencia import huella_peticion, idempotency_store
+from crud.multimedia import StoredMedia, UploadSession, multimedia_service
+from crud.security import get_current_user, get_token_data, require_cargo
+from crud.reportes import (
+    filtros_reportes, where_reportes, encode_cursor, typed_text, SELECT_REPORTES, exportar_reportes,
+    json_response, reporte_page_adapter, reporte_detalle_adapter, parse_include, cargar_relacionados
+)
 
-router = APIRouter(prefix="/reportes", tags=["Reportes"])
+# GzipRoute: POST /reportes/ acepta el cuerpo con Content-Encoding: gzip
+router = APIRouter(prefix="/reportes", tags=["Reportes"], route_class=GzipRoute)
 
 
 # ✅ CATÁLOGOS SIN AUTENTICACIÓN (para sincronización offline)
+# Se sirven desde memoria (crud/catalogos.py) con ETag: si el cliente manda
+# If-None-Match con la etiqueta vigente se responde 304 sin cuerpo.
+@router.get('/catalogos', response_model=CatalogosBundle)
+async def get_catalogos(request: Request):
+    """
+    Todos los catálogos (áreas, severidades, estados y transiciones de
+    estado) en una sola respuesta, comprimida con gzip si el cliente lo acepta.
+
+    `version` es un hash del contenido: la app guarda la última versión y
+    consulta `/catalogos/version` (o manda If-None-Match con el ETag) para
+    saber si tiene que volver a descargarlos.
+    """
+    return await catalogos_cache.response(request, "bundle")
+
+
+@router.get('/catalogos/version', response_model=CatalogosVersion)
+async def get_catalogos_version(request: Request):
+    return await catalogos_cache.response(request, "version")
+
+
 @router.get('/catalogos/areas', response_model=List[AreaSchema])
-async def get_areas(db: Session = Depends(get_db)):
+async def get_areas(request: Request):
     """
     Obtiene todas las áreas disponibles.
     
     Este endpoint NO requiere autenticación porque se usa para
     sincronizar los catálogos en la base de datos local de la app móvil.
     """
-    areas = db.query(Areas).all()
-    return areas
+    return await catalogos_cache.response(request, "areas")
 
 
 @router.get('/catalogos/severidad', response_model=List[SeveridadSchema])
-async def get_severidad(db: Session = Depends(get_db)):
+async def get_severidad(request: Request):
     """
     Obtiene todas las severidades disponibles.
     
     Este endpoint NO requiere autenticación porque se usa para
     sincronizar los catálogos en la base de datos local de la app móvil.
     """
-    severidades = db.query(Severidad).all()
-    return severidades
+    return await catalogos_cache.response(request, "severidad")
+
+
 @router.get('/catalogos/estados', response_model=List[EstadoReporteSchema])
-async def get_estados(db: Session = Depends(get_db)):
-    # Asegúrate que el modelo se llame 'Estado_reportes'
-    estados = db.query(Estado_reportes).all() 
-    return estados
+async def get_estados(request: Request):
+    return await catalogos_cache.response(request, "estados")
 
 # ✅ ENDPOINT PROTEGIDO: Crear reporte (requiere autenticación)
 @router.post('/', status_code=status.HTTP_201_CREATED)
 async def crear_reporte(
+    request: Request,
     reporte: ReporteCreate, 
-    current_user = Depends(get_current_user), 
-    db: Session = Depends(get_db)
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+    token_data: TokenData = Depends(get_token_data), 
+    db: AsyncSession = Depends(get_async_db)
 ):
+    """
+    Crea un reporte. Con el header Idempotency-Key, un reintento con la misma
+    clave recibe la respuesta original (header Idempotent-Replayed) sin
+    volver a llamar al procedimiento.
+    """
+    return await idempotency_store.run(
+        db, token_data.RUT, idempotency_key, await huella_peticion(request),
+        lambda: _crear_reporte(reporte, token_data, db),
+        status_code=status.HTTP_201_CREATED,
+    )
+
+
+async def _crear_reporte(reporte: ReporteCreate, token_data: TokenData, db: AsyncSession):
     try:
         print("Datos recibidos para crear reporte:", reporte.dict())    
-        rut_a_usar= reporte.rut or current_user.RUT
+        rut_a_usar= reporte.rut or token_data.RUT
         id_estado_actual= reporte.id_estado_actual or 1  # Asignar un estado por defecto si no se proporciona
         params = {
             'p_titulo': reporte.titulo,
@@ -66,13 +114,13 @@ async def crear_reporte(
 
         print("Parámetros para el procedimiento almacenado:", params)
 
-        sql_call = text("CALL sp_insertar_reporte(:p_titulo, :p_descripcion, :p_fecha_reporte, :p_uuid_cliente, :p_rut, :p_id_severidad, :p_id_area, :p_id_estado_actual, :p_peticiones_idempotencia, @out_id)")
-        db.execute(sql_call, params)
+        sql_call = text("CALL sp_insertar_reporte(:p_titulo, :p_descripcion, :p_fecha_reporte, :p_uuid_cliente, :p_rut, :p_id_severidad, :p_id_area, :p_id_estado_actual, :p_peticiones_idempotencia, @out_id, @out_duplicado)")
+        await db.execute(sql_call, params)
         
         # Cambio aquí: usar .mappings() para obtener un diccionario
-        row = db.execute(text('SELECT @out_id as id')).mappings().fetchone()
+        row = (await db.execute(text('SELECT @out_id as id, @out_duplicado as duplicado'))).mappings().fetchone()
         
-        if row is None:
+        if row is None or row['id'] is None:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, 
                 detail='No se pudo obtener el id del reporte'
@@ -80,93 +128,75 @@ async def crear_reporte(
         
         id_reporte = row['id']
         
-        db.commit()
+        await db.commit()
+
+        # Reenvío del mismo reporte (UUID_Cliente o Peticiones_Idempotencia ya
+        # registrados): no es error, se retorna el ID que ya tenía
+        if row['duplicado']:
+            return JSONResponse(status_code=status.HTTP_200_OK, content={
+                'id_reporte': id_reporte,
+                'duplicado': True,
+                'mensaje': 'El reporte ya estaba registrado'
+            })
         
         return {
             'id_reporte': id_reporte,
+            'duplicado': False,
             'mensaje': 'Reporte creado exitosamente'
         }
+    except HTTPException:
+        await db.rollback()
+        raise
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         msg = str(e)
-        
-        if 'UUID_Cliente ya existe' in msg:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail='Ya existe un reporte con este UUID. Posiblemente ya fue sincronizado.'
-            )
-        
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST, 
             detail=msg
         )
 
 #ENDPOINT para obtener lista de todos los reportes
-@router.get('/', response_model=List[dict])
+@router.get('/', response_model=ReportePage)
 async def listar_reportes(
-    current_user: Usuarios = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = Query(None, description="next_cursor de la página anterior"),
+    limit: int = Query(50, ge=1, le=200),
+    filtros: FiltrosReportes = Depends(filtros_reportes),
+    admin: TokenData = Depends(require_cargo(1)),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """
-    Lista todos los reportes (solo para administradores)
+    Lista los reportes, más nuevos primero (solo para administradores).
+
+    Paginado por cursor sobre (Hora_Creado, ID_Reporte): cada página es una
+    búsqueda en índice, sin importar cuántos reportes haya. Para la página
+    siguiente enviar `cursor=<next_cursor>` con los mismos filtros.
     """
-    # Solo administradores pueden ver todos los reportes
-    if current_user.ID_Cargo != 1:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="No autorizado"
-        )
-    
+    where, params = where_reportes(filtros, cursor)
+    params["limit"] = limit + 1
     try:
-        # Consulta con JOINs para obtener nombres
-        query = text("""
-            SELECT 
-                r.ID_Reporte,
-                r.Titulo,
-                r.Descripcion,
-                r.Fecha_Reporte,
-                r.Hora_Creado,
-                r.Hora_Sincronizado,
-                r.RUT,
-                r.ID_Severidad,
-                r.ID_Area,
-                r.ID_Estado_Actual,
-                a.Nombre_Area,
-                s.Nombre_Severidad,
-                e.Nombre_Estado,
-                CONCAT(u.Nombre, ' ', u.Apellido_1) as Nombre_Usuario
-            FROM Reportes r
-            LEFT JOIN Areas a ON r.ID_Area = a.ID_Area
-            LEFT JOIN Severidad s ON r.ID_Severidad = s.ID_Severidad
-            LEFT JOIN Estado_reportes e ON r.ID_Estado_Actual = e.ID_Estado_Actual
-            LEFT JOIN Usuarios u ON r.RUT = u.RUT
-            ORDER BY r.Hora_Creado DESC
-        """)
-        
-        result = db.execute(query)
-        reportes = result.fetchall()
+        # Solo Reportes + Usuarios; los nombres de catálogos salen de memoria
+        query = typed_text(f"""
+            {SELECT_REPORTES}
+            {where}
+            ORDER BY r.Hora_Creado DESC, r.ID_Reporte DESC
+            LIMIT :limit
+        """, params)
         
-        # Convertir a lista de diccionarios
-        reportes_list = []
-        for row in reportes:
-            reportes_list.append({
-                'ID_Reporte': row.ID_Reporte,
-                'Titulo': row.Titulo,
-                'Descripcion': row.Descripcion,
-                'Fecha_Reporte': str(row.Fecha_Reporte) if row.Fecha_Reporte else None,
-                'Hora_Creado': str(row.Hora_Creado),
-                'Hora_Sincronizado': str(row.Hora_Sincronizado) if row.Hora_Sincronizado else None,
-                'RUT': row.RUT,
-                'ID_Area': row.ID_Area,
-                'Nombre_Area': row.Nombre_Area,
-                'ID_Severidad': row.ID_Severidad,
-                'Nombre_Severidad': row.Nombre_Severidad,
-                'ID_Estado_Actual': row.ID_Estado_Actual,
-                'Nombre_Estado': row.Nombre_Estado,
-                'Nombre_Usuario': row.Nombre_Usuario
-            })
-        
-        return reportes_list
+        result = await db.execute(query, params)
+        reportes = result.mappings().all()
+
+        # Se pide una fila de más para saber si hay otra página
+        next_cursor = None
+        if len(reportes) > limit:
+            reportes = reportes[:limit]
+            next_cursor = encode_cursor(reportes[-1]['Hora_Creado'], reportes[-1]['ID_Reporte'])
+
+        # Las filas van directo a JSON con el serializador precompilado
+        items = await catalogos_cache.resolve_names([dict(row) for row in reportes])
+        return json_response(reporte_page_adapter, {
+            'items': items,
+            'next_cursor': next_cursor,
+        })
         
     except Exception as e:
         raise HTTPException(
@@ -174,41 +204,66 @@ async def listar_reportes(
             detail=f'Error al obtener reportes: {str(e)}'
         )
     
-@router.get('/{reporte_id}', response_model=dict)
+#ENDPOINT para exportar todos los reportes (streaming)
+@router.get('/export')
+async def exportar(
+    formato: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    filtros: FiltrosReportes = Depends(filtros_reportes),
+    admin: TokenData = Depends(require_cargo(1)),
+):
+    """
+    Exporta los reportes que cumplan los filtros como NDJSON o CSV.
+
+    Las filas se leen con un cursor del lado del servidor y se envían por
+    partes, así la memoria usada no depende de cuántos reportes haya.
+    """
+    media_type = "application/x-ndjson" if formato == "ndjson" else "text/csv; charset=utf-8"
+    return StreamingResponse(
+        exportar_reportes(filtros, formato),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="reportes.{formato}"'},
+    )
+
+
+#ENDPOINT para el historial de cambios de estado (auditoría)
+@router.get('/bitacora', response_model=BitacoraPage)
+async def listar_bitacora_reportes(
+    cursor: Optional[str] = Query(None, description="next_cursor de la página anterior"),
+    limit: int = Query(50, ge=1, le=200),
+    filtros: FiltrosBitacora = Depends(filtros_bitacora),
+    admin: TokenData = Depends(require_cargo(1)),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Cambios de estado de los reportes, más nuevos primero (solo para
+    administradores). Filtra por reporte, RUT de quien hizo el cambio y
+    rango de fechas; incluye lo ya archivado (`Archivado: true`).
+    Paginado por cursor como `GET /reportes/`.
+    """
+    return json_response(bitacora_page_adapter, await listar_bitacora(db, filtros, cursor, limit))
+
+
+@router.get('/{reporte_id}', response_model=ReporteDetalle)
 async def obtener_reporte(
     reporte_id: int,
-    current_user: Usuarios = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    include: Optional[str] = Query(None, description="Datos extra separados por coma: multimedia, bitacora"),
+    token_data: TokenData = Depends(get_token_data),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Obtiene un reporte específico por su ID.
+
+    Con `include=multimedia,bitacora` trae además sus archivos y su
+    historial de estados en la misma respuesta (una consulta más por cada uno).
     """
+    relacionados = parse_include(include)
     try:
-        query = text("""
-            SELECT 
-                r.ID_Reporte,
-                r.Titulo,
-                r.Descripcion,
-                r.Fecha_Reporte,
-                r.Hora_Creado,
-                r.Hora_Sincronizado,
-                r.RUT,
-                r.ID_Severidad,
-                r.ID_Area,
-                r.ID_Estado_Actual,
-                a.Nombre_Area,
-                s.Nombre_Severidad,
-                e.Nombre_Estado,
-                CONCAT(u.Nombre, ' ', u.Apellido_1) as Nombre_Usuario
-            FROM Reportes r
-            LEFT JOIN Areas a ON r.ID_Area = a.ID_Area
-            LEFT JOIN Severidad s ON r.ID_Severidad = s.ID_Severidad
-            LEFT JOIN Estado_reportes e ON r.ID_Estado_Actual = e.ID_Estado_Actual
-            LEFT JOIN Usuarios u ON r.RUT = u.RUT
+        query = text(f"""
+            {SELECT_REPORTES}
             WHERE r.ID_Reporte = :report_id
         """)
         
-        result = db.execute(query, {"report_id": reporte_id})
+        result = await db.execute(query, {"report_id": reporte_id})
         row = result.mappings().first()
         
         if not row:
@@ -218,12 +273,14 @@ async def obtener_reporte(
             )
         
         # Verificar permisos: trabajadores solo ven sus reportes
-        if current_user.ID_Cargo != 1 and row.RUT != current_user.RUT:
+        if token_data.cargo != 1 and row.RUT != token_data.RUT:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail='No tienes permiso para ver este reporte'
             )
-        return dict(row)
+        reportes = await catalogos_cache.resolve_names([dict(row)])
+        reporte = (await cargar_relacionados(db, reportes, relacionados))[0]
+        return json_response(reporte_detalle_adapter, reporte)
     except HTTPException:
         raise
     except Exception as e:
@@ -234,17 +291,28 @@ async def obtener_reporte(
 #ENDPOINT para editar el estado del reporte
 @router.put('/{reporte_id}/estado', status_code=status.HTTP_200_OK)
 async def actualizar_estado_reporte(
+    request: Request,
     reporte_id: int,
     nuevo_estado_id: int=Body(...),
     detalle :  Optional[str] = Body(None),
-    current_user = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):  
         if(current_user.ID_Cargo != 1):
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="No autorizado. Solo administradores pueden cambiar el estado del reporte."
             )
+        # Con Idempotency-Key, un reintento no vuelve a escribir en la bitácora
+        return await idempotency_store.run(
+            db, current_user.RUT, idempotency_key, await huella_peticion(request),
+            lambda: _actualizar_estado(reporte_id, nuevo_estado_id, detalle, current_user, db),
+        )
+
+
+async def _actualizar_estado(reporte_id: int, nuevo_estado_id: int, detalle: Optional[str], current_user: User, db: AsyncSession):
+        await _validar_transicion(db, reporte_id, nuevo_estado_id)
         try:
             print(f"Actualizando estado del reporte {reporte_id} al nuevo estado {nuevo_estado_id}")
             nombre_adminn= current_user.Nombre + " " + current_user.Apellido_1+ " " + current_user.Apellido_2
@@ -258,17 +326,251 @@ async def actualizar_estado_reporte(
             }
             
             sql_call = text("CALL sp_cambiar_estado_reporte(:p_reporte_id, :p_nuevo_estado_id, :p_nombre_administrador, :p_detalle ,:p_usuario_rut)")
-            db.execute(sql_call, params)
-            db.commit()
+            await db.execute(sql_call, params)
+            await db.commit()
             
             return {
                 'mensaje': 'Estado del reporte actualizado exitosamente'
             }
         except Exception as e:
-            db.rollback()
+            await db.rollback()
             msg = str(e)
             
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST, 
                 detail=msg
-            )   
\ No newline at end of file
+            )
+
+
+async def _validar_transicion(db: AsyncSession, reporte_id: int, nuevo_estado_id: int) -> None:
+    """
+    Rechaza el cambio de estado con el grafo de transiciones en memoria, sin
+    llamar al procedimiento. sp_cambiar_estado_reporte vuelve a validar
+    (por si el estado cambió entremedio), ahora con índice.
+    """
+    # Un estado al que no se llega desde ningún otro: sin consultar nada
+    if not await catalogos_cache.transicion_valida(None, nuevo_estado_id):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f'Transición de estado no permitida: ningún estado pasa a {nuevo_estado_id}.'
+        )
+    row = (await db.execute(
+        text("SELECT ID_Estado_Actual FROM Reportes WHERE ID_Reporte = :id"), {"id": reporte_id}
+    )).first()
+    if row is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail='Reporte no encontrado')
+    if not await catalogos_cache.transicion_valida(row.ID_Estado_Actual, nuevo_estado_id):
+        permitidos = await catalogos_cache.destinos(row.ID_Estado_Actual)
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=(
+                f'Transición de estado no permitida: {row.ID_Estado_Actual} -> {nuevo_estado_id}. '
+                f'Desde el estado {row.ID_Estado_Actual} se puede pasar a: {permitidos or "ninguno"}.'
+            )
+        )
+
+
+async def _verificar_reporte(db: AsyncSession, reporte_id: int, token_data: TokenData) -> None:
+    # El reporte existe y es del usuario (o el usuario es administrador)
+    row = (await db.execute(
+        text("SELECT RUT FROM Reportes WHERE ID_Reporte = :id"), {"id": reporte_id}
+    )).first()
+    if row is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail='Reporte no encontrado')
+    if token_data.cargo != 1 and row.RUT != token_data.RUT:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail='No tienes permiso para agregar archivos a este reporte'
+        )
+
+
+async def _registrar_multimedia(db: AsyncSession, reporte_id: int, tipo: str, media: StoredMedia):
+    # Fila en Multimedia_reportes (vía sp_agregar_multimedia_reporte) para un archivo ya guardado
+    try:
+        existente = (await db.execute(
+            text("SELECT ID_Multimedia FROM Multimedia_reportes WHERE ID_Reporte = :id AND ruta = :ruta"),
+            {"id": reporte_id, "ruta": media.ruta}
+        )).scalar()
+        if existente is not None:
+            await db.commit()
+            return JSONResponse(status_code=status.HTTP_200_OK, content={
+                'id_multimedia': existente,
+                'tipo': tipo,
+                'sha256': media.digest,
+                'bytes': media.size,
+                'duplicado': True,
+            })
+
+        await db.execute(
+            text("CALL sp_agregar_multimedia_reporte(:p_id_reporte, :p_tipo, :p_ruta, @out_id)"),
+            {"p_id_reporte": reporte_id, "p_tipo": tipo, "p_ruta": media.ruta}
+        )
+        id_multimedia = (await db.execute(text("SELECT @out_id"))).scalar()
+        if id_multimedia is None:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail='No se pudo obtener el id del archivo'
+            )
+        await db.commit()
+    except HTTPException:
+        await db.rollback()
+        raise
+    except Exception as e:
+        # El archivo queda en disco: si se reintenta, se reutiliza (mismo sha256)
+        await db.rollback()
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    return {
+        'id_multimedia': id_multimedia,
+        'tipo': tipo,
+        'sha256': media.digest,
+        'bytes': media.size,
+        'duplicado': False,
+    }
+
+
+def _tipo_contenido(valor: Optional[str]) -> str:
+    return (valor or "application/octet-stream").split(";")[0].strip().lower()
+
+
+#ENDPOINT para subir una foto o video a un reporte
+@router.post('/{reporte_id}/multimedia', status_code=status.HTTP_201_CREATED, response_model=MultimediaSubida,
+             dependencies=[Depends(require_identity_encoding)])
+async def subir_multimedia(
+    reporte_id: int,
+    request: Request,
+    token_data: TokenData = Depends(get_token_data),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Agrega un archivo al reporte. El cuerpo de la petición es el archivo tal
+    cual (no multipart) y el Content-Type su tipo, ej. `image/jpeg`.
+
+    El archivo se guarda a disco a medida que llega. Si el reporte ya tenía
+    el mismo archivo (mismo sha256) se responde 200 con `duplicado: true`.
+    Para archivos grandes con mala conexión usar `/multimedia/sesiones`.
+    """
+    tipo = _tipo_contenido(request.headers.get("content-type"))
+    largo = request.headers.get("content-length")
+    if largo and largo.isdigit() and int(largo) > multimedia_service.max_bytes:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Archivo de más de {multimedia_service.max_bytes} bytes"
+        )
+
+    await _verificar_reporte(db, reporte_id, token_data)
+    # Devolver la conexión al pool mientras llega el archivo (puede tardar minutos)
+    await db.commit()
+
+    media = await multimedia_service.save_stream(request.stream())
+    return await _registrar_multimedia(db, reporte_id, tipo, media)
+
+
+# --- Subida por partes (se puede retomar después de un corte) ---
+# 1. POST   /{id}/multimedia/sesiones                       -> id_sesion y parte_bytes
+# 2. PUT    /{id}/multimedia/sesiones/{sesion}/partes/{n}   -> cada parte, en cualquier orden
+# 3. GET    /{id}/multimedia/sesiones/{sesion}              -> qué partes faltan (al reconectar)
+# 4. POST   /{id}/multimedia/sesiones/{sesion}/finalizar    -> igual que POST /{id}/multimedia
+
+async def _sesion_de(reporte_id: int, id_sesion: str, token_data: TokenData) -> UploadSession:
+    sesion = await multimedia_service.get_session(id_sesion)
+    if sesion.reporte_id != reporte_id:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Sesión de subida no encontrada")
+    if sesion.rut != token_data.RUT:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="La sesión de subida es de otro usuario")
+    return sesion
+
+
+@router.post('/{reporte_id}/multimedia/sesiones', status_code=status.HTTP_201_CREATED, response_model=SesionSubida)
+async def crear_sesion_subida(
+    reporte_id: int,
+    datos: SesionSubidaCreate,
+    token_data: TokenData = Depends(get_token_data),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Abre una subida por partes. El archivo se manda en partes de
+    `parte_bytes` (la última puede ser más chica) con PUT a `partes/{n}`.
+    Las sesiones sin actividad por MEDIA_SESION_HORAS se borran.
+    """
+    await _verificar_reporte(db, reporte_id, token_data)
+    await db.commit()
+    sesion = await multimedia_service.create_session(reporte_id, token_data.RUT, _tipo_contenido(datos.tipo), datos.tamano)
+    return await multimedia_service.session_status(sesion)
+
+
+@router.get('/{reporte_id}/multimedia/sesiones/{id_sesion}', response_model=SesionSubida)
+async def estado_sesion_subida(
+    reporte_id: int,
+    id_sesion: str,
+    token_data: TokenData = Depends(get_token_data),
+):
+    """
+    Partes ya recibidas. `recibido` son los bytes sin huecos desde el
+    inicio: la app retoma desde la parte `recibido / parte_bytes`.
+    """
+    sesion = await _sesion_de(reporte_id, id_sesion, token_data)
+    return await multimedia_service.session_status(sesion)
+
+
+@router.put('/{reporte_id}/multimedia/sesiones/{id_sesion}/partes/{numero}', response_model=SesionSubida,
+            dependencies=[Depends(require_identity_encoding)])
+async def subir_parte(
+    reporte_id: int,
+    id_sesion: str,
+    numero: int,
+    request: Request,
+    token_data: TokenData = Depends(get_token_data),
+):
+    """La parte `numero` (desde 0), como cuerpo de la petición. Reenviarla es seguro."""
+    sesion = await _sesion_de(reporte_id, id_sesion, token_data)
+    await multimedia_service.write_part(sesion, numero, request.stream())
+    return await multimedia_service.session_status(sesion)
+
+
+@router.post('/{reporte_id}/multimedia/sesiones/{id_sesion}/finalizar', status_code=status.HTTP_201_CREATED, response_model=MultimediaSubida)
+async def finalizar_sesion_subida(
+    reporte_id: int,
+    id_sesion: str,
+    token_data: TokenData = Depends(get_token_data),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Junta la subida (409 si faltan partes) y la registra en el reporte.
+    Responde lo mismo que POST /{id}/multimedia.
+    """
+    sesion = await _sesion_de(reporte_id, id_sesion, token_data)
+    media = await multimedia_service.finish_session(sesion)
+    return await _registrar_multimedia(db, reporte_id, sesion.tipo, media)
+
+
+#ENDPOINT para descargar un archivo de un reporte
+@router.get('/{reporte_id}/multimedia/{media_id}')
+async def descargar_multimedia(
+    reporte_id: int,
+    media_id: int,
+    request: Request,
+    token_data: TokenData = Depends(get_token_data),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Descarga un archivo del reporte. Acepta `Range` (responde 206) para
+    adelantar videos o retomar una descarga cortada, e `If-None-Match` con
+    el ETag (el sha256 del archivo) para responder 304 sin cuerpo.
+    """
+    row = (await db.execute(text("""
+        SELECT m.Tipo_Multimedia, m.ruta, r.RUT
+        FROM Multimedia_reportes m
+        JOIN Reportes r ON r.ID_Reporte = m.ID_Reporte
+        WHERE m.ID_Multimedia = :media_id AND m.ID_Reporte = :reporte_id
+    """), {"media_id": media_id, "reporte_id": reporte_id})).first()
+    if row is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail='Archivo no encontrado')
+    if token_data.cargo != 1 and row.RUT != token_data.RUT:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail='No tienes permiso para ver este reporte'
+        )
+    # El archivo se envía después de cerrar la sesión: no retiene la conexión a la BD
+    await db.commit()
+    return await multimedia_service.file_response(request, row.ruta, row.Tipo_Multimedia or "application/octet-stream")
@@ -0,0 +1,65 @@
+# app-1/routes/sync.py
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config import settings
+from crud.idempotencia import huella_peticion, idempotency_store
+from crud.compresion import GzipRoute
+from crud.security import get_token_data
+from crud.reportes import json_response
+from crud.sync import cambios_desde, sincronizar_lote, sync_changes_adapter
+from database import get_async_db
+from esquemas.sync import SyncBatch, SyncBatchResult, SyncChanges
+from esquemas.usuarios import TokenData
+
+# GzipRoute: los lotes pueden venir con Content-Encoding: gzip
+router = APIRouter(prefix="/sync", tags=["Sincronización"], route_class=GzipRoute)
+
+
+@router.post('/batch', response_model=SyncBatchResult)
+async def sincronizar_reportes(
+    request: Request,
+    lote: SyncBatch,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+    token_data: TokenData = Depends(get_token_data),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Sube de una vez los reportes que el dispositivo guardó sin conexión.
+
+    Cada reporte del lote recibe su resultado, en el mismo orden:
+    `creado`, `duplicado` (ya estaba en el servidor; se retorna su ID) o
+    `error` (con el motivo). Un error en un reporte no afecta a los demás.
+
+    Con Idempotency-Key, reenviar el mismo lote retorna la respuesta
+    original (con `creado` donde correspondía) sin volver a procesarlo.
+    """
+    if len(lote.reportes) > settings.SYNC_LOTE_MAX:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Máximo {settings.SYNC_LOTE_MAX} reportes por lote"
+        )
+    return await idempotency_store.run(
+        db, token_data.RUT, idempotency_key, await huella_peticion(request),
+        lambda: sincronizar_lote(db, lote.reportes, token_data),
+    )
+
+
+@router.get('/changes', response_model=SyncChanges)
+async def cambios(
+    since: Optional[str] = Query(None, description="watermark de la respuesta anterior (vacío = desde el principio)"),
+    limit: int = Query(200, ge=1, le=1000),
+    token_data: TokenData = Depends(get_token_data),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Reportes (y sus cambios de estado en la bitácora) modificados después
+    de `since`. Los trabajadores reciben solo sus reportes.
+
+    Guardar `watermark` y mandarlo como `since` la próxima vez; mientras
+    `hay_mas` sea true, seguir pidiendo páginas. Cada llamada cuesta según
+    los cambios, no según el total de reportes.
+    """
+    return json_response(sync_changes_adapter, await cambios_desde(db, since, limit, token_data))
@@ -0,0 +1,82 @@
+# app-1/tests/conftest.py
+# Pruebas contra una BD SQLite temporal (aiosqlite para las rutas async).
+# config.py y database.py leen el entorno al importarse: se fija aquí, antes
+# de que los tests importen la app
+import os
+import sys
+import tempfile
+
+import pytest
+
+_tmp = tempfile.mkdtemp(prefix="sigra-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_tmp, 'tests.db')}"
+os.environ.pop("ASYNC_DATABASE_URL", None)
+os.environ.setdefault("SECRET_KEY", "clave-de-pruebas")
+os.environ["BCRYPT_ROUNDS"] = "4"
+os.environ["MEDIA_DIR"] = os.path.join(_tmp, "media")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture(scope="session")
+def db_sync():
+    """Crea las tablas con los catálogos mínimos y entrega una sesión sync para armar datos."""
+    from database import Base, SessionLocal, engine
+    from modulos.modelosORM import (
+        Areas, Cargos, Estado_reportes, Estado_trabajador, Estado_transicion, Severidad, Usuarios,
+    )
+
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    db.add_all([
+        Cargos(ID_Cargo=1, Nombre_Cargo="Administrador"),
+        Cargos(ID_Cargo=2, Nombre_Cargo="Trabajador"),
+        Estado_trabajador(ID_Estado_trabajador=1, Nombre_Estado="Activo"),
+        Areas(ID_Area=1, Nombre_Area="Chancado"),
+        Severidad(ID_Severidad=1, Nombre_Severidad="Alta"),
+        Estado_reportes(ID_Estado_Actual=1, Nombre_Estado="Pendiente"),
+        Estado_reportes(ID_Estado_Actual=2, Nombre_Estado="Aprobado"),
+    ])
+    db.flush()
+    db.add_all([
+        Usuarios(RUT=11111111, Nombre="Ana", Apellido_1="Rojas", Apellido_2="Soto", Contraseña="x",
+                 ID_Cargo=1, ID_Estado_trabajador=1, Primer_inicio_sesion=0),
+        Estado_transicion(Estado_Desde=1, Estado_Hacia=2),
+    ])
+    db.commit()
+    yield db
+    db.close()
+
+
+@pytest.fixture(scope="session")
+def client(db_sync):
+    from fastapi.testclient import TestClient
+    from main import app
+
+    with TestClient(app) as c:
+        yield c
+
+
+@pytest.fixture(scope="session")
+def admin_headers():
+    from crud.security import create_access_token
+
+    token = create_access_token({"sub": "11111111", "rut": 11111111, "cargo": 1, "ver": 0})
+    return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.fixture
+def sql_statements():
+    """Lista de sentencias que ejecuta el engine async mientras dura el test."""
+    from sqlalchemy import event
+    from database import async_engine
+
+    statements = []
+
+    def contar(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(async_engine.sync_engine, "before_cursor_execute", contar)
+    yield statements
+    event.remove(async_engine.sync_engine, "before_cursor_execute", contar)
@@ -0,0 +1,60 @@
+# app-1/tests/test_bitacora_archivo.py
+# BitacoraArchiver: mueve las filas viejas al archivo y nunca borra una que no se copió
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy.exc import IntegrityError
+
+from crud.bitacora import BitacoraArchiver
+from modulos.modelosORM import Bitacora_reportes, Bitacora_reportes_archivo, Reportes
+
+
+@pytest.fixture
+def reporte_id(db_sync):
+    reporte = Reportes(Titulo="Guarda abierta", RUT=11111111, ID_Severidad=1, ID_Area=1, ID_Estado_Actual=1)
+    db_sync.add(reporte)
+    db_sync.commit()
+    return reporte.ID_Reporte
+
+
+def _cambio(reporte_id, dias, detalle):
+    return Bitacora_reportes(
+        ID_Reporte=reporte_id, ID_Estado_Actual=2, Nombre_Administrador="Ana Rojas",
+        Detalle=detalle, Actualizacion_Fecha=datetime.now() - timedelta(days=dias), RUT=11111111,
+    )
+
+
+def test_archiva_solo_lo_viejo(db_sync, reporte_id):
+    viejo, nuevo = _cambio(reporte_id, 400, "viejo"), _cambio(reporte_id, 1, "nuevo")
+    db_sync.add_all([viejo, nuevo])
+    db_sync.commit()
+    id_viejo, id_nuevo = viejo.ID_Bitacora, nuevo.ID_Bitacora
+
+    assert asyncio.run(BitacoraArchiver(horizon_days=180, batch_size=10).run_once()) >= 1
+
+    db_sync.expire_all()
+    assert db_sync.get(Bitacora_reportes, id_viejo) is None
+    assert db_sync.get(Bitacora_reportes_archivo, id_viejo).Detalle == "viejo"
+    assert db_sync.get(Bitacora_reportes, id_nuevo) is not None
+
+
+def test_id_ya_archivado_no_borra_la_fila_viva(db_sync, reporte_id):
+    viejo = _cambio(reporte_id, 400, "original")
+    db_sync.add(viejo)
+    db_sync.commit()
+    # Otro contenido con el mismo ID ya en el archivo
+    db_sync.add(Bitacora_reportes_archivo(
+        ID_Bitacora=viejo.ID_Bitacora, ID_Reporte=reporte_id, ID_Estado_Actual=1,
+        Detalle="otro", Actualizacion_Fecha=viejo.Actualizacion_Fecha, RUT=11111111,
+    ))
+    db_sync.commit()
+
+    with pytest.raises(IntegrityError):
+        asyncio.run(BitacoraArchiver(horizon_days=180, batch_size=10).run_once())
+
+    db_sync.expire_all()
+    assert db_sync.get(Bitacora_reportes, viejo.ID_Bitacora).Detalle == "original"
+    # Limpieza para los demás tests que archivan
+    db_sync.query(Bitacora_reportes).filter_by(ID_Bitacora=viejo.ID_Bitacora).delete()
+    db_sync.commit()
@@ -0,0 +1,80 @@
+# app-1/tests/test_multimedia_subida.py
+# Subidas de archivos: el cuerpo se guarda tal cual llega (sin Content-Encoding)
+import gzip
+import hashlib
+
+import pytest
+from sqlalchemy import event
+
+from crud.multimedia import multimedia_service
+from modulos.modelosORM import Reportes
+
+
+@pytest.fixture(scope="module")
+def reporte_id(db_sync):
+    reporte = Reportes(Titulo="Baranda suelta", RUT=11111111, ID_Severidad=1, ID_Area=1, ID_Estado_Actual=1)
+    db_sync.add(reporte)
+    db_sync.commit()
+    return reporte.ID_Reporte
+
+
+@pytest.fixture
+def sp_multimedia_sqlite():
+    """
+    sp_agregar_multimedia_reporte solo existe en MySQL: en SQLite el CALL se
+    cambia por el INSERT que hace el procedimiento y @out_id por el id insertado.
+    """
+    from database import async_engine
+
+    def reemplazar(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith("CALL sp_agregar_multimedia_reporte("):
+            return "INSERT INTO Multimedia_reportes (ID_Reporte, Tipo_Multimedia, ruta) VALUES (?, ?, ?)", parameters
+        if statement == "SELECT @out_id":
+            return "SELECT last_insert_rowid()", parameters
+        return statement, parameters
+
+    event.listen(async_engine.sync_engine, "before_cursor_execute", reemplazar, retval=True)
+    yield
+    event.remove(async_engine.sync_engine, "before_cursor_execute", reemplazar)
+
+
+def test_subida_sin_comprimir(client, admin_headers, reporte_id, sp_multimedia_sqlite):
+    foto = b"\xff\xd8\xff" + bytes(range(256)) * 40
+    digest = hashlib.sha256(foto).hexdigest()
+    r = client.post(f"/reportes/{reporte_id}/multimedia", content=foto,
+                    headers={**admin_headers, "Content-Type": "image/jpeg"})
+    assert r.status_code == 201, r.text
+    body = r.json()
+    assert body["sha256"] == digest
+    assert body["bytes"] == len(foto)
+    assert body["tipo"] == "image/jpeg"
+    assert body["duplicado"] is False
+    assert body["id_multimedia"] > 0
+
+    # El archivo quedó guardado tal cual bajo el sha256 de los bytes recibidos
+    with open(multimedia_service.path_for(multimedia_service.ruta_for(digest)), "rb") as f:
+        assert f.read() == foto
+
+    # El mismo archivo otra vez no crea otra fila
+    r = client.post(f"/reportes/{reporte_id}/multimedia", content=foto,
+                    headers={**admin_headers, "Content-Type": "image/jpeg"})
+    assert r.status_code == 200, r.text
+    assert r.json()["id_multimedia"] == body["id_multimedia"]
+    assert r.json()["duplicado"] is True
+
+
+def test_subida_gzip_rechazada(client, admin_headers, reporte_id):
+    foto = b"\xff\xd8\xff" + bytes(range(256)) * 40
+    headers = {**admin_headers, "Content-Type": "image/jpeg", "Content-Encoding": "gzip"}
+    r = client.post(f"/reportes/{reporte_id}/multimedia", content=gzip.compress(foto), headers=headers)
+    assert r.status_code == 415
+
+
+def test_parte_gzip_rechazada(client, admin_headers, reporte_id):
+    sesion = client.post(f"/reportes/{reporte_id}/multimedia/sesiones",
+                         json={"tipo": "video/mp4", "tamano": 10}, headers=admin_headers)
+    assert sesion.status_code == 201, sesion.text
+    url = f"/reportes/{reporte_id}/multimedia/sesiones/{sesion.json()['id_sesion']}/partes/0"
+    r = client.put(url, content=gzip.compress(b"0123456789"), headers={**admin_headers, "Content-Encoding": "gzip"})
+    assert r.status_code == 415
+    assert client.put(url, content=b"0123456789", headers=admin_headers).status_code == 200
@@ -0,0 +1,53 @@
+# app-1/tests/test_reportes_detalle.py
+# GET /reportes/{id}?include=...: cada relación agrega una sola consulta
+import pytest
+
+from modulos.modelosORM import Bitacora_reportes, Multimedia_reportes, Reportes
+
+SHA = "ab" * 32
+
+
+@pytest.fixture(scope="module")
+def reporte_id(db_sync):
+    reporte = Reportes(Titulo="Derrame", Descripcion="Aceite en la pala 04", RUT=11111111,
+                       ID_Severidad=1, ID_Area=1, ID_Estado_Actual=1)
+    db_sync.add(reporte)
+    db_sync.flush()
+    db_sync.add_all([
+        Multimedia_reportes(Tipo_Multimedia="image/jpeg", ruta=f"{SHA[:2]}/{SHA[2:4]}/{SHA}", ID_Reporte=reporte.ID_Reporte),
+        Multimedia_reportes(Tipo_Multimedia="video/mp4", ruta=f"{SHA[:2]}/{SHA[2:4]}/{SHA}", ID_Reporte=reporte.ID_Reporte),
+        Bitacora_reportes(Nombre_Administrador="Ana Rojas", Detalle="Revisado", ID_Reporte=reporte.ID_Reporte,
+                          ID_Estado_Actual=2, RUT=11111111),
+    ])
+    db_sync.commit()
+    return reporte.ID_Reporte
+
+
+@pytest.mark.parametrize("include, consultas, claves", [
+    (None, 1, set()),
+    ("multimedia", 2, {"multimedia"}),
+    ("multimedia,bitacora", 3, {"multimedia", "bitacora"}),
+])
+def test_detalle_consultas_acotadas(client, admin_headers, reporte_id, sql_statements, include, consultas, claves):
+    url = f"/reportes/{reporte_id}"
+    params = {"include": include} if include else {}
+    # Primera llamada: carga catálogos y versiones de token (fuera de la cuenta)
+    assert client.get(url, params=params, headers=admin_headers).status_code == 200
+    sql_statements.clear()
+
+    r = client.get(url, params=params, headers=admin_headers)
+
+    assert r.status_code == 200, r.text
+    assert len(sql_statements) == consultas, sql_statements
+    cuerpo = r.json()
+    assert cuerpo["Nombre_Usuario"] == "Ana Rojas"
+    assert claves == {k for k in ("multimedia", "bitacora") if k in cuerpo}
+    if "multimedia" in claves:
+        assert len(cuerpo["multimedia"]) == 2
+    if "bitacora" in claves:
+        assert [b["Detalle"] for b in cuerpo["bitacora"]] == ["Revisado"]
+
+
+def test_detalle_include_desconocido(client, admin_headers, reporte_id):
+    r = client.get(f"/reportes/{reporte_id}", params={"include": "usuarios"}, headers=admin_headers)
+    assert r.status_code == 400
@@ -0,0 +1,26 @@
+# app-1/tests/test_reportes_export.py
+# GET /reportes/export: cada línea NDJSON es igual al mismo reporte en GET /reportes/
+import json
+from datetime import datetime
+
+from modulos.modelosORM import Reportes
+
+
+def test_ndjson_mismo_formato_que_listado(client, admin_headers, db_sync):
+    reporte = Reportes(Titulo="Señalética caída", RUT=11111111, ID_Severidad=1, ID_Area=1, ID_Estado_Actual=1,
+                       Hora_Creado=datetime(2024, 5, 1, 8, 0, 0))
+    db_sync.add(reporte)
+    db_sync.commit()
+
+    r = client.get("/reportes/export", params={"formato": "ndjson", "hasta": "2024-05-01"}, headers=admin_headers)
+    assert r.status_code == 200, r.text
+    exportados = {f["ID_Reporte"]: f for f in map(json.loads, r.text.splitlines())}
+    fila = exportados[reporte.ID_Reporte]
+    assert fila["Titulo"] == "Señalética caída"
+    assert "Señalética".encode() in r.content  # UTF-8, sin \u escapes
+
+    listado = client.get("/reportes/", params={"hasta": "2024-05-01"}, headers=admin_headers)
+    assert listado.status_code == 200, listado.text
+    # Fechas incluidas: con MySQL las dos salen en ISO ("2024-05-01T08:00:00");
+    # con SQLite text() las trae como str y las dos las dejan tal cual
+    assert {i["ID_Reporte"]: i for i in listado.json()["items"]}[reporte.ID_Reporte] == fila
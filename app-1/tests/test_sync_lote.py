@@ -0,0 +1,37 @@
+# app-1/tests/test_sync_lote.py
+# POST /sync/batch: los duplicados se absorben, los valores inválidos no se guardan alterados
+import uuid
+
+from modulos.modelosORM import Reportes
+
+
+def _reporte(**cambios):
+    u = str(uuid.uuid4())
+    datos = {
+        "titulo": "Correa desalineada", "descripcion": "Ruido anómalo en CV-12",
+        "fecha_reporte": "2026-10-01", "uuid_cliente": u, "peticion_idempotencia": f"mobile-{u}",
+        "id_severidad": 1, "id_area": 1,
+    }
+    datos.update(cambios)
+    return datos
+
+
+def test_titulo_largo_es_error_y_no_se_trunca(client, admin_headers, db_sync):
+    largo = _reporte(titulo="x" * 256)
+    bueno = _reporte()
+    r = client.post("/sync/batch", json={"reportes": [largo, bueno]}, headers=admin_headers)
+    assert r.status_code == 200, r.text
+    resultados = r.json()["resultados"]
+    assert resultados[0]["estado"] == "error"
+    assert "Titulo" in resultados[0]["error"]
+    assert resultados[1]["estado"] == "creado"
+    assert db_sync.query(Reportes).filter_by(UUID_Cliente=largo["uuid_cliente"]).count() == 0
+
+
+def test_reenvio_es_duplicado(client, admin_headers):
+    reporte = _reporte()
+    primero = client.post("/sync/batch", json={"reportes": [reporte]}, headers=admin_headers).json()
+    segundo = client.post("/sync/batch", json={"reportes": [reporte]}, headers=admin_headers).json()
+    assert primero["resultados"][0]["estado"] == "creado"
+    assert segundo["resultados"][0]["estado"] == "duplicado"
+    assert segundo["resultados"][0]["id_reporte"] == primero["resultados"][0]["id_reporte"]
@@ -1,5 +1,6 @@
 import bcrypt
 import sys
+import time
 
 def generar_hash_bcrypt():
     """
@@ -35,6 +36,48 @@ def generar_hash_bcrypt():
     except Exception as e:
         print(f"\nError generando el hash: {e}")
 
+def calibrar_rounds(objetivo_ms=250, muestras=3):
+    """
+    Mide cuánto tarda bcrypt en esta máquina para cada costo (rounds) y
+    recomienda el mayor costo cuyo hash tarda como máximo `objetivo_ms`.
+    El valor recomendado va en BCRYPT_ROUNDS (config.env).
+    """
+    password_bytes = b"calibracion-sigra"
+    recomendado = None
+
+    print(f"\nObjetivo: {objetivo_ms} ms por hash ({muestras} muestras por costo)")
+    print("rounds   tiempo (ms)")
+    # bcrypt acepta costos de 4 a 31; cada punto duplica el tiempo
+    for rounds in range(4, 32):
+        salt = bcrypt.gensalt(rounds)
+        tiempos = []
+        for _ in range(muestras):
+            inicio = time.perf_counter()
+            bcrypt.hashpw(password_bytes, salt)
+            tiempos.append((time.perf_counter() - inicio) * 1000)
+        tiempo = min(tiempos)
+        print(f"{rounds:>6}   {tiempo:10.1f}")
+
+        if tiempo <= objetivo_ms:
+            recomendado = rounds
+        else:
+            break
+
+    if recomendado is None:
+        print("\nNi el costo mínimo (4) cumple el objetivo en esta máquina.")
+        return None
+
+    print("\n--- COSTO RECOMENDADO ---")
+    print(f"BCRYPT_ROUNDS={recomendado}")
+    print("-------------------------\n")
+    return recomendado
+
 # Ejecuta la función cuando se corre el script
+#   python hash.py                    -> hashear una contraseña
+#   python hash.py --calibrar [ms]    -> recomendar BCRYPT_ROUNDS para un login de [ms] (250 por defecto)
 if __name__ == "__main__":
-    generar_hash_bcrypt()
\ No newline at end of file
+    if len(sys.argv) > 1 and sys.argv[1] == "--calibrar":
+        objetivo = float(sys.argv[2]) if len(sys.argv) > 2 else 250
+        calibrar_rounds(objetivo)
+    else:
+        generar_hash_bcrypt()
\ No newline at end of file
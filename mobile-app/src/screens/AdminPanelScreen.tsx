@@ -44,6 +44,9 @@ const AdminPanelScreen = () => {
   const [loading, setLoading] = useState(true);
   const [refreshing, setRefreshing] = useState(false);
   const [error, setError] = useState<string | null>(null);
+  // Cursor de la página siguiente (null = ya se cargaron todos)
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
+  const [loadingMore, setLoadingMore] = useState(false);
 
   useEffect(() => {
     loadReports();
@@ -56,8 +59,9 @@ const AdminPanelScreen = () => {
         setError('No hay token de autenticación');
         return;
       }
-      const reportsData = await reportService.getAllReports(userToken);
-      setReports(reportsData);
+      const page = await reportService.getAllReports(userToken);
+      setReports(page.items);
+      setNextCursor(page.next_cursor);
     } catch (error: any) {
       console.error('❌ Error loading reports:', error);
       setError(error.message || 'Error al cargar los reportes');
@@ -67,6 +71,21 @@ const AdminPanelScreen = () => {
     }
   };
 
+  const loadMore = async () => {
+    if (!nextCursor || loadingMore || !userToken) return;
+    setLoadingMore(true);
+    try {
+      const page = await reportService.getAllReports(userToken, nextCursor);
+      setReports((prev) => [...prev, ...page.items]);
+      setNextCursor(page.next_cursor);
+    } catch (error: any) {
+      // Se deja el cursor como estaba: el botón permite reintentar
+      console.error('❌ Error loading more reports:', error);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   const onRefresh = () => {
     setRefreshing(true);
     loadReports();
@@ -186,8 +205,11 @@ const AdminPanelScreen = () => {
 
       <View style={styles.statsContainer}>
         <View style={styles.statBox}>
-          <Text style={styles.statNumber}>{reports.length}</Text>
-          <Text style={styles.statLabel}>Total</Text>
+          <Text style={styles.statNumber}>
+            {reports.length}
+            {nextCursor ? '+' : ''}
+          </Text>
+          <Text style={styles.statLabel}>{nextCursor ? 'Cargados' : 'Total'}</Text>
         </View>
         <View style={styles.statBox}>
           <Text style={styles.statNumber}>
@@ -211,6 +233,23 @@ const AdminPanelScreen = () => {
         refreshControl={
           <RefreshControl refreshing={refreshing} onRefresh={onRefresh} />
         }
+        onEndReached={loadMore}
+        onEndReachedThreshold={0.5}
+        ListFooterComponent={
+          nextCursor ? (
+            <TouchableOpacity
+              style={styles.loadMoreButton}
+              onPress={loadMore}
+              disabled={loadingMore}
+            >
+              {loadingMore ? (
+                <ActivityIndicator color="#000" />
+              ) : (
+                <Text style={styles.loadMoreText}>Cargar más reportes</Text>
+              )}
+            </TouchableOpacity>
+          ) : null
+        }
         ListEmptyComponent={
           <View style={styles.emptyContainer}>
             <Text style={styles.emptyText}>📭 No hay reportes sincronizados</Text>
@@ -357,6 +396,17 @@ const styles = StyleSheet.create({
     color: '#000',
     fontWeight: 'bold',
   },
+  loadMoreButton: {
+    backgroundColor: '#FFAA00',
+    paddingVertical: 12,
+    borderRadius: 8,
+    alignItems: 'center',
+    marginTop: 4,
+  },
+  loadMoreText: {
+    color: '#000',
+    fontWeight: 'bold',
+  },
   emptyContainer: {
     alignItems: 'center',
     padding: 40,
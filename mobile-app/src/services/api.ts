@@ -2,7 +2,7 @@
 import axios from 'axios';
 import { API_CONFIG } from '../constants/config';
 import { LoginRequest, LoginResponse, PasswordChangeRequest, PasswordChangeResponse, CreateUserRequest, CreateUserResponse } from '../types/auth';
-import { Area, Severidad, CreateReportDTO } from '../types/reportes';
+import { Area, Severidad, CreateReportDTO, CatalogosBundle } from '../types/reportes';
 import * as SecureStore from 'expo-secure-store';
 
 const api = axios.create({
@@ -181,6 +181,24 @@ export const reportService = {
         }
     },
 
+    // Versión actual de los catálogos; si coincide con la guardada no hay que descargar nada
+    getCatalogosVersion: async (): Promise<string> => {
+        const response = await api.get<{ version: string }>('/reportes/catalogos/version');
+        return response.data.version;
+    },
+
+    // Todos los catálogos en una sola petición (el servidor la manda comprimida)
+    getCatalogos: async (): Promise<CatalogosBundle> => {
+        try {
+            const response = await api.get<CatalogosBundle>('/reportes/catalogos');
+            console.log('✅ Catálogos recibidos, versión:', response.data.version);
+            return response.data;
+        } catch (error: any) {
+            console.error('❌ Error al obtener catálogos:', error.response?.data || error.message);
+            throw error;
+        }
+    },
+
     updateReportStatus: async (reporte_id: number, nuevo_estado_id: number, detalle: string, token:string) => {
         try {
             // El token se agrega automáticamente por el interceptor
@@ -206,13 +224,16 @@ export const reportService = {
       throw error;
     }
   },
-    getAllReports: async (token: string) => {
+    getAllReports: async (token: string, cursor?: string | null) => {
         try {
             // El token se agrega automáticamente por el interceptor
+            // El endpoint está paginado: { items, next_cursor }. Con next_cursor
+            // se pide la página siguiente (null = no hay más)
             const response = await api.get('/reportes/',{
+               params: cursor ? { cursor } : undefined,
                headers: { Authorization: `Bearer ${token}` 
             }});
-            return response.data;
+            return response.data as { items: any[]; next_cursor: string | null };
         } catch (error: any) {
             console.error('❌ Error al obtener todos los reportes:', error.response?.data || error.message);
             throw error;
@@ -1,7 +1,7 @@
 // mobile-app/src/services/autoSyncService.ts
 import { AppState, AppStateStatus } from 'react-native';
 import NetInfo from '@react-native-community/netinfo';
-import { sincronizarReportesPendientes, obtenerReportesPendientes } from './syncReportsService';
+import { sincronizarReportesPendientes, obtenerReportesPendientes, descargarCambios } from './syncReportsService';
 
 class AutoSyncService {
   private syncInterval: number | null = null;
@@ -95,7 +95,8 @@ class AutoSyncService {
   };
 
   /**
-   * Intenta sincronizar reportes pendientes
+   * Intenta sincronizar reportes pendientes y después trae los cambios
+   * de estado hechos en el servidor (aprobados/rechazados)
    */
   private async intentarSincronizacion() {
     // Evitar sincronizaciones simultáneas
@@ -103,6 +104,7 @@ class AutoSyncService {
       console.log('⏳ Sincronización ya en progreso, omitiendo...');
       return;
     }
+    this.isSyncing = true;
 
     try {
       // Verificar si hay reportes pendientes
@@ -110,22 +112,26 @@ class AutoSyncService {
       
       if (pendientes === 0) {
         console.log('✅ No hay reportes pendientes de sincronizar');
-        return;
+      } else {
+        console.log(`📤 Intentando sincronizar ${pendientes} reporte(s)...`);
+
+        // Sincronizar
+        const sincronizados = await sincronizarReportesPendientes();
+        
+        if (sincronizados > 0) {
+          console.log(`✅ ${sincronizados} reporte(s) sincronizado(s) exitosamente`);
+        }
       }
-
-      console.log(`📤 Intentando sincronizar ${pendientes} reporte(s)...`);
-      this.isSyncing = true;
-
-      // Sincronizar
-      const sincronizados = await sincronizarReportesPendientes();
-      
-      if (sincronizados > 0) {
-        console.log(`✅ ${sincronizados} reporte(s) sincronizado(s) exitosamente`);
-      }
-
     } catch (error: any) {
       console.error('❌ Error en sincronización automática:', error.message);
       // No mostrar alerts aquí para no interrumpir al usuario
+    }
+
+    // Por separado: sin conexión falla la descarga, pero no la subida de arriba
+    try {
+      await descargarCambios();
+    } catch (error: any) {
+      console.error('❌ Error descargando cambios del servidor:', error.message);
     } finally {
       this.isSyncing = false;
     }
@@ -137,6 +143,8 @@ class AutoSyncService {
   async syncNow(): Promise<number> {
     console.log('🔄 Sincronización manual forzada');
     const sincronizados = await sincronizarReportesPendientes();
+    // Traer también los cambios de estado hechos en el servidor
+    await descargarCambios();
     return sincronizados;
   }
 
@@ -2,6 +2,7 @@
 import { getDB } from '../db/database';
 import api from './api';
 import * as SecureStore from 'expo-secure-store';
+import { jwtDecode } from 'jwt-decode';
 
 interface ReporteLocal {
   id_local: number;
@@ -17,6 +18,38 @@ interface ReporteLocal {
   id_servidor?: number;
 }
 
+// Respuesta de POST /sync/batch
+interface SyncItemResult {
+  uuid_cliente: string;
+  estado: 'creado' | 'duplicado' | 'error';
+  id_reporte: number | null;
+  error: string | null;
+}
+
+interface SyncBatchResult {
+  creados: number;
+  duplicados: number;
+  errores: number;
+  resultados: SyncItemResult[];
+}
+
+// Reportes por petición a /sync/batch (el servidor acepta hasta SYNC_LOTE_MAX)
+const TAMANO_LOTE = 100;
+
+// Hash corto (cyrb53) de un texto, para armar un Idempotency-Key estable
+const hashTexto = (texto: string): string => {
+  let h1 = 0xdeadbeef;
+  let h2 = 0x41c6ce57;
+  for (let i = 0; i < texto.length; i++) {
+    const c = texto.charCodeAt(i);
+    h1 = Math.imul(h1 ^ c, 2654435761);
+    h2 = Math.imul(h2 ^ c, 1597334677);
+  }
+  h1 = Math.imul(h1 ^ (h1 >>> 16), 2246822507) ^ Math.imul(h2 ^ (h2 >>> 13), 3266489909);
+  h2 = Math.imul(h2 ^ (h2 >>> 16), 2246822507) ^ Math.imul(h1 ^ (h1 >>> 13), 3266489909);
+  return (4294967296 * (2097151 & h2) + (h1 >>> 0)).toString(36);
+};
+
 /**
  * Sincroniza todos los reportes pendientes con el servidor
  * @returns Número de reportes sincronizados exitosamente
@@ -46,60 +79,63 @@ export const sincronizarReportesPendientes = async (): Promise<number> => {
       return 0;
     }
 
-    // 3. Sincronizar cada reporte
-    for (const reporte of reportesPendientes) {
+    // 3. Subir los pendientes en lotes (una petición por lote, no por reporte)
+    for (let inicio = 0; inicio < reportesPendientes.length; inicio += TAMANO_LOTE) {
+      const lote = reportesPendientes.slice(inicio, inicio + TAMANO_LOTE);
       try {
-        console.log(`📤 Sincronizando reporte: ${reporte.Titulo} (UUID: ${reporte.UUID_Cliente})`);
-        
+        console.log(`📤 Sincronizando lote de ${lote.length} reportes`);
+
         // Preparar datos para el servidor
-        const reporteData = {
+        const reportes = lote.map((reporte) => ({
           titulo: reporte.Titulo,
           descripcion: reporte.Descripcion || '',
           fecha_reporte: reporte.Fecha_Reporte,
           uuid_cliente: reporte.UUID_Cliente,
-          peticion_idempotencia: `mobile-${reporte.UUID_Cliente}-${Date.now()}`, // Nota: singular
+          // Estable entre reintentos: el servidor reconoce el reenvío del mismo reporte
+          peticion_idempotencia: `mobile-${reporte.UUID_Cliente}`, // Nota: singular
           id_severidad: Number(reporte.ID_Severidad),
           id_area: Number(reporte.ID_Area),
           id_estado_actual: Number(reporte.ID_Estado_Actual),
           rut: Number(reporte.RUT),
-          // No incluimos RUT ni ID_Estado_Actual porque el endpoint no los menciona.
-        };
+        }));
 
-        // Enviar al servidor
-        const response = await api.post('/reportes/', reporteData, {
+        // Enviar al servidor. Si se corta la conexión y se reintenta el mismo
+        // lote, la misma clave hace que el servidor repita su respuesta
+        const cuerpo = { reportes };
+        const response = await api.post<SyncBatchResult>('/sync/batch', cuerpo, {
           headers: {
             Authorization: `Bearer ${token}`,
+            'Idempotency-Key': `lote-${hashTexto(JSON.stringify(cuerpo))}`,
           },
         });
 
-        console.log(`✅ Reporte sincronizado. ID servidor: ${response.data.id_reporte}`);
-
-        // 4. Actualizar el reporte local con el ID del servidor
-        await db.runAsync(
-          `UPDATE Reportes 
-           SET sincronizado = 1, 
-               id_servidor = ?,
-               Hora_Actualizado = CURRENT_TIMESTAMP
-           WHERE id_local = ?`,
-          [response.data.id_reporte, reporte.id_local]
-        );
+        // 4. Actualizar cada reporte local con su resultado (vienen en el mismo orden)
+        for (let i = 0; i < lote.length; i++) {
+          const reporte = lote[i];
+          const resultado = response.data.resultados[i];
 
-        reportesSincronizados++;
+          if (resultado.estado === 'error') {
+            console.error(`❌ Error sincronizando reporte ${reporte.id_local}:`, resultado.error);
+            continue;
+          }
+          if (resultado.estado === 'duplicado') {
+            console.log(`⚠️ Reporte ${reporte.id_local} ya existe en servidor, marcando como sincronizado`);
+          }
 
-      } catch (error: any) {
-        console.error(`❌ Error sincronizando reporte ${reporte.id_local}:`, error.response?.data || error.message);
-        
-        // Si el error es por UUID duplicado (409), marcar como sincronizado
-        if (error.response?.status === 400 && 
-            error.response?.data?.detail?.includes('UUID_Cliente ya existe')) {
-          console.log(`⚠️ Reporte ya existe en servidor, marcando como sincronizado`);
           await db.runAsync(
-            'UPDATE Reportes SET sincronizado = 1 WHERE id_local = ?',
-            [reporte.id_local]
+            `UPDATE Reportes 
+             SET sincronizado = 1, 
+                 id_servidor = ?,
+                 Hora_Actualizado = CURRENT_TIMESTAMP
+             WHERE id_local = ?`,
+            [resultado.id_reporte, reporte.id_local]
           );
           reportesSincronizados++;
         }
-        // Continuar con el siguiente reporte en caso de error
+
+      } catch (error: any) {
+        console.error('❌ Error sincronizando lote:', error.response?.data || error.message);
+        // Continuar con el siguiente lote en caso de error
       }
     }
 
@@ -112,6 +148,65 @@ export const sincronizarReportesPendientes = async (): Promise<number> => {
   }
 };
 
+// Respuesta de GET /sync/changes (solo los campos que se usan aquí)
+interface SyncChanges {
+  reportes: { ID_Reporte: number; UUID_Cliente: string | null; ID_Estado_Actual: number | null }[];
+  watermark: string | null;
+  hay_mas: boolean;
+}
+
+/**
+ * Clave del watermark en SecureStore, una por usuario (RUT del token): si
+ * otro usuario inicia sesión en el mismo teléfono parte desde cero y no
+ * desde el watermark del anterior. null = no hay sesión.
+ */
+const watermarkKey = async (): Promise<string | null> => {
+  const token = await SecureStore.getItemAsync('userToken');
+  if (!token || token === 'primer_inicio') return null;
+  try {
+    const { rut } = jwtDecode<{ rut: number }>(token);
+    return rut ? `syncWatermark_${rut}` : null;
+  } catch {
+    return null;
+  }
+};
+
+/**
+ * Descarga solo los reportes que cambiaron en el servidor desde la última
+ * vez (ej: un admin aprobó o rechazó uno) y actualiza su estado local.
+ * @returns Número de reportes actualizados
+ */
+export const descargarCambios = async (): Promise<number> => {
+  const db = getDB();
+  let actualizados = 0;
+  const key = await watermarkKey();
+  if (!key) return 0;
+  let since = await SecureStore.getItemAsync(key);
+
+  while (true) {
+    const response = await api.get<SyncChanges>('/sync/changes', {
+      params: since ? { since } : {},
+    });
+    for (const reporte of response.data.reportes) {
+      const resultado = await db.runAsync(
+        `UPDATE Reportes
+         SET ID_Estado_Actual = ?, id_servidor = ?, sincronizado = 1
+         WHERE UUID_Cliente = ? OR id_servidor = ?`,
+        [reporte.ID_Estado_Actual, reporte.ID_Reporte, reporte.UUID_Cliente, reporte.ID_Reporte]
+      );
+      actualizados += resultado.changes;
+    }
+    if (response.data.watermark) {
+      since = response.data.watermark;
+      await SecureStore.setItemAsync(key, since);
+    }
+    if (!response.data.hay_mas) break;
+  }
+
+  console.log(`📥 Cambios descargados: ${actualizados} reporte(s) actualizados`);
+  return actualizados;
+};
+
 /**
  * Obtiene el número de reportes pendientes de sincronizar
  */
@@ -158,4 +253,6 @@ export const verificarConexion = async (): Promise<boolean> => {
 };
 
 // ℹ️ NOTA: Los catálogos (Áreas, Severidades, Estados) ahora se manejan
-// localmente en database.ts y NO se sincronizan desde el servidor.
\ No newline at end of file
+// localmente en database.ts y NO se sincronizan desde el servidor.
+// El servidor ya los entrega en una sola petición versionada
+// (reportService.getCatalogos / getCatalogosVersion) para cuando se sincronicen.
\ No newline at end of file
@@ -46,4 +46,23 @@ export interface Area {
 export interface Severidad {
     ID_Severidad: number;
     Nombre_Severidad: string;
-}
\ No newline at end of file
+}
+export interface EstadoReporte {
+    ID_Estado_Actual: number;
+    Nombre_Estado: string;
+}
+
+export interface EstadoTransicion {
+    ID_Transicion: number;
+    Estado_Desde: number | null;
+    Estado_Hacia: number | null;
+}
+
+// GET /reportes/catalogos: todos los catálogos juntos, versionados por contenido
+export interface CatalogosBundle {
+    version: string;
+    areas: Area[];
+    severidad: Severidad[];
+    estados: EstadoReporte[];
+    transiciones: EstadoTransicion[];
+}